@@ -0,0 +1,489 @@
+"""
+Benchmark of Magic UV
+
+Run in background Blender:
+
+  blender --factory-startup --background -noaudio \
+      --python tests/run_benchmark.py -- [options]
+
+Options:
+  --sizes 1000,10000      number of faces of generated meshes
+  --meshes grid,cylinder  generated meshes
+                          (grid, cylinder, scattered, scanned)
+  --filter packuv         run only benchmarks whose name includes string
+  --repeat 3              number of runs of each benchmark (minimum is used)
+  --output FILE           write results to JSON file
+  --baseline FILE         compare results with baseline JSON file
+  --threshold 0.2         allowable slowdown ratio against baseline
+  --update-baseline       write results to baseline file
+
+Exit status is 1 when any benchmark is slower than the baseline by more
+than threshold, and 2 when the baseline is missing or has no results.
+The baseline depends on the machine, so generate it with
+--update-baseline on the machine which runs the comparison.
+"""
+
+import bpy
+import bmesh
+
+import argparse
+import functools
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+
+ADDON_NAME = "uv_magic_uv"
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_MESHES = ["grid", "cylinder", "scattered", "scanned"]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "benchmark_baseline.json")
+
+# benchmark whose baseline time is less than this value is not compared,
+# because the measurement error is larger than the threshold
+MIN_COMPARED_TIME = 0.005
+
+# (idname, area type, arguments)
+# operators are run in this order, so copy operators must precede paste
+# operators
+OPERATORS = [
+    ('uv.muv_cpuv_copy_uv', 'VIEW_3D', {}),
+    ('uv.muv_cpuv_paste_uv', 'VIEW_3D', {}),
+    ('uv.muv_cpuv_selseq_copy_uv', 'VIEW_3D', {}),
+    ('uv.muv_cpuv_selseq_paste_uv', 'VIEW_3D', {}),
+    ('uv.muv_cpuv_ie_copy_uv', 'IMAGE_EDITOR', {}),
+    ('uv.muv_cpuv_ie_paste_uv', 'IMAGE_EDITOR', {}),
+    ('uv.muv_transuv_copy', 'VIEW_3D', {}),
+    ('uv.muv_transuv_paste', 'VIEW_3D', {}),
+    ('uv.muv_fliprot', 'VIEW_3D', {}),
+    ('uv.muv_mirror_uv', 'VIEW_3D', {}),
+    ('uv.muv_wsuv_measure', 'VIEW_3D', {}),
+    ('uv.muv_wsuv_apply', 'VIEW_3D', {}),
+    ('uv.muv_preserve_uv_aspect', 'VIEW_3D', {}),
+    ('uv.muv_unwrap_constraint', 'VIEW_3D', {}),
+    ('uv.muv_texproj_project', 'VIEW_3D', {}),
+    ('uv.muv_uvw_box_map', 'VIEW_3D', {}),
+    ('uv.muv_uvw_best_planer_map', 'VIEW_3D', {}),
+    ('uv.muv_auv_circle', 'IMAGE_EDITOR', {}),
+    ('uv.muv_auv_straighten', 'IMAGE_EDITOR', {}),
+    ('uv.muv_auv_axis', 'IMAGE_EDITOR', {}),
+    ('uv.muv_auv_smooth', 'IMAGE_EDITOR', {}),
+    ('uv.muv_auvc_align', 'IMAGE_EDITOR', {}),
+    ('uv.muv_packuv', 'IMAGE_EDITOR', {}),
+    ('uv.muv_uvinsp_update', 'IMAGE_EDITOR', {}),
+    ('uv.muv_uvinsp_select_overlapped', 'IMAGE_EDITOR', {}),
+    ('uv.muv_uvinsp_select_flipped', 'IMAGE_EDITOR', {}),
+]
+
+
+# ---------------------------------------------------------------------
+# mesh generators
+#   All generators return (cos, loop_verts, loop_offsets, uvs) as NumPy
+#   arrays, so that the mesh can be built with foreach_set.
+# ---------------------------------------------------------------------
+
+def __grid_topology(num_x, num_y):
+    v = (np.arange(num_y)[:, np.newaxis] * (num_x + 1) +
+         np.arange(num_x)[np.newaxis, :]).ravel()
+    loop_verts = np.column_stack(
+        (v, v + 1, v + num_x + 2, v + num_x + 1)).ravel()
+    offsets = np.arange(0, len(loop_verts) + 1, 4)
+
+    return loop_verts, offsets
+
+
+def gen_grid(num_face):
+    """
+    One island grid
+    """
+    n = max(1, int(round(np.sqrt(num_face))))
+    xs, ys = np.meshgrid(np.linspace(0.0, 1.0, n + 1),
+                         np.linspace(0.0, 1.0, n + 1))
+    cos = np.column_stack((xs.ravel(), ys.ravel(), np.zeros(xs.size)))
+    loop_verts, offsets = __grid_topology(n, n)
+    uvs = cos[loop_verts][:, :2]
+
+    return cos, loop_verts, offsets, uvs
+
+
+def gen_cylinder(num_face):
+    """
+    Cylinder with a UV seam
+    """
+    rings = max(1, int(round(np.sqrt(num_face / 4.0))))
+    segments = max(3, int(round(num_face / rings)))
+    angles = np.arange(segments) * 2.0 * np.pi / segments
+    heights = np.linspace(0.0, 1.0, rings + 1)
+    cos = np.column_stack((np.tile(np.cos(angles), rings + 1),
+                           np.tile(np.sin(angles), rings + 1),
+                           np.repeat(heights, segments)))
+    r = np.repeat(np.arange(rings), segments)
+    s = np.tile(np.arange(segments), rings)
+    s1 = (s + 1) % segments
+    loop_verts = np.column_stack((r * segments + s, r * segments + s1,
+                                  (r + 1) * segments + s1,
+                                  (r + 1) * segments + s)).ravel()
+    offsets = np.arange(0, len(loop_verts) + 1, 4)
+    us = np.column_stack((s, s + 1, s + 1, s)).ravel() / segments
+    vs = np.column_stack((r, r, r + 1, r + 1)).ravel() / rings
+    uvs = np.column_stack((us, vs))
+
+    return cos, loop_verts, offsets, uvs
+
+
+def gen_scattered(num_face, island_size=4, seed=0):
+    """
+    Many small islands scattered (and partially overlapped) on UV space
+    """
+    rng = np.random.RandomState(seed)
+    faces_per_island = island_size * island_size
+    num_island = max(1, num_face // faces_per_island)
+    cos, loop_verts, offsets, uvs = gen_grid(faces_per_island)
+    verts_per_island = len(cos)
+    scale = 1.0 / np.sqrt(num_island) * 0.8
+
+    all_cos = []
+    all_loop_verts = []
+    all_uvs = []
+    for i in range(num_island):
+        all_cos.append(cos + (i * 1.5, 0.0, 0.0))
+        all_loop_verts.append(loop_verts + i * verts_per_island)
+        all_uvs.append(uvs * scale + rng.uniform(0.0, 1.0 - scale, 2))
+    loop_verts = np.concatenate(all_loop_verts)
+    offsets = np.arange(0, len(loop_verts) + 1, 4)
+
+    return (np.concatenate(all_cos), loop_verts, offsets,
+            np.concatenate(all_uvs))
+
+
+def gen_scanned(num_face, patch_size=32, seed=0):
+    """
+    Noisy triangulated surface which is cut into irregular UV patches
+    """
+    rng = np.random.RandomState(seed)
+    n = max(1, int(round(np.sqrt(num_face / 2.0))))
+    xs, ys = np.meshgrid(np.linspace(0.0, 1.0, n + 1),
+                         np.linspace(0.0, 1.0, n + 1))
+    jitter = rng.normal(0.0, 0.25 / n, (2, n + 1, n + 1))
+    cos = np.column_stack(((xs + jitter[0]).ravel(),
+                           (ys + jitter[1]).ravel(),
+                           rng.normal(0.0, 0.5 / n, xs.size)))
+    quads, _ = __grid_topology(n, n)
+    quads = quads.reshape(-1, 4)
+    loop_verts = np.column_stack((quads[:, [0, 1, 2]],
+                                  quads[:, [0, 2, 3]])).ravel()
+    offsets = np.arange(0, len(loop_verts) + 1, 3)
+
+    # cut into patches, and shift each patch on UV space
+    uvs = cos[loop_verts][:, :2].copy()
+    face_x = np.repeat(np.tile(np.arange(n), n), 2)
+    face_y = np.repeat(np.repeat(np.arange(n), n), 2)
+    patch = (face_y // patch_size) * n + face_x // patch_size
+    shift = rng.uniform(-0.01, 0.01, (patch.max() + 1, 2))
+    uvs += np.repeat(shift[patch], 3, axis=0)
+
+    return cos, loop_verts, offsets, uvs
+
+
+GENERATORS = {
+    "grid": gen_grid,
+    "cylinder": gen_cylinder,
+    "scattered": gen_scattered,
+    "scanned": gen_scanned,
+}
+
+
+def build_object(name, cos, loop_verts, offsets, uvs):
+    me = bpy.data.meshes.new(name)
+    me.vertices.add(len(cos))
+    me.vertices.foreach_set("co", cos.astype(np.float32).ravel())
+    me.loops.add(len(loop_verts))
+    me.loops.foreach_set("vertex_index", loop_verts.astype(np.int32))
+    me.polygons.add(len(offsets) - 1)
+    me.polygons.foreach_set("loop_start", offsets[:-1].astype(np.int32))
+    me.polygons.foreach_set("loop_total",
+                            np.diff(offsets).astype(np.int32))
+    me.update(calc_edges=True)
+    me.uv_textures.new("UVMap")
+    me.uv_layers[0].data.foreach_set("uv", uvs.astype(np.float32).ravel())
+
+    img = bpy.data.images.new(name, 1024, 1024)
+    for tex in me.uv_textures[0].data:
+        tex.image = img
+
+    obj = bpy.data.objects.new(name, me)
+    bpy.context.scene.objects.link(obj)
+
+    return obj
+
+
+def activate_object(obj):
+    sc = bpy.context.scene
+    for o in sc.objects:
+        o.select = False
+    obj.select = True
+    sc.objects.active = obj
+
+
+# ---------------------------------------------------------------------
+# benchmarks
+# ---------------------------------------------------------------------
+
+def get_override(area_type, obj):
+    """
+    Make context override, because there is no UV/Image Editor and 3D
+    View in background mode
+    """
+    screen = bpy.data.screens[0]
+    area = screen.areas[0]
+    area.type = area_type
+    region = [r for r in area.regions if r.type == 'WINDOW'][0]
+
+    return {
+        'window': bpy.context.window_manager.windows[0]
+        if bpy.context.window_manager.windows else None,
+        'screen': screen,
+        'area': area,
+        'region': region,
+        'scene': bpy.context.scene,
+        'object': obj,
+        'active_object': obj,
+        'edit_object': obj,
+    }
+
+
+def measure(fn, repeat):
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    return min(times), result
+
+
+def run_operator_benchmarks(obj, repeat, name_filter):
+    results = {}
+    for idname, area_type, args in OPERATORS:
+        if name_filter and name_filter not in idname:
+            continue
+        category, op_name = idname.split(".")
+        op = getattr(getattr(bpy.ops, category), op_name)
+        override = get_override(area_type, obj)
+        bpy.ops.mesh.select_all(override, action='SELECT')
+
+        try:
+            t, ret = measure(functools.partial(op, override, **args), repeat)
+            status = list(ret)[0] if ret else "NONE"
+        except RuntimeError as e:
+            t = None
+            status = "ERROR: " + str(e).splitlines()[0]
+        results[idname] = {"time": t, "status": status}
+        print("  {0:40s} {1:>12s} {2}".format(
+            idname, "-" if t is None else "{0:.4f}s".format(t), status))
+
+    return results
+
+
+def run_common_benchmarks(obj, repeat, name_filter):
+    common = sys.modules[ADDON_NAME + ".common"]
+    uv_inspection = sys.modules[ADDON_NAME + ".op.uv_inspection"]
+
+    def island_table():
+        # the cache must not be hit
+        common.island_cache.invalidate()
+        return common.get_island_table(obj, False)
+
+    def island_table_cached():
+        return common.get_island_table(obj, False)
+
+    def island_info():
+        common.island_cache.invalidate()
+        return common.get_island_info(obj, False)
+
+    def overlapped_uv_info():
+        common.island_cache.invalidate()
+        bm = bmesh.from_edit_mesh(obj.data)
+        uv_layer = bm.loops.layers.uv.verify()
+        faces = [f for f in bm.faces]
+        return uv_inspection.get_overlapped_uv_info(bm, faces, uv_layer,
+                                                    'FACE')
+
+    def flipped_uv_info():
+        bm = bmesh.from_edit_mesh(obj.data)
+        uv_layer = bm.loops.layers.uv.verify()
+        faces = [f for f in bm.faces]
+        arrays = common.MeshArrays(bm, uv_layer, faces)
+        return uv_inspection.get_flipped_uv_info(faces, arrays.uvs,
+                                                 arrays.offsets)
+
+    def loop_sequences():
+        bm = bmesh.from_edit_mesh(obj.data)
+        uv_layer = bm.loops.layers.uv.verify()
+        return common.get_loop_sequences(bm, uv_layer)
+
+    benchmarks = [
+        ("common.get_island_table", island_table),
+        ("common.get_island_table (cached)", island_table_cached),
+        ("common.get_island_info", island_info),
+        ("common.get_loop_sequences", loop_sequences),
+        ("common.measure_mesh_area", lambda: common.measure_mesh_area(obj)),
+        ("common.measure_uv_area", lambda: common.measure_uv_area(obj)),
+        ("uv_inspection.get_overlapped_uv_info", overlapped_uv_info),
+        ("uv_inspection.get_flipped_uv_info", flipped_uv_info),
+    ]
+
+    results = {}
+    bpy.ops.mesh.select_all(action='SELECT')
+    for name, fn in benchmarks:
+        if name_filter and name_filter not in name:
+            continue
+        try:
+            t, _ = measure(fn, repeat)
+            status = "OK"
+        except Exception as e:     # pylint: disable=broad-except
+            t = None
+            status = "ERROR: {0}: {1}".format(type(e).__name__, e)
+        results[name] = {"time": t, "status": status}
+        print("  {0:40s} {1:>12s} {2}".format(
+            name, "-" if t is None else "{0:.4f}s".format(t), status))
+
+    return results
+
+
+def run_benchmarks(meshes, sizes, repeat, name_filter):
+    results = {}
+    for mesh_name in meshes:
+        for size in sizes:
+            print("======== {0} ({1} faces) ========".format(mesh_name, size))
+            bpy.ops.wm.read_factory_settings()
+            bpy.ops.wm.addon_enable(module=ADDON_NAME)
+
+            t, data = measure(lambda: GENERATORS[mesh_name](size), 1)
+            obj = build_object(mesh_name, *data)
+            print("  generated {0} faces in {1:.2f}s".format(
+                len(obj.data.polygons), t))
+            activate_object(obj)
+            bpy.ops.object.mode_set(mode='EDIT')
+
+            key = "{0}/{1}".format(mesh_name, size)
+            results[key] = {}
+            results[key].update(
+                run_common_benchmarks(obj, repeat, name_filter))
+            results[key].update(
+                run_operator_benchmarks(obj, repeat, name_filter))
+
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+    return results
+
+
+# ---------------------------------------------------------------------
+# baseline
+# ---------------------------------------------------------------------
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Return list of (mesh, benchmark, baseline time, current time)
+    which are regressed
+    """
+    regressions = []
+    for mesh_key, benches in results.items():
+        base_benches = baseline.get(mesh_key, {})
+        for name, res in benches.items():
+            base = base_benches.get(name)
+            if base is None:
+                print("[NEW]  {0} {1}".format(mesh_key, name))
+                continue
+            if (base["time"] is None) or (res["time"] is None):
+                if base["status"] != res["status"]:
+                    print("[STATUS] {0} {1}: {2} -> {3}".format(
+                        mesh_key, name, base["status"], res["status"]))
+                continue
+            if base["time"] < MIN_COMPARED_TIME:
+                continue
+            ratio = res["time"] / base["time"]
+            if ratio > 1.0 + threshold:
+                regressions.append((mesh_key, name, base["time"],
+                                    res["time"]))
+                print("[SLOW] {0} {1}: {2:.4f}s -> {3:.4f}s (x{4:.2f})"
+                      .format(mesh_key, name, base["time"], res["time"],
+                              ratio))
+
+    return regressions
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="run_benchmark.py")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--meshes", default=",".join(DEFAULT_MESHES))
+    parser.add_argument("--filter", default="")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--update-baseline", action="store_true")
+
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    meshes = [m for m in args.meshes.split(",") if m]
+    for m in meshes:
+        if m not in GENERATORS:
+            print("Unknown mesh: {0}".format(m))
+            sys.exit(2)
+
+    results = run_benchmarks(meshes, sizes, args.repeat, args.filter)
+    report = {
+        "blender": bpy.app.version_string,
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        baseline = {"results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update({k: v for k, v in report.items() if k != "results"})
+        baseline["results"].update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print("Baseline is updated: {0}".format(args.baseline))
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline: {0}".format(args.baseline))
+        print("Run with --update-baseline to generate it")
+        sys.exit(2)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if not baseline.get("results"):
+        print("Baseline has no results: {0}".format(args.baseline))
+        print("Run with --update-baseline to generate it")
+        sys.exit(2)
+    regressions = compare_with_baseline(results, baseline["results"],
+                                        args.threshold)
+    if regressions:
+        print("{0} benchmark(s) are regressed".format(len(regressions)))
+        sys.exit(1)
+    print("No regression")
+
+
+if __name__ == "__main__":
+    main()
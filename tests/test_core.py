@@ -0,0 +1,648 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+# core package does not depend on bpy, so it can be imported without
+# importing the add-on itself
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "uv_magic_uv"))
+import core
+
+
+def make_grid(num_x, num_y):
+    """
+    Make grid mesh whose UV is same as vertex coordinate
+    """
+    cos = []
+    for y in range(num_y + 1):
+        for x in range(num_x + 1):
+            cos.append((x, y, 0.0))
+    loop_verts = []
+    for y in range(num_y):
+        for x in range(num_x):
+            v = y * (num_x + 1) + x
+            loop_verts.extend([v, v + 1, v + num_x + 2, v + num_x + 1])
+    offsets = np.arange(0, len(loop_verts) + 1, 4)
+    cos = np.array(cos, dtype=np.float64)
+    loop_verts = np.array(loop_verts)
+    uvs = cos[loop_verts][:, :2].copy()
+
+    return cos, loop_verts, uvs, offsets
+
+
+class TestGeometry(unittest.TestCase):
+
+    def test_polygon_area(self):
+        print("======== Polygon Area ========")
+        points = np.array([[0.0, 0.0], [2.0, 0.0], [2.0, 1.0], [0.0, 1.0],
+                           [0.0, 0.0], [0.0, 1.0], [1.0, 0.0]])
+        offsets = np.array([0, 4, 7])
+
+        print("[TEST] 2D signed area")
+        signed = core.geometry.calc_polygon_2d_signed_area(points, offsets)
+        np.testing.assert_allclose(signed, [2.0, -0.5])
+
+        print("[TEST] 2D area")
+        area = core.geometry.calc_polygon_2d_area(points, offsets)
+        np.testing.assert_allclose(area, [2.0, 0.5])
+
+        print("[TEST] Flipped")
+        mask, indices = core.geometry.find_flipped_polygons(points, offsets)
+        self.assertEqual(mask.tolist(), [False, True])
+        self.assertEqual(indices.tolist(), [1])
+
+        print("[TEST] 3D area")
+        points_3d = np.column_stack((points[:, 0], np.zeros(7), points[:, 1]))
+        area = core.geometry.calc_polygon_3d_area(points_3d, offsets)
+        np.testing.assert_allclose(area, [2.0, 0.5])
+
+        print("[TEST] No polygon")
+        area = core.geometry.calc_polygon_2d_area(np.zeros((0, 2)),
+                                                  np.array([0]))
+        self.assertEqual(len(area), 0)
+
+    def test_triangulate_polygons(self):
+        print("======== Triangulate Polygons ========")
+        points = np.array([[0.0, 0.0], [2.0, 0.0], [2.0, 1.0], [0.0, 1.0],
+                           [0.0, 0.0], [1.0, 0.0], [0.0, 1.0]])
+        offsets = np.array([0, 4, 7])
+        tris = core.geometry.triangulate_polygons(points, offsets)
+        self.assertEqual(tris.shape, (9, 2))
+        np.testing.assert_allclose(tris[3:6], [[0.0, 0.0], [2.0, 1.0],
+                                               [0.0, 1.0]])
+        area = core.geometry.calc_polygon_2d_area(
+            tris, np.arange(0, len(tris) + 1, 3))
+        self.assertAlmostEqual(float(np.sum(area)), 2.5)
+
+    def test_circle(self):
+        print("======== Circle ========")
+        center, radius = core.geometry.calc_circle(
+            [(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0)])
+        np.testing.assert_allclose(center, [0.0, 0.0], atol=1e-9)
+        self.assertAlmostEqual(radius, 1.0)
+
+        points = core.geometry.calc_points_on_circle(
+            (1.0, 0.0), center, radius, 4)
+        self.assertEqual(points.shape, (4, 2))
+        np.testing.assert_allclose(np.hypot(points[:, 0], points[:, 1]),
+                                   np.ones(4))
+
+    def test_tri_vert(self):
+        print("======== Triangle Vertex ========")
+        p1, p2 = core.geometry.calc_tri_vert(
+            (0.0, 0.0), (1.0, 0.0), np.pi / 4, np.pi / 4)
+        np.testing.assert_allclose(p1, [0.5, 0.5])
+        np.testing.assert_allclose(p2, [0.5, -0.5])
+
+    def test_flipped_rotated_loops(self):
+        print("======== Flipped/Rotated Loops ========")
+        offsets = np.array([0, 4, 7])
+
+        print("[TEST] Rotate")
+        loops = core.geometry.get_flipped_rotated_loops(offsets, False, 1)
+        np.testing.assert_array_equal(loops, [3, 0, 1, 2, 6, 4, 5])
+
+        print("[TEST] Flip and rotate")
+        loops = core.geometry.get_flipped_rotated_loops(offsets, True, 1)
+        np.testing.assert_array_equal(loops, [0, 3, 2, 1, 4, 6, 5])
+
+    def test_polygon_loops(self):
+        print("======== Polygon Loops ========")
+        offsets = np.array([0, 4, 7, 10])
+        loops, sub_offsets = core.geometry.get_polygon_loops(offsets, [2, 0])
+        np.testing.assert_array_equal(loops, [7, 8, 9, 0, 1, 2, 3])
+        np.testing.assert_array_equal(sub_offsets, [0, 3, 7])
+
+    def test_last_loops_of_edges(self):
+        print("======== Last Loops of Edges ========")
+        # two quads sharing edge 1
+        loop_edges = np.array([0, 1, 2, 3, 4, 5, 6, 1])
+        last = core.geometry.get_last_loops_of_edges(loop_edges)
+        np.testing.assert_array_equal(last, [0, 7, 2, 3, 4, 5, 6, 7])
+
+        print("[TEST] Shared edge")
+        seams = np.array([False, True, False, False,
+                          False, False, False, False])
+        np.testing.assert_array_equal(np.flatnonzero(seams[last]), [])
+        seams[7] = True
+        np.testing.assert_array_equal(np.flatnonzero(seams[last]), [1, 7])
+
+    def test_origin(self):
+        print("======== Origin ========")
+        points = np.array([[0.0, 0.0], [2.0, 0.0], [2.0, 1.0], [0.0, 3.0]])
+
+        print("[TEST] Center")
+        np.testing.assert_allclose(
+            core.geometry.calc_origin(points, 'CENTER'), [1.0, 1.0])
+
+        print("[TEST] Left Top")
+        np.testing.assert_allclose(
+            core.geometry.calc_origin(points, 'LEFT_TOP'), [0.0, 3.0])
+
+        print("[TEST] Right Center")
+        np.testing.assert_allclose(
+            core.geometry.calc_origin(points, 'RIGHT_CENTER'), [2.0, 1.0])
+
+    def test_folded_uv_edges(self):
+        print("======== Folded UV Edges ========")
+        # three quads in a row, edges: 0-1-2-3 bottom/top and 4 verticals
+        offsets = np.array([0, 4, 8, 12])
+        loop_edges = np.array([0, 1, 2, 3, 4, 5, 6, 1, 7, 8, 9, 5])
+
+        print("[TEST] Not folded")
+        uvs = np.array([[0, 0], [1, 0], [1, 1], [0, 1],
+                        [1, 0], [2, 0], [2, 1], [1, 1],
+                        [2, 0], [3, 0], [3, 1], [2, 1]], dtype=np.float64)
+        centers = np.array([[0.5, 0.5], [1.5, 0.5], [2.5, 0.5]])
+        a, b, folded = core.geometry.find_folded_uv_edges(
+            uvs, offsets, loop_edges, centers)
+        self.assertEqual(sorted(zip(a.tolist(), b.tolist())),
+                         [(0, 1), (1, 2)])
+        self.assertFalse(np.any(folded))
+
+        print("[TEST] Folded")
+        uvs[9] = [1.0, 0.0]
+        uvs[10] = [1.0, 1.0]
+        centers[2] = [1.5, 0.5]
+        a, b, folded = core.geometry.find_folded_uv_edges(
+            uvs, offsets, loop_edges, centers)
+        self.assertEqual(list(zip(a[folded].tolist(), b[folded].tolist())),
+                         [(1, 2)])
+
+    def test_face_hashes(self):
+        print("======== Face Hashes ========")
+        _, _, uvs, offsets = make_grid(3, 2)
+        hashes = core.geometry.calc_face_hashes(uvs, offsets)
+        self.assertEqual(len(set(hashes.tolist())), 6)
+
+        print("[TEST] Changed face")
+        uvs[5] += 0.25
+        changed = core.geometry.calc_face_hashes(uvs, offsets) != hashes
+        np.testing.assert_array_equal(np.flatnonzero(changed), [1])
+
+        print("[TEST] Rotated loops")
+        loops = core.geometry.get_flipped_rotated_loops(offsets, False, 1)
+        changed = core.geometry.calc_face_hashes(uvs[loops], offsets) != \
+            core.geometry.calc_face_hashes(uvs, offsets)
+        self.assertTrue(np.all(changed))
+
+
+class TestIsland(unittest.TestCase):
+
+    def test_find_islands(self):
+        print("======== Find Islands ========")
+        _, loop_verts, uvs, offsets = make_grid(4, 4)
+
+        print("[TEST] One island")
+        face_island = core.island.find_islands(uvs, loop_verts, offsets)
+        self.assertEqual(face_island.tolist(), [0] * 16)
+
+        print("[TEST] Split island by UV seam")
+        uvs[32:] += 10.0
+        face_island = core.island.find_islands(uvs, loop_verts, offsets)
+        self.assertEqual(face_island.tolist(), [0] * 8 + [1] * 8)
+
+    def test_island_table(self):
+        print("======== Island Table ========")
+        _, loop_verts, uvs, offsets = make_grid(2, 1)
+        uvs[4:] += (5.0, 0.0)
+        face_island = core.island.find_islands(uvs, loop_verts, offsets)
+        table = core.island.IslandTable(face_island, offsets, uvs)
+
+        self.assertEqual(len(table), 2)
+        np.testing.assert_allclose(table.face_ave_uv, [[0.5, 0.5],
+                                                       [6.5, 0.5]])
+        np.testing.assert_allclose(table.island_min_uv, [[0.0, 0.0],
+                                                         [6.0, 0.0]])
+        np.testing.assert_allclose(table.island_size, [[1.0, 1.0],
+                                                       [1.0, 1.0]])
+        self.assertEqual(table.island_num_uv.tolist(), [4, 4])
+        self.assertEqual(table.island_faces(1).tolist(), [1])
+
+    def test_concat_island_tables(self):
+        print("======== Concatenate Island Tables ========")
+        _, loop_verts, uvs, offsets = make_grid(2, 1)
+        uvs[4:] += (5.0, 0.0)
+        face_island = core.island.find_islands(uvs, loop_verts, offsets)
+        table_1 = core.island.IslandTable(face_island, offsets, uvs,
+                                          loop_verts)
+        table_2 = core.island.IslandTable(np.zeros(2, dtype=np.int64),
+                                          offsets, uvs[[0, 1, 2, 3] * 2],
+                                          loop_verts)
+        table, loop_starts = core.island.concat_island_tables(
+            [table_1, table_2])
+
+        self.assertEqual(len(table), 3)
+        self.assertEqual(loop_starts.tolist(), [0, 8, 16])
+        self.assertEqual(table.face_island.tolist(), [0, 1, 2, 2])
+        self.assertEqual(table.island_faces(2).tolist(), [2, 3])
+        np.testing.assert_array_equal(table.loop_offsets,
+                                      [0, 4, 8, 12, 16])
+        # vertices are not shared among tables
+        self.assertEqual(int(table.loop_verts[8]), 6)
+        np.testing.assert_allclose(table.island_min_uv[[0, 2]],
+                                   [[0.0, 0.0], [0.0, 0.0]])
+
+    def test_group_similar_islands(self):
+        print("======== Group Similar Islands ========")
+        centers = [[0.5, 0.5], [0.2, 0.2], [0.5005, 0.4995],
+                   [0.5, 0.5], [0.5015, 0.5], [0.5, 0.5]]
+        sizes = [[0.1, 0.1], [0.1, 0.1], [0.1, 0.1005],
+                 [0.1, 0.1], [0.1, 0.1], [0.1, 0.1]]
+        num_uvs = [4, 4, 4, 8, 4, 4]
+        groups, num_group = core.island.group_similar_islands(
+            centers, sizes, num_uvs, (0.001, 0.001), (0.001, 0.001))
+
+        print("[TEST] Islands within deviations are grouped")
+        self.assertEqual(num_group, 4)
+        self.assertEqual(groups.tolist(), [0, 1, 0, 2, 3, 0])
+
+
+class TestMapping(unittest.TestCase):
+
+    def test_box_map(self):
+        print("======== Box Map ========")
+        cos = [(1.0, 2.0, 3.0)] * 3
+        normals = [(1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0)]
+        uvs = core.mapping.calc_box_map(cos, normals)
+        np.testing.assert_allclose(uvs, [[2.0, 3.0], [-1.0, 3.0],
+                                         [1.0, 2.0]])
+
+
+class TestClip(unittest.TestCase):
+
+    def test_weiler_atherton(self):
+        print("======== Weiler-Atherton Clipping ========")
+        clip = [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]
+
+        print("[TEST] Not overlapped")
+        subject = [(2.0, 0.0), (3.0, 0.0), (3.0, 1.0), (2.0, 1.0)]
+        result, _ = core.clip.do_weiler_atherton_cliping(clip, subject,
+                                                         'PART')
+        self.assertFalse(result)
+
+        print("[TEST] Overlapped completely")
+        result, polygons = core.clip.do_weiler_atherton_cliping(
+            clip, clip, 'PART')
+        self.assertTrue(result)
+        self.assertEqual(len(polygons[0]), 4)
+
+        print("[TEST] Overlapped partially")
+        subject = [(0.5, 0.5), (1.5, 0.5), (1.5, 1.5), (0.5, 1.5)]
+        result, polygons = core.clip.do_weiler_atherton_cliping(
+            clip, subject, 'PART')
+        self.assertTrue(result)
+        poly = np.array(polygons[0])
+        area = core.geometry.calc_polygon_2d_area(
+            poly, np.array([0, len(poly)]))
+        self.assertAlmostEqual(float(area[0]), 0.25)
+
+    def test_clip_polygon_pairs(self):
+        print("======== Clip Polygon Pairs ========")
+        points = np.array([
+            [0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0],
+            [0.5, 0.5], [1.5, 0.5], [1.5, 1.5], [0.5, 1.5],
+            [1.0, 0.0], [2.0, 0.0], [2.0, 1.0], [1.0, 1.0],
+            [0.0, 0.0], [2.0, 0.0], [2.0, 1.0], [1.0, 1.0], [1.0, 2.0],
+            [0.0, 2.0],
+            [0.0, 0.0], [0.0, 1.0], [1.0, 0.0]])
+        offsets = np.array([0, 4, 8, 12, 18, 21])
+
+        print("[TEST] Convex")
+        convex = core.clip.calc_polygon_convex(points, offsets)
+        self.assertEqual(convex.tolist(), [True, True, True, False, True])
+
+        print("[TEST] Ear clipping")
+        tris = core.clip.triangulate_polygon(points[12:18])
+        self.assertEqual(len(tris), 4)
+        area = core.geometry.calc_polygon_2d_area(
+            points[12:18][tris.ravel()], np.arange(0, 13, 3))
+        self.assertAlmostEqual(float(np.sum(area)), 3.0)
+
+        print("[TEST] Intersection area")
+        areas, _, counts, pair_indices = core.clip.clip_polygon_pairs(
+            points, offsets, np.array([0, 0, 3, 1, 3, 4]),
+            np.array([1, 2, 1, 3, 3, 3]))
+        np.testing.assert_allclose(areas, [0.25, 0.0, 0.75, 0.75, 3.0, 0.5],
+                                   atol=1e-12)
+        self.assertTrue(np.all(np.isin(np.arange(6), pair_indices)))
+        self.assertEqual(len(counts), len(pair_indices))
+
+        print("[TEST] Degenerate face")
+        degenerate = np.array([
+            [0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0],
+            [0.5, 0.5], [0.5, 0.5], [0.5, 0.5], [0.5, 0.5],
+            [0.0, 0.5], [1.0, 0.5], [0.5, 0.5]])
+        areas, _, counts, pair_indices = core.clip.clip_polygon_pairs(
+            degenerate, np.array([0, 4, 8, 11]), np.array([1, 2, 0, 0]),
+            np.array([0, 0, 1, 2]))
+        np.testing.assert_array_equal(areas, [0.0, 0.0, 0.0, 0.0])
+        poly, counts = core.clip.clip_convex_polygons(
+            degenerate[None, 4:8], [4], degenerate[None, 0:4], [4])
+        self.assertEqual(counts.tolist(), [0])
+
+
+class TestSpatial(unittest.TestCase):
+
+    def test_overlapped_bbox_pairs(self):
+        print("======== Overlapped Bounding Box Pairs ========")
+        bb_min = np.array([[0.0, 0.0], [0.5, 0.5], [2.0, 2.0], [0.9, 0.0],
+                           [-5.0, -5.0]])
+        bb_max = np.array([[1.0, 1.0], [1.5, 1.5], [3.0, 3.0], [1.0, 0.2],
+                           [5.0, 5.0]])
+
+        print("[TEST] All pairs")
+        a, b = core.spatial.find_overlapped_bbox_pairs(bb_min, bb_max)
+        self.assertEqual(list(zip(a.tolist(), b.tolist())),
+                         [(0, 1), (0, 3), (0, 4), (1, 4), (2, 4), (3, 4)])
+
+        print("[TEST] Pairs in different groups")
+        groups = np.array([1, 0, 2, 1, 3])
+        a, b = core.spatial.find_overlapped_bbox_pairs(bb_min, bb_max,
+                                                       groups)
+        self.assertEqual(list(zip(a.tolist(), b.tolist())),
+                         [(1, 0), (1, 4), (0, 4), (3, 4), (2, 4)])
+
+        print("[TEST] Compare with brute force")
+        rng = np.random.RandomState(0)
+        bb_min = rng.rand(300, 2) * 4.0
+        bb_max = bb_min + rng.rand(300, 2) * 0.5
+        a, b = core.spatial.find_overlapped_bbox_pairs(bb_min, bb_max)
+        expect = []
+        for i in range(300):
+            for j in range(i + 1, 300):
+                if np.all(bb_max[i] >= bb_min[j]) and \
+                        np.all(bb_max[j] >= bb_min[i]):
+                    expect.append((i, j))
+        self.assertEqual(list(zip(a.tolist(), b.tolist())), expect)
+
+    def test_uniform_grid(self):
+        print("======== Uniform Grid ========")
+        rng = np.random.RandomState(0)
+        bb_min = rng.rand(300, 2) * 4.0
+        bb_max = bb_min + rng.rand(300, 2) * 0.5
+        groups = rng.randint(0, 20, 300)
+        grid = core.spatial.UniformGrid(bb_min, bb_max)
+
+        def expect_pairs(indices):
+            a, b = core.spatial.find_overlapped_bbox_pairs(bb_min, bb_max,
+                                                           groups)
+            mask = np.isin(a, indices) | np.isin(b, indices)
+            return list(zip(a[mask].tolist(), b[mask].tolist()))
+
+        print("[TEST] Query")
+        indices = np.array([3, 50, 299])
+        a, b = grid.find_pairs(indices, groups)
+        self.assertEqual(list(zip(a.tolist(), b.tolist())),
+                         expect_pairs(indices))
+
+        print("[TEST] Move boxes")
+        for _ in range(20):
+            moved = rng.choice(300, 10, replace=False)
+            bb_min[moved] = rng.rand(10, 2) * 4.0
+            bb_max[moved] = bb_min[moved] + rng.rand(10, 2) * 0.5
+            grid.move(moved, bb_min[moved], bb_max[moved])
+            a, b = grid.find_pairs(moved, groups)
+            self.assertEqual(list(zip(a.tolist(), b.tolist())),
+                             expect_pairs(moved))
+
+        print("[TEST] Grow boxes over too many cells")
+        grown = np.array([7, 120])
+        bb_min[grown] = [[-1e6, -1e6], [1.0, 1.0]]
+        bb_max[grown] = [[1e6, 1e6], [3.0, 3.0]]
+        grid.move(grown, bb_min[grown], bb_max[grown])
+        for indices in (grown, np.array([3, 50, 299])):
+            a, b = grid.find_pairs(indices, groups)
+            self.assertEqual(list(zip(a.tolist(), b.tolist())),
+                             expect_pairs(indices))
+        bb_max[grown] = bb_min[grown] + 0.5
+        grid.move(grown, bb_min[grown], bb_max[grown])
+        a, b = grid.find_pairs(np.arange(300), groups)
+        self.assertEqual(list(zip(a.tolist(), b.tolist())),
+                         expect_pairs(np.arange(300)))
+
+
+class TestRaster(unittest.TestCase):
+
+    def test_rasterize_islands(self):
+        print("======== Rasterize Islands ========")
+        # two squares with 2 texels gap on 100 x 100 texture
+        uvs = np.array([[0.1, 0.1], [0.4, 0.1], [0.4, 0.4], [0.1, 0.4],
+                        [0.42, 0.1], [0.7, 0.1], [0.7, 0.4], [0.42, 0.4]])
+        offsets = np.array([0, 4, 8])
+        face_island = np.array([0, 1])
+
+        print("[TEST] Coverage")
+        cov = core.raster.rasterize_islands(uvs, offsets, face_island,
+                                            100, 100)
+        self.assertEqual(int(cov.island_texels[0]), 900)
+        self.assertEqual(len(cov.pixels), 0)
+
+        print("[TEST] Padding")
+        for padding, conflicted in ((2, False), (3, True), (4, True)):
+            cov = core.raster.rasterize_islands(uvs, offsets, face_island,
+                                                100, 100, padding)
+            self.assertEqual(len(cov.pixels) > 0, conflicted)
+        self.assertEqual(cov.conflicted_faces().tolist(), [0, 1])
+        self.assertEqual(cov.conflicted_island_pairs().tolist(), [[0, 1]])
+
+        print("[TEST] Tiles")
+        for padding in (0, 3, 4):
+            cov = core.raster.rasterize_islands(uvs, offsets, face_island,
+                                                100, 100, padding)
+            tiled = core.raster.rasterize_islands(
+                uvs, offsets, face_island, 100, 100, padding,
+                max_texels=100 * 11)
+            np.testing.assert_array_equal(tiled.pixels, cov.pixels)
+            np.testing.assert_array_equal(tiled.island_texels,
+                                          cov.island_texels)
+            self.assertEqual(tiled.conflicted_island_pairs().tolist(),
+                             cov.conflicted_island_pairs().tolist())
+
+        print("[TEST] Cancelled")
+        tiles = []
+        cov = core.raster.rasterize_islands(
+            uvs, offsets, face_island, 100, 100, max_texels=100 * 11,
+            cancelled=lambda: tiles.append(0) or len(tiles) > 2)
+        self.assertIsNone(cov)
+        self.assertEqual(len(tiles), 3)
+
+        print("[TEST] Overlapped")
+        uvs[4:, 0] -= 0.1
+        cov = core.raster.rasterize_islands(uvs, offsets, face_island,
+                                            100, 100)
+        self.assertEqual(len(cov.pixels), 240)
+
+
+class TestTopology(unittest.TestCase):
+
+    def test_match_islands(self):
+        print("======== Match Islands ========")
+        _, loop_verts, uvs, offsets = make_grid(3, 2)
+        # island 1: faces reordered, loops rotated
+        # island 2: loops reversed (mirrored)
+        # island 3: different topology
+        loops = [np.arange(offsets[f], offsets[f + 1]) for f in range(6)]
+        order = [np.roll(loops[f], 1) for f in [3, 0, 5, 1, 4, 2]]
+        mirrored = [lp[::-1] for lp in loops]
+        _, loop_verts_3, uvs_3, _ = make_grid(6, 1)
+        all_loops = np.concatenate(loops + order + mirrored)
+        all_uvs = np.vstack((uvs[all_loops], uvs_3))
+        all_verts = np.concatenate((
+            loop_verts[all_loops] + np.repeat([0, 100, 200], 24),
+            loop_verts_3 + 300))
+        all_offsets = np.arange(0, len(all_verts) + 1, 4)
+        face_island = np.repeat([0, 1, 2, 3], 6)
+        topology = core.topology.IslandTopology(
+            all_uvs, all_verts, all_offsets, face_island)
+
+        print("[TEST] Signatures of islands")
+        sigs = topology.island_signatures.tolist()
+        self.assertEqual(sigs[0], sigs[1])
+        self.assertEqual(sigs[0], sigs[2])
+        self.assertNotEqual(sigs[0], sigs[3])
+
+        print("[TEST] Loops are matched to the same UV")
+        for isl_idx in [1, 2]:
+            src, dest = topology.match(np.arange(6),
+                                       np.arange(6) + isl_idx * 6)
+            self.assertEqual(len(src), 24)
+            np.testing.assert_allclose(all_uvs[src], all_uvs[dest])
+        self.assertIsNone(topology.match(np.arange(6), np.arange(18, 24)))
+
+
+class TestPacking(unittest.TestCase):
+
+    def assertNotOverlapped(self, bb_min, bb_max):
+        a, b = core.spatial.find_overlapped_bbox_pairs(bb_min + 1e-9,
+                                                       bb_max - 1e-9)
+        self.assertEqual(len(a), 0)
+
+    def test_pack_islands(self):
+        print("======== Pack Islands ========")
+        rng = np.random.RandomState(0)
+        sizes = rng.rand(200, 2) * (0.5, 0.2) + 0.01
+        margin = 0.01
+
+        for method in ['SKYLINE', 'MAXRECTS']:
+            for rotate in [False, True]:
+                print("[TEST] {0} (rotate={1})".format(method, rotate))
+                scale, positions, rotated, tiles = core.packing.pack_islands(
+                    sizes, method, margin, rotate)
+                self.assertEqual(tiles.tolist(), [0] * 200)
+                if not rotate:
+                    self.assertFalse(np.any(rotated))
+                rects = np.where(rotated[:, np.newaxis], sizes[:, ::-1],
+                                 sizes) * scale
+                self.assertNotOverlapped(positions - margin * 0.5,
+                                         positions + rects + margin * 0.5)
+                self.assertGreaterEqual(float(np.min(positions)),
+                                        margin * 0.5 - 1e-9)
+                self.assertLessEqual(float(np.max(positions + rects)),
+                                     1.0 - margin * 0.5 + 1e-9)
+
+        print("[TEST] Margin after overflow")
+        # these islands overflow the tile at the first packings
+        sizes = np.array([[0.162, 0.794], [0.754, 0.977], [0.885, 0.566]])
+        margin = 0.05
+        for method in ['SKYLINE', 'MAXRECTS']:
+            scale, positions, rotated, _ = core.packing.pack_islands(
+                sizes, method, margin)
+            rects = sizes * scale
+            self.assertNotOverlapped(positions - margin * 0.5,
+                                     positions + rects + margin * 0.5)
+            self.assertGreaterEqual(float(np.min(positions)),
+                                    margin * 0.5 - 1e-9)
+            self.assertLessEqual(float(np.max(positions + rects)),
+                                 1.0 - margin * 0.5 + 1e-9)
+
+        print("[TEST] Multi tile")
+        margin = 0.01
+        sizes = np.full((5, 2), 0.45)
+        scale, positions, rotated, tiles = core.packing.pack_islands(
+            sizes, 'SKYLINE', margin, multi_tile=True)
+        self.assertEqual(scale, 1.0)
+        self.assertEqual(tiles.tolist(), [0, 0, 0, 0, 1])
+        np.testing.assert_array_equal(
+            core.packing.get_udim_tile_offsets([0, 1, 12]),
+            [[0.0, 0.0], [1.0, 0.0], [2.0, 1.0]])
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_record(self):
+        print("======== Profiler ========")
+        profiler = core.profiler.Profiler()
+
+        print("[TEST] Phase outside of record is ignored")
+        with profiler.phase("gather"):
+            pass
+        profiler.count(faces=10)
+        self.assertEqual(len(profiler.records), 0)
+
+        print("[TEST] Record phases and counts")
+        profiler.begin("uv.muv_test.execute")
+        with profiler.phase("gather"):
+            data = [0] * 10000
+        with profiler.phase("compute"):
+            sum(data)
+        profiler.count(faces=10, loops=40)
+        rec = profiler.end({'FINISHED'})
+        self.assertEqual([p[0] for p in rec.phases], ["gather", "compute"])
+        self.assertEqual(rec.counts['loops'], 40)
+        self.assertFalse(rec.memory_traced)
+        self.assertGreaterEqual(rec.duration, sum(p[2] for p in rec.phases))
+
+        print("[TEST] Trace memory")
+        profiler.trace_memory = True
+        outer = profiler.begin("uv.muv_test.execute")
+        inner = profiler.begin("uv.muv_test.execute")
+        data = [0] * 100000
+        profiler.end({'FINISHED'}, keep=False)
+        del data
+        profiler.end({'FINISHED'}, keep=False)
+        profiler.trace_memory = False
+        self.assertTrue(outer.memory_traced)
+        self.assertGreater(inner.peak_memory, 100000)
+        self.assertGreaterEqual(outer.peak_memory, inner.peak_memory)
+
+        print("[TEST] Phase in other thread")
+        profiler.begin("uv.muv_test.modal")
+        worker = threading.Thread(
+            target=lambda: profiler.count(faces=1))
+        worker.start()
+        worker.join()
+        rec = profiler.end({'FINISHED'}, keep=False)
+        self.assertEqual(len(rec.counts), 0)
+
+        print("[TEST] Dropped record")
+        profiler.begin("uv.muv_test.modal")
+        profiler.end({'PASS_THROUGH'}, keep=False)
+        self.assertEqual(len(profiler.records), 1)
+        self.assertEqual(profiler.summary()[0][:2],
+                         ("uv.muv_test.execute", 1))
+
+        print("[TEST] Export")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "profile.csv")
+            profiler.export_csv(filepath)
+            with open(filepath) as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 4)
+            self.assertTrue(lines[0].endswith("faces,loops"))
+
+            filepath = os.path.join(tmpdir, "profile.json")
+            profiler.export_chrome_trace(filepath)
+            with open(filepath) as f:
+                events = json.load(f)['traceEvents']
+            self.assertEqual(len(events), 3)
+            self.assertEqual(events[0]['ph'], 'X')
+
+
+if __name__ == "__main__":
+    unittest.main()
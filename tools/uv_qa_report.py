@@ -0,0 +1,338 @@
+"""
+UV quality report of .blend files
+
+Overlapped UVs, flipped UVs and texel density of every UV map of every
+mesh are inspected without entering edit mode.  Files are processed in
+parallel, each one by a background Blender process.
+
+  python3 tools/uv_qa_report.py [options] FILE_OR_DIR ...
+
+Options:
+  --blender PATH          Blender executable (default: $BLENDER or blender)
+  --jobs 4                number of Blender processes run in parallel
+                          (default: number of CPUs)
+  --output FILE           write report to file (default: stdout)
+  --format json           report format (json, csv), which is guessed from
+                          the extension of output file if omitted
+  --self-overlap          also detect overlapped faces in the same island
+  --min-area 0.0          ignore overlaps whose area is smaller than this
+  --texel-tolerance 0.5   report faces whose texel density differs from the
+                          median of the UV map by more than this ratio
+  --timeout 600           seconds to wait for each file
+
+Directories are searched for .blend files recursively.
+Exit status is 1 when any overlapped or flipped UV, texel density outlier
+or failed file is found, so this can be used to gate asset check-ins.
+"""
+
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+
+ADDON_NAME = "uv_magic_uv"
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CSV_COLUMNS = [
+    "file", "object", "mesh", "uv_map", "faces",
+    "overlapped_pairs", "overlapped_faces", "overlapped_area",
+    "flipped_faces",
+    "texel_density_min", "texel_density_median", "texel_density_max",
+    "texel_outlier_faces", "no_image_faces",
+    "overlapped_face_indices", "flipped_face_indices",
+    "texel_outlier_face_indices", "error",
+]
+
+
+# ---------------------------------------------------------------------
+# worker (run in background Blender)
+# ---------------------------------------------------------------------
+
+def inspect_texel_density(obj, uv_layer, tolerance):
+    import numpy as np
+    common = sys.modules[ADDON_NAME + ".common"]
+
+    info = common.measure_face_areas_from_mesh(obj, uv_layer)
+    if info['texel_areas'] is None:
+        texel_areas = np.full(len(info['faces']), np.nan)
+    else:
+        texel_areas = info['texel_areas']
+    mesh_areas = info['mesh_areas']
+    valid = ~np.isnan(texel_areas) & (mesh_areas > 0.0)
+    density = np.full(len(texel_areas), np.nan)
+    density[valid] = np.sqrt(texel_areas[valid] / mesh_areas[valid])
+
+    result = {
+        "min": None,
+        "median": None,
+        "max": None,
+        "outlier_faces": [],
+        "no_image_faces": int(np.sum(np.isnan(texel_areas))),
+    }
+    if not np.any(valid):
+        return result
+
+    median = float(np.median(density[valid]))
+    result["min"] = float(np.min(density[valid]))
+    result["median"] = median
+    result["max"] = float(np.max(density[valid]))
+    if (tolerance is not None) and (median > 0.0):
+        outlier = valid.copy()
+        outlier[valid] = np.fabs(density[valid] / median - 1.0) > tolerance
+        result["outlier_faces"] = info['faces'][outlier].tolist()
+
+    return result
+
+
+def inspect_file(args):
+    uv_inspection = sys.modules[ADDON_NAME + ".op.uv_inspection"]
+
+    reports = []
+    inspected = {}
+    for obj in bpy.data.objects:
+        if obj.type != 'MESH':
+            continue
+        if obj.mode == 'EDIT':
+            obj.update_from_editmode()
+        mesh = obj.data
+        # mesh shared by objects is inspected only once
+        if mesh.name in inspected:
+            inspected[mesh.name]["objects"].append(obj.name)
+            continue
+
+        uv_maps = []
+        for uv_layer in mesh.uv_layers:
+            insp = uv_inspection.inspect_mesh_uv(
+                mesh, uv_layer, args.self_overlap, args.min_area)
+            overlapped = insp["overlapped"]
+            faces = set()
+            for a, b, _ in overlapped:
+                faces.add(a)
+                faces.add(b)
+            uv_maps.append({
+                "name": uv_layer.name,
+                "overlapped": {
+                    "pairs": len(overlapped),
+                    "area": sum(area for _, _, area in overlapped),
+                    "faces": sorted(faces),
+                },
+                "flipped": {
+                    "faces": insp["flipped"],
+                },
+                "texel_density": inspect_texel_density(
+                    obj, uv_layer, args.texel_tolerance),
+            })
+
+        report = {
+            "mesh": mesh.name,
+            "objects": [obj.name],
+            "faces": len(mesh.polygons),
+            "uv_maps": uv_maps,
+        }
+        inspected[mesh.name] = report
+        reports.append(report)
+
+    return reports
+
+
+def run_worker(args):
+    # use the add-on in this repository, which is not needed to be
+    # installed
+    sys.path.insert(0, REPO_DIR)
+    __import__(ADDON_NAME + ".common")
+    __import__(ADDON_NAME + ".op.uv_inspection")
+
+    result = {"file": bpy.data.filepath, "meshes": inspect_file(args)}
+    with open(args.worker_output, "w") as f:
+        json.dump(result, f)
+
+
+# ---------------------------------------------------------------------
+# driver
+# ---------------------------------------------------------------------
+
+def find_blend_files(paths):
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for root, _, names in os.walk(path):
+            for name in sorted(names):
+                if name.endswith(".blend"):
+                    files.append(os.path.join(root, name))
+
+    return files
+
+
+def process_file(filepath, args):
+    fd, output = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    cmd = [args.blender, "--background", "--factory-startup", "-noaudio",
+           "--disable-autoexec", filepath,
+           "--python", os.path.abspath(__file__), "--",
+           "--worker-output", output, "--min-area", str(args.min_area)]
+    if args.self_overlap:
+        cmd.append("--self-overlap")
+    if args.texel_tolerance is not None:
+        cmd.extend(["--texel-tolerance", str(args.texel_tolerance)])
+
+    try:
+        # subprocess.run is not available in Python 3.4
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        try:
+            stdout, _ = proc.communicate(timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            return {"file": filepath, "meshes": [],
+                    "error": "Timed out after {0}s".format(args.timeout)}
+        if os.path.getsize(output) == 0:
+            lines = stdout.decode("utf-8", "replace").splitlines()
+            return {"file": filepath, "meshes": [],
+                    "error": "Blender exited with status {0}: {1}".format(
+                        proc.returncode, lines[-1] if lines else "")}
+        with open(output) as f:
+            result = json.load(f)
+        result["file"] = filepath
+        return result
+    except ValueError as e:
+        # worker crashed while writing the result
+        return {"file": filepath, "meshes": [],
+                "error": "Broken result (Blender exited with status "
+                         "{0}): {1}".format(proc.returncode, e)}
+    except OSError as e:
+        return {"file": filepath, "meshes": [], "error": str(e)}
+    finally:
+        os.remove(output)
+
+
+def has_problem(result):
+    if result.get("error"):
+        return True
+    for mesh in result["meshes"]:
+        for uv_map in mesh["uv_maps"]:
+            if uv_map["overlapped"]["pairs"] or uv_map["flipped"]["faces"] \
+                    or uv_map["texel_density"]["outlier_faces"]:
+                return True
+
+    return False
+
+
+def to_csv_rows(results):
+    def join(indices):
+        return " ".join(str(i) for i in indices)
+
+    rows = []
+    for result in results:
+        if result.get("error"):
+            rows.append({"file": result["file"], "error": result["error"]})
+        for mesh in result["meshes"]:
+            for uv_map in mesh["uv_maps"]:
+                overlapped = uv_map["overlapped"]
+                flipped = uv_map["flipped"]
+                texel = uv_map["texel_density"]
+                rows.append({
+                    "file": result["file"],
+                    "object": " ".join(mesh["objects"]),
+                    "mesh": mesh["mesh"],
+                    "uv_map": uv_map["name"],
+                    "faces": mesh["faces"],
+                    "overlapped_pairs": overlapped["pairs"],
+                    "overlapped_faces": len(overlapped["faces"]),
+                    "overlapped_area": overlapped["area"],
+                    "flipped_faces": len(flipped["faces"]),
+                    "texel_density_min": texel["min"],
+                    "texel_density_median": texel["median"],
+                    "texel_density_max": texel["max"],
+                    "texel_outlier_faces": len(texel["outlier_faces"]),
+                    "no_image_faces": texel["no_image_faces"],
+                    "overlapped_face_indices": join(overlapped["faces"]),
+                    "flipped_face_indices": join(flipped["faces"]),
+                    "texel_outlier_face_indices":
+                        join(texel["outlier_faces"]),
+                })
+
+    return rows
+
+
+def write_report(results, output, fmt):
+    f = open(output, "w", newline="") if output else sys.stdout
+    try:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+            writer.writeheader()
+            writer.writerows(to_csv_rows(results))
+        else:
+            json.dump({"files": results}, f, indent=2)
+            f.write("\n")
+    finally:
+        if output:
+            f.close()
+
+
+def run_driver(args):
+    files = find_blend_files(args.files)
+    if not files:
+        print("No .blend file is found", file=sys.stderr)
+        return 1
+
+    jobs = args.jobs or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = list(executor.map(lambda f: process_file(f, args), files))
+    for result in results:
+        print("{0}: {1}".format(
+            result["file"], result.get("error") or
+            ("NG" if has_problem(result) else "OK")), file=sys.stderr)
+
+    fmt = args.format
+    if fmt is None:
+        fmt = "csv" if (args.output or "").endswith(".csv") else "json"
+    write_report(results, args.output, fmt)
+
+    return 1 if any(has_problem(r) for r in results) else 0
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="UV quality report of .blend files")
+    parser.add_argument("files", nargs="*", help=".blend files or dirs")
+    parser.add_argument("--blender",
+                        default=os.environ.get("BLENDER", "blender"))
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--format", choices=["json", "csv"], default=None)
+    parser.add_argument("--self-overlap", action="store_true")
+    parser.add_argument("--min-area", type=float, default=0.0)
+    parser.add_argument("--texel-tolerance", type=float, default=None)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--worker-output", default=None,
+                        help=argparse.SUPPRESS)
+
+    return parser.parse_args(argv)
+
+
+def main():
+    if bpy is not None:
+        # arguments after "--" are passed from Blender
+        argv = sys.argv[sys.argv.index("--") + 1:] \
+            if "--" in sys.argv else []
+        run_worker(parse_args(argv))
+        return 0
+
+    return run_driver(parse_args(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -42,12 +42,14 @@ bl_info = {
 
 if "bpy" in locals():
     import importlib
+    importlib.reload(core)
     importlib.reload(op)
     importlib.reload(ui)
     importlib.reload(common)
     importlib.reload(preferences)
     importlib.reload(properites)
 else:
+    from . import core
     from . import op
     from . import ui
     from . import common
@@ -58,8 +60,16 @@ import bpy
 
 
 def register():
+    common.instrument_operators(op)
     bpy.utils.register_module(__name__)
     properites.init_props(bpy.types.Scene)
+    bpy.app.handlers.scene_update_post.append(
+        common.island_cache_update_handler)
+    bpy.app.handlers.load_post.append(common.island_cache_load_handler)
+    bpy.app.handlers.scene_update_post.append(
+        op.uv_inspection.uvinsp_live_update_handler)
+    bpy.app.handlers.load_post.append(
+        op.uv_inspection.inspection_cache_load_handler)
     if preferences.MUV_Preferences.enable_builtin_menu:
         preferences.add_builtin_menu()
 
@@ -67,6 +77,16 @@ def register():
 def unregister():
     if preferences.MUV_Preferences.enable_builtin_menu:
         preferences.remove_builtin_menu()
+    bpy.app.handlers.load_post.remove(
+        op.uv_inspection.inspection_cache_load_handler)
+    bpy.app.handlers.scene_update_post.remove(
+        op.uv_inspection.uvinsp_live_update_handler)
+    op.uv_inspection.inspection_cache.invalidate()
+    op.pack_uv.island_mapping_cache.invalidate()
+    bpy.app.handlers.load_post.remove(common.island_cache_load_handler)
+    bpy.app.handlers.scene_update_post.remove(
+        common.island_cache_update_handler)
+    common.island_cache.invalidate()
     properites.clear_props(bpy.types.Scene)
     bpy.utils.unregister_module(__name__)
 
@@ -23,13 +23,18 @@ __status__ = "production"
 __version__ = "5.1"
 __date__ = "24 Feb 2018"
 
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
 from pprint import pprint
-from math import fabs, sqrt
 
 import bpy
+from bpy.app.handlers import persistent
 from mathutils import Vector
 import bmesh
+import numpy as np
+
+from . import core
 
 
 __all__ = [
@@ -38,12 +43,30 @@ __all__ = [
     'check_version',
     'redraw_all_areas',
     'get_space',
+    'profiler',
+    'is_profiling_enabled',
+    'instrument_operators',
+    'MeshArrays',
+    'IslandTable',
+    'get_island_table',
+    'get_island_table_from_bmesh',
+    'get_island_table_from_faces',
+    'get_island_table_from_mesh',
+    'get_island_tables',
+    'set_mesh_uvs',
+    'IslandCache',
+    'island_cache',
+    'island_cache_update_handler',
+    'island_cache_load_handler',
+    'update_edit_mesh',
     'get_island_info',
     'get_island_info_from_bmesh',
     'get_island_info_from_faces',
     'get_uvimg_editor_board_size',
     'calc_polygon_2d_area',
     'calc_polygon_3d_area',
+    'measure_face_areas',
+    'measure_face_areas_from_mesh',
     'measure_mesh_area',
     'measure_uv_area',
     'diff_point_to_segment',
@@ -53,6 +76,9 @@ __all__ = [
 
 DEBUG = False
 
+# number of island tables which are kept in island cache
+ISLAND_CACHE_SIZE = 8
+
 
 def debug_print(*s):
     """
@@ -110,112 +136,443 @@ def get_space(area_type, region_type, space_type):
     return (area, region, space)
 
 
-def __get_island_info(uv_layer, islands):
+# records timings of operators while profiling is enabled in preferences
+profiler = core.profiler.Profiler()
+
+
+def is_profiling_enabled():
+    addon = bpy.context.user_preferences.addons.get(__package__)
+    if addon is None:
+        return False
+
+    return addon.preferences.enable_profiler
+
+
+def __is_memory_tracing_enabled():
+    addon = bpy.context.user_preferences.addons.get(__package__)
+    if addon is None:
+        return False
+
+    return addon.preferences.profiler_trace_memory
+
+
+def __count_elements(context, with_loops):
+    """
+    Count faces and loops of the mesh being edited
+    """
+
+    obj = context.active_object
+    if (obj is None) or (obj.type != 'MESH'):
+        return {}
+    if obj.mode != 'EDIT':
+        return {'faces': len(obj.data.polygons),
+                'loops': len(obj.data.loops)}
+
+    bm = bmesh.from_edit_mesh(obj.data)
+    counts = {'faces': len(bm.faces)}
+    if with_loops:
+        counts['loops'] = sum(len(f.loops) for f in bm.faces)
+
+    return counts
+
+
+def __profile_method(name, method, is_modal):
+    """
+    Wrap execute/modal method of operator to record its profile
+    bmesh.update_edit_mesh is timed as the phase while the method runs.
+    Modal calls which only pass the event through are dropped to keep
+    mouse moves from flooding the records.
+    """
+
+    def update_edit_mesh(*args, **kwargs):
+        with profiler.phase("update_edit_mesh"):
+            return orig_update_edit_mesh(*args, **kwargs)
+
+    orig_update_edit_mesh = bmesh.update_edit_mesh
+
+    def call(self, context, *args):
+        if not is_profiling_enabled() or profiler.is_recording():
+            return method(self, context, *args)
+
+        counts = __count_elements(context, not is_modal)
+        profiler.trace_memory = __is_memory_tracing_enabled()
+        rec = profiler.begin(name)
+        rec.counts.update(counts)
+        bmesh.update_edit_mesh = update_edit_mesh
+        result = None
+        try:
+            result = method(self, context, *args)
+        finally:
+            bmesh.update_edit_mesh = orig_update_edit_mesh
+            keep = not is_modal or (result != {'PASS_THROUGH'}) or \
+                len(rec.phases) > 0
+            profiler.end(result, keep)
+
+        return result
+
+    # Blender checks the number of arguments of execute/modal
+    if is_modal:
+        def wrapper(self, context, event):
+            return call(self, context, event)
+    else:
+        def wrapper(self, context):
+            return call(self, context)
+
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    wrapper.muv_profiled = True
+
+    return wrapper
+
+
+def instrument_operators(package):
+    """
+    Wrap execute/modal methods of all operators in package for profiling
+    """
+
+    for mod_name in dir(package):
+        mod = getattr(package, mod_name)
+        if not getattr(mod, '__name__', "").startswith(package.__name__):
+            continue
+        for cls_name in getattr(mod, '__all__', []):
+            cls = getattr(mod, cls_name)
+            if not isinstance(cls, type) or \
+                    not issubclass(cls, bpy.types.Operator):
+                continue
+            if getattr(cls, 'muv_profile_disabled', False):
+                continue
+            for method_name in ['execute', 'modal']:
+                method = cls.__dict__.get(method_name)
+                if (method is None) or getattr(method, 'muv_profiled', False):
+                    continue
+                name = "{0}.{1}".format(cls.bl_idname, method_name)
+                setattr(cls, method_name,
+                        __profile_method(name, method,
+                                         method_name == 'modal'))
+
+
+class MeshArrays():
     """
-    get information about each island
+    Snapshot of mesh data of faces in contiguous arrays
+    Each array is gathered by one bulk pass over the loops on its first
+    access, so that only the data used by the caller is read.
+    After editing the arrays in place, write_back() writes only the loops
+    (or faces) whose data has been changed.  Seams are written per edge,
+    and the last loop of the edge wins as when writing in loop order.
+    BMesh has no foreach_get/foreach_set, so the snapshot of the mesh in
+    edit mode is made by iterating the loops once.
+
+    Per face:   offsets (num_face + 1), face_select
+    Per loop:   uvs, pin_uvs, uv_select, seams, cos, loop_verts,
+                loop_edges
     """
 
-    island_info = []
-    for isl in islands:
-        info = {}
-        max_uv = Vector((-10000000.0, -10000000.0))
-        min_uv = Vector((10000000.0, 10000000.0))
-        ave_uv = Vector((0.0, 0.0))
-        num_uv = 0
-        for face in isl:
-            n = 0
-            a = Vector((0.0, 0.0))
-            ma = Vector((-10000000.0, -10000000.0))
-            mi = Vector((10000000.0, 10000000.0))
-            for l in face['face'].loops:
+    def __init__(self, bm, uv_layer, faces):
+        self.bm = bm
+        self.uv_layer = uv_layer
+        self.faces = faces
+        self.loops = [l for f in faces for l in f.loops]
+        counts = [len(f.loops) for f in faces]
+        self.offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.offsets[1:])
+        self.__snapshot = {}
+
+    def __len__(self):
+        return len(self.loops)
+
+    def __gather(self, name):
+        loops = self.loops
+        uv_layer = self.uv_layer
+        if name == 'uvs':
+            data = np.array([c for l in loops for c in l[uv_layer].uv],
+                            dtype=np.float64).reshape(-1, 2)
+        elif name == 'pin_uvs':
+            data = np.array([l[uv_layer].pin_uv for l in loops], dtype=bool)
+        elif name == 'uv_select':
+            data = np.array([l[uv_layer].select for l in loops], dtype=bool)
+        elif name == 'seams':
+            data = np.array([l.edge.seam for l in loops], dtype=bool)
+        elif name == 'cos':
+            data = np.array([c for l in loops for c in l.vert.co],
+                            dtype=np.float64).reshape(-1, 3)
+        elif name == 'loop_verts':
+            data = np.array([l.vert.index for l in loops], dtype=np.int64)
+        elif name == 'loop_edges':
+            data = np.array([l.edge.index for l in loops], dtype=np.int64)
+        elif name == 'face_select':
+            data = np.array([f.select for f in self.faces], dtype=bool)
+        else:
+            raise AttributeError(name)
+
+        return data
+
+    def __getattr__(self, name):
+        # called only when the array has not been gathered yet
+        if name.startswith('_'):
+            raise AttributeError(name)
+        with profiler.phase("gather"):
+            data = self.__gather(name)
+        self.__snapshot[name] = data.copy()
+        setattr(self, name, data)
+
+        return data
+
+    def changed_indices(self, name):
+        """
+        Get indices of elements which are changed from the snapshot
+        """
+
+        if name not in self.__snapshot:
+            return np.zeros(0, dtype=np.int64)
+        data = getattr(self, name)
+        diff = data != self.__snapshot[name]
+        if diff.ndim > 1:
+            diff = np.any(diff, axis=1)
+
+        return np.flatnonzero(diff)
+
+    def write_back(self):
+        """
+        Write changed data back to bmesh
+        Return number of changed elements
+        """
+
+        num_changed = 0
+        loops = self.loops
+        uv_layer = self.uv_layer
+        with profiler.phase("write-back"):
+            if 'seams' in self.__snapshot:
+                # seam is stored per loop but written per edge, so the
+                # loops sharing the edge take the value of the last loop
+                last = core.geometry.get_last_loops_of_edges(self.loop_edges)
+                self.seams[:] = self.seams[last]
+            for name in list(self.__snapshot.keys()):
+                indices = self.changed_indices(name)
+                if len(indices) == 0:
+                    continue
+                data = getattr(self, name)
+                values = data[indices].tolist()
+                indices = indices.tolist()
+                if name == 'uvs':
+                    for i, v in zip(indices, values):
+                        loops[i][uv_layer].uv = v
+                elif name == 'pin_uvs':
+                    for i, v in zip(indices, values):
+                        loops[i][uv_layer].pin_uv = v
+                elif name == 'uv_select':
+                    for i, v in zip(indices, values):
+                        loops[i][uv_layer].select = v
+                elif name == 'seams':
+                    for i, v in zip(indices, values):
+                        loops[i].edge.seam = v
+                elif name == 'cos':
+                    for i, v in zip(indices, values):
+                        loops[i].vert.co = v
+                elif name == 'face_select':
+                    for i, v in zip(indices, values):
+                        self.faces[i].select = v
+                else:
+                    raise ValueError("{0} is read only".format(name))
+                self.__snapshot[name] = data.copy()
+                num_changed = num_changed + len(indices)
+
+        return num_changed
+
+
+class IslandTable(core.island.IslandTable):
+    """
+    Island information stored as arrays, with the faces of bmesh
+    """
+
+    def __init__(self, faces, face_island, loop_offsets, uvs,
+                 loop_indices=None, loop_verts=None):
+        super().__init__(face_island, loop_offsets, uvs, loop_verts)
+        # BMFaces, or polygon indices for the mesh in object mode
+        self.faces = faces
+        # indices of mesh loops (only for the mesh in object mode)
+        self.loop_indices = loop_indices
+
+    def to_island_info(self):
+        """
+        Build the list of dictionaries used by the callers which still
+        want the old island information
+        """
+
+        face_max_uv = self.face_max_uv.tolist()
+        face_min_uv = self.face_min_uv.tolist()
+        face_ave_uv = self.face_ave_uv.tolist()
+        island_max_uv = self.island_max_uv.tolist()
+        island_min_uv = self.island_min_uv.tolist()
+        island_center = self.island_center.tolist()
+        island_size = self.island_size.tolist()
+
+        island_info = []
+        for isl_idx in range(len(self)):
+            faces = []
+            for fidx in self.island_faces(isl_idx).tolist():
+                faces.append({
+                    'face': self.faces[fidx],
+                    'max_uv': Vector(face_max_uv[fidx]),
+                    'min_uv': Vector(face_min_uv[fidx]),
+                    'ave_uv': Vector(face_ave_uv[fidx]),
+                })
+            island_info.append({
+                'center': Vector(island_center[isl_idx]),
+                'size': Vector(island_size[isl_idx]),
+                'num_uv': int(self.island_num_uv[isl_idx]),
+                'group': -1,
+                'faces': faces,
+                'max': Vector(island_max_uv[isl_idx]),
+                'min': Vector(island_min_uv[isl_idx]),
+            })
+
+        return island_info
+
+
+def __get_island(faces, uv_layer):
+    """
+    Get island table
+    UVs and vertex indices are gathered in one pass, and islands are
+    detected on the arrays.
+    """
+
+    with profiler.phase("gather"):
+        uvs = []
+        loop_verts = []
+        loop_offsets = [0]
+        for f in faces:
+            for l in f.loops:
                 uv = l[uv_layer].uv
-                ma.x = max(uv.x, ma.x)
-                ma.y = max(uv.y, ma.y)
-                mi.x = min(uv.x, mi.x)
-                mi.y = min(uv.y, mi.y)
-                a = a + uv
-                n = n + 1
-            ave_uv = ave_uv + a
-            num_uv = num_uv + n
-            a = a / n
-            max_uv.x = max(ma.x, max_uv.x)
-            max_uv.y = max(ma.y, max_uv.y)
-            min_uv.x = min(mi.x, min_uv.x)
-            min_uv.y = min(mi.y, min_uv.y)
-            face['max_uv'] = ma
-            face['min_uv'] = mi
-            face['ave_uv'] = a
-        ave_uv = ave_uv / num_uv
-
-        info['center'] = ave_uv
-        info['size'] = max_uv - min_uv
-        info['num_uv'] = num_uv
-        info['group'] = -1
-        info['faces'] = isl
-        info['max'] = max_uv
-        info['min'] = min_uv
-
-        island_info.append(info)
-
-    return island_info
-
-
-def __parse_island(bm, face_idx, faces_left, island,
-                   face_to_verts, vert_to_faces):
-    """
-    Parse island
-    """
-
-    if face_idx in faces_left:
-        faces_left.remove(face_idx)
-        island.append({'face': bm.faces[face_idx]})
-        for v in face_to_verts[face_idx]:
-            connected_faces = vert_to_faces[v]
-            if connected_faces:
-                for cf in connected_faces:
-                    __parse_island(bm, cf, faces_left, island, face_to_verts,
-                                   vert_to_faces)
-
-
-def __get_island(bm, face_to_verts, vert_to_faces):
-    """
-    Get island list
-    """
-
-    uv_island_lists = []
-    faces_left = set(face_to_verts.keys())
-    while faces_left:
-        current_island = []
-        face_idx = list(faces_left)[0]
-        __parse_island(bm, face_idx, faces_left, current_island,
-                       face_to_verts, vert_to_faces)
-        uv_island_lists.append(current_island)
-
-    return uv_island_lists
-
-
-def __create_vert_face_db(faces, uv_layer):
-    # create mesh database for all faces
-    face_to_verts = defaultdict(set)
-    vert_to_faces = defaultdict(set)
-    for f in faces:
-        for l in f.loops:
-            id_ = l[uv_layer].uv.to_tuple(5), l.vert.index
-            face_to_verts[f.index].add(id_)
-            vert_to_faces[id_].add(f.index)
+                uvs.append((uv.x, uv.y))
+                loop_verts.append(l.vert.index)
+            loop_offsets.append(len(uvs))
 
-    return (face_to_verts, vert_to_faces)
+        uvs = np.array(uvs, dtype=np.float64).reshape(-1, 2)
+        loop_verts = np.array(loop_verts, dtype=np.int64)
+        loop_offsets = np.array(loop_offsets, dtype=np.int64)
 
+    with profiler.phase("compute"):
+        face_island = core.island.find_islands(uvs, loop_verts,
+                                               loop_offsets)
+        table = IslandTable(faces, face_island, loop_offsets, uvs,
+                            loop_verts=loop_verts)
 
-def get_island_info(obj, only_selected=True):
+    return table
+
+
+class IslandCache():
+    """
+    LRU cache of island tables shared among operators
+    Entries are keyed on the identity of bmesh, the name of UV layer and
+    the version counter of bmesh.  The counter is bumped whenever bmesh is
+    invalidated by the scene update handler or by the operators writing
+    UVs, so the stale entries are never hit without visiting mesh data.
+    """
+
+    def __init__(self, max_size=ISLAND_CACHE_SIZE):
+        self.__entries = OrderedDict()
+        self.__versions = {}
+        self.__max_size = max_size
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def version(self, bm):
+        return self.__versions.get(id(bm), 0)
+
+    def __make_key(self, bm, uv_layer, key):
+        return (id(bm), uv_layer.name, self.version(bm), key)
+
+    def get(self, bm, uv_layer, key=None):
+        key = self.__make_key(bm, uv_layer, key)
+        entry = self.__entries.get(key)
+        if entry is None:
+            return None
+        # identity of bmesh may be reused after bmesh is freed
+        if entry[0] is not bm or not bm.is_valid:
+            del self.__entries[key]
+            return None
+        self.__entries.move_to_end(key)
+
+        return entry[1]
+
+    def put(self, bm, uv_layer, key, table):
+        key = self.__make_key(bm, uv_layer, key)
+        self.__entries[key] = (bm, table)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__max_size:
+            self.__entries.popitem(last=False)
+
+    def invalidate(self, bm=None):
+        if bm is None:
+            self.__entries.clear()
+            self.__versions.clear()
+            return
+        self.__versions[id(bm)] = self.version(bm) + 1
+        for key in [k for k in self.__entries.keys() if k[0] == id(bm)]:
+            del self.__entries[key]
+
+
+island_cache = IslandCache()
+
+
+@persistent
+def island_cache_update_handler(scene):
+    """
+    Invalidate island cache when the mesh in edit mode is updated
+    """
+
+    if len(island_cache) == 0:
+        return
+    obj = scene.objects.active
+    if (obj is None) or (obj.type != 'MESH') or (obj.mode != 'EDIT'):
+        island_cache.invalidate()
+        return
+    if obj.is_updated_data:
+        island_cache.invalidate(bmesh.from_edit_mesh(obj.data))
+
+
+@persistent
+def island_cache_load_handler(_):
+    island_cache.invalidate()
+
+
+def update_edit_mesh(mesh, tessface=True, destructive=True):
+    """
+    Update the mesh in edit mode after UVs are written
+    Island cache of the mesh is invalidated here, because the scene update
+    handler does not run until the operator returns.
+    """
+
+    island_cache.invalidate(bmesh.from_edit_mesh(mesh))
+    bmesh.update_edit_mesh(mesh, tessface, destructive)
+
+
+def get_island_table_from_faces(bm, faces, uv_layer):
+    # selecting faces does not tag the mesh to be updated, so the entry is
+    # keyed on the digest of indices of the faces (in the given order)
+    indices = np.fromiter((f.index for f in faces), dtype=np.int64,
+                          count=len(faces))
+    selection = (len(faces), hash(indices.tobytes()))
+    table = island_cache.get(bm, uv_layer, selection)
+    if table is None:
+        table = __get_island(faces, uv_layer)
+        island_cache.put(bm, uv_layer, selection, table)
+    else:
+        debug_print("Island cache hit")
+
+    return table
+
+
+def get_island_table(obj, only_selected=True):
     bm = bmesh.from_edit_mesh(obj.data)
     if check_version(2, 73, 0) >= 0:
         bm.faces.ensure_lookup_table()
 
-    return get_island_info_from_bmesh(bm, only_selected)
+    return get_island_table_from_bmesh(bm, only_selected)
 
 
-def get_island_info_from_bmesh(bm, only_selected=True):
+def get_island_table_from_bmesh(bm, only_selected=True):
     if not bm.loops.layers.uv:
         return None
     uv_layer = bm.loops.layers.uv.verify()
@@ -226,17 +583,145 @@ def get_island_info_from_bmesh(bm, only_selected=True):
     else:
         selected_faces = [f for f in bm.faces]
 
-    return get_island_info_from_faces(bm, selected_faces, uv_layer)
+    return get_island_table_from_faces(bm, selected_faces, uv_layer)
 
 
-def get_island_info_from_faces(bm, faces, uv_layer):
-    ftv, vtf = __create_vert_face_db(faces, uv_layer)
+def __get_mesh_island_arrays(mesh, only_selected, uv_layer=None):
+    """
+    Get arrays to detect islands from mesh in object mode
+    Mesh data is read by foreach_get in bulk.
+    """
+
+    if uv_layer is None:
+        uv_layer = mesh.uv_layers.active
+    if uv_layer is None:
+        return None
+
+    num_loop = len(mesh.loops)
+    num_poly = len(mesh.polygons)
+    uvs = np.empty(num_loop * 2, dtype=np.float32)
+    uv_layer.data.foreach_get("uv", uvs)
+    loop_verts = np.empty(num_loop, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    loop_start = np.empty(num_poly, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    loop_total = np.empty(num_poly, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+
+    if only_selected:
+        select = np.zeros(num_poly, dtype=bool)
+        mesh.polygons.foreach_get("select", select)
+        polys = np.flatnonzero(select)
+    else:
+        polys = np.arange(num_poly)
+
+    counts = loop_total[polys].astype(np.int64)
+    offsets = np.zeros(len(polys) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    loop_indices = np.repeat(loop_start[polys] - offsets[:-1], counts) + \
+        np.arange(offsets[-1])
+
+    return (polys, offsets,
+            uvs.reshape(-1, 2)[loop_indices].astype(np.float64),
+            loop_verts[loop_indices].astype(np.int64), loop_indices)
+
+
+def __calc_mesh_island_table(arrays):
+    polys, offsets, uvs, loop_verts, loop_indices = arrays
+    face_island = core.island.find_islands(uvs, loop_verts, offsets)
+
+    return IslandTable(polys, face_island, offsets, uvs, loop_indices,
+                       loop_verts)
 
-    # Get island information
-    uv_island_lists = __get_island(bm, ftv, vtf)
-    island_info = __get_island_info(uv_layer, uv_island_lists)
 
-    return island_info
+def get_island_table_from_mesh(mesh, only_selected=True, uv_layer=None):
+    arrays = __get_mesh_island_arrays(mesh, only_selected, uv_layer)
+    if arrays is None:
+        return None
+
+    return __calc_mesh_island_table(arrays)
+
+
+def get_island_tables(objects, only_selected=True, num_workers=None):
+    """
+    Get island tables of objects
+    Return list of (object, island table) for objects which have UV map.
+    The mesh in edit mode is read through bmesh, and the other meshes are
+    read through foreach_get.  Data is read on the main thread because bpy
+    is not thread-safe, and islands are detected in the worker pool.
+    """
+
+    tables = OrderedDict()
+    jobs = []
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        if obj.mode == 'EDIT':
+            table = get_island_table(obj, only_selected)
+        else:
+            with profiler.phase("gather"):
+                arrays = __get_mesh_island_arrays(obj.data, only_selected)
+            if arrays is not None:
+                jobs.append((obj, arrays))
+            table = None
+        tables[obj] = table
+
+    if jobs:
+        num_workers = num_workers or min(len(jobs), os.cpu_count() or 1)
+        with profiler.phase("compute"):
+            if num_workers > 1:
+                with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                    results = executor.map(__calc_mesh_island_table,
+                                           [a for _, a in jobs])
+                    for (obj, _), table in zip(jobs, results):
+                        tables[obj] = table
+            else:
+                for obj, arrays in jobs:
+                    tables[obj] = __calc_mesh_island_table(arrays)
+
+    return [(obj, table) for obj, table in tables.items()
+            if table is not None]
+
+
+def set_mesh_uvs(mesh, loop_indices, uvs, uv_layer=None):
+    """
+    Set UVs of loops of mesh in object mode
+    Mesh data is read and written by foreach_get/foreach_set in bulk.
+    """
+
+    if uv_layer is None:
+        uv_layer = mesh.uv_layers.active
+    if uv_layer is None:
+        return
+
+    data = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    uv_layer.data.foreach_get("uv", data)
+    data = data.reshape(-1, 2)
+    data[loop_indices] = uvs
+    uv_layer.data.foreach_set("uv", data.ravel())
+    mesh.update()
+
+
+def get_island_info(obj, only_selected=True):
+    table = get_island_table(obj, only_selected)
+    if table is None:
+        return None
+
+    return table.to_island_info()
+
+
+def get_island_info_from_bmesh(bm, only_selected=True):
+    table = get_island_table_from_bmesh(bm, only_selected)
+    if table is None:
+        return None
+
+    return table.to_island_info()
+
+
+def get_island_info_from_faces(bm, faces, uv_layer):
+    table = get_island_table_from_faces(bm, faces, uv_layer)
+
+    return table.to_island_info()
 
 
 def get_uvimg_editor_board_size(area):
@@ -247,92 +732,199 @@ def get_uvimg_editor_board_size(area):
 
 
 def calc_polygon_2d_area(points):
-    area = 0.0
-    for i, p1 in enumerate(points):
-        p2 = points[(i + 1) % len(points)]
-        v1 = p1 - points[0]
-        v2 = p2 - points[0]
-        a = v1.x * v2.y - v1.y * v2.x
-        area = area + a
+    offsets = np.array([0, len(points)])
+    areas = core.geometry.calc_polygon_2d_area(
+        np.array([(p.x, p.y) for p in points]), offsets)
 
-    return fabs(0.5 * area)
+    return float(areas[0])
 
 
 def calc_polygon_3d_area(points):
-    area = 0.0
-    for i, p1 in enumerate(points):
-        p2 = points[(i + 1) % len(points)]
-        v1 = p1 - points[0]
-        v2 = p2 - points[0]
-        cx = v1.y * v2.z - v1.z * v2.y
-        cy = v1.z * v2.x - v1.x * v2.z
-        cz = v1.x * v2.y - v1.y * v2.x
-        a = sqrt(cx * cx + cy * cy + cz * cz)
-        area = area + a
+    offsets = np.array([0, len(points)])
+    areas = core.geometry.calc_polygon_3d_area(
+        np.array([(p.x, p.y, p.z) for p in points]), offsets)
 
-    return 0.5 * area
+    return float(areas[0])
 
 
-def measure_mesh_area(obj):
-    bm = bmesh.from_edit_mesh(obj.data)
-    if check_version(2, 73, 0) >= 0:
-        bm.verts.ensure_lookup_table()
-        bm.edges.ensure_lookup_table()
-        bm.faces.ensure_lookup_table()
+def __get_node_image(mat):
+    """
+    Get image from texture node of material
+    """
 
-    sel_faces = [f for f in bm.faces if f.select]
+    if (mat is None) or (mat.node_tree is None):
+        return None
 
-    # measure
-    mesh_area = 0.0
-    for f in sel_faces:
-        verts = [l.vert.co for l in f.loops]
-        f_mesh_area = calc_polygon_3d_area(verts)
-        mesh_area = mesh_area + f_mesh_area
+    img = None
+    tex_node_types = [
+        'TEX_ENVIRONMENT',
+        'TEX_IMAGE',
+    ]
+    for node in mat.node_tree.nodes:
+        if (node.type in tex_node_types) and node.image:
+            img = node.image
 
-    return mesh_area
+    return img
 
 
-def measure_uv_area(obj):
+def __get_face_images(obj, face_images, material_indices):
+    """
+    Get image of each face
+    When face has no image, it is searched from node tree of the material
+    only once per material
+    """
+
+    mat_images = {}
+
+    def get_material_image(mat_idx):
+        if mat_idx in mat_images:
+            return mat_images[mat_idx]
+        img = None
+        if mat_idx < len(obj.material_slots):
+            img = __get_node_image(obj.material_slots[mat_idx].material)
+        # not found, try to search from all materials
+        if not img:
+            if -1 not in mat_images:
+                mat_images[-1] = None
+                for slot in obj.material_slots:
+                    mat_images[-1] = __get_node_image(slot.material) or \
+                        mat_images[-1]
+            img = mat_images[-1]
+        mat_images[mat_idx] = img
+        return img
+
+    images = []
+    for img, mat_idx in zip(face_images, material_indices):
+        if not img:
+            img = get_material_image(mat_idx)
+        images.append(img)
+
+    return images
+
+
+def __calc_texel_areas(info, images):
+    image_pixels = {}
+    pixels = np.empty(len(images))
+    for i, img in enumerate(images):
+        if not img:
+            pixels[i] = np.nan
+            continue
+        if img.name not in image_pixels:
+            image_pixels[img.name] = img.size[0] * img.size[1]
+        pixels[i] = image_pixels[img.name]
+    info['images'] = images
+    info['texel_areas'] = info['uv_areas'] * pixels
+    if not np.isnan(pixels).any():
+        info['uv_area'] = float(np.sum(info['texel_areas']))
+
+
+def measure_face_areas(obj, only_selected=True):
+    """
+    Measure mesh/UV area of each face in one pass
+    Coordinates and UVs are gathered at once, and areas are calculated
+    by NumPy.
+    UV area is measured in pixels of the image assigned to the face, and
+    it is None when any face has no image.
+    """
+
     bm = bmesh.from_edit_mesh(obj.data)
     if check_version(2, 73, 0) >= 0:
         bm.verts.ensure_lookup_table()
         bm.edges.ensure_lookup_table()
         bm.faces.ensure_lookup_table()
 
-    if not bm.loops.layers.uv:
-        return None
-    uv_layer = bm.loops.layers.uv.verify()
+    uv_layer = bm.loops.layers.uv.verify() if bm.loops.layers.uv else None
+    tex_layer = bm.faces.layers.tex.verify() if bm.faces.layers.tex \
+        else None
 
-    if not bm.faces.layers.tex:
+    if only_selected:
+        faces = [f for f in bm.faces if f.select]
+    else:
+        faces = [f for f in bm.faces]
+
+    arrays = MeshArrays(bm, uv_layer, faces)
+    cos = arrays.cos
+    with profiler.phase("compute"):
+        mesh_areas = core.geometry.calc_polygon_3d_area(cos, arrays.offsets)
+    info = {
+        'faces': faces,
+        'mesh_areas': mesh_areas,
+        'mesh_area': float(np.sum(mesh_areas)),
+        'images': None,
+        'uv_areas': None,
+        'texel_areas': None,
+        'uv_area': None,
+    }
+    if not uv_layer:
+        return info
+
+    uvs = arrays.uvs
+    with profiler.phase("compute"):
+        info['uv_areas'] = core.geometry.calc_polygon_2d_area(
+            uvs, arrays.offsets)
+    if not tex_layer:
+        return info
+
+    images = __get_face_images(obj, [f[tex_layer].image for f in faces],
+                               [f.material_index for f in faces])
+    __calc_texel_areas(info, images)
+
+    return info
+
+
+def measure_face_areas_from_mesh(obj, uv_layer=None, only_selected=False):
+    """
+    Measure mesh/UV area of each face of the mesh in object mode
+    Same as measure_face_areas, but mesh data is read by foreach_get, and
+    faces are the indices of polygons.
+    Return None when the mesh has no UV map.
+    """
+
+    mesh = obj.data
+    arrays = __get_mesh_island_arrays(mesh, only_selected, uv_layer)
+    if arrays is None:
         return None
-    tex_layer = bm.faces.layers.tex.verify()
+    if uv_layer is None:
+        uv_layer = mesh.uv_layers.active
+    polys, offsets, uvs, loop_verts, _ = arrays
+
+    cos = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", cos)
+    cos = cos.reshape(-1, 3)[loop_verts].astype(np.float64)
+    with profiler.phase("compute"):
+        mesh_areas = core.geometry.calc_polygon_3d_area(cos, offsets)
+        uv_areas = core.geometry.calc_polygon_2d_area(uvs, offsets)
+    info = {
+        'faces': polys,
+        'mesh_areas': mesh_areas,
+        'mesh_area': float(np.sum(mesh_areas)),
+        'images': None,
+        'uv_areas': uv_areas,
+        'texel_areas': None,
+        'uv_area': None,
+    }
+
+    tex_layer = mesh.uv_textures.get(uv_layer.name)
+    if tex_layer is not None:
+        tex_data = tex_layer.data
+        face_images = [tex_data[i].image for i in polys.tolist()]
+    else:
+        face_images = [None] * len(polys)
+    material_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", material_indices)
+    images = __get_face_images(obj, face_images,
+                               material_indices[polys].tolist())
+    __calc_texel_areas(info, images)
 
-    sel_faces = [f for f in bm.faces if f.select]
+    return info
 
-    # measure
-    uv_area = 0.0
-    for f in sel_faces:
-        uvs = [l[uv_layer].uv for l in f.loops]
-        f_uv_area = calc_polygon_2d_area(uvs)
 
-        if not tex_layer:
-            return None
-        img = f[tex_layer].image
-        # not found, try to search from node
-        if not img:
-            for mat in obj.material_slots:
-                for node in mat.material.node_tree.nodes:
-                    tex_node_types = [
-                        'TEX_ENVIRONMENT',
-                        'TEX_IMAGE',
-                    ]
-                    if (node.type in tex_node_types) and node.image:
-                        img = node.image
-        if not img:
-            return None
-        uv_area = uv_area + f_uv_area * img.size[0] * img.size[1]
+def measure_mesh_area(obj):
+    return measure_face_areas(obj)['mesh_area']
+
 
-    return uv_area
+def measure_uv_area(obj):
+    return measure_face_areas(obj)['uv_area']
 
 
 def diff_point_to_segment(a, b, p):
@@ -351,45 +943,36 @@ def diff_point_to_segment(a, b, p):
     return xp, x
 
 
-# get selected loop pair whose loops are connected each other
-def __get_loop_pairs(l, uv_layer):
-
-    def __get_loop_pairs_internal(l_, pairs_, uv_layer_, parsed_):
-        parsed_.append(l_)
-        for ll in l_.vert.link_loops:
-            # forward direction
-            lln = ll.link_loop_next
-            # if there is same pair, skip it
-            found = False
-            for p in pairs_:
-                if (ll in p) and (lln in p):
-                    found = True
-                    break
-            # two loops must be selected
-            if ll[uv_layer_].select and lln[uv_layer_].select:
-                if not found:
-                    pairs_.append([ll, lln])
-                if lln not in parsed_:
-                    __get_loop_pairs_internal(lln, pairs_, uv_layer_, parsed_)
-
-            # backward direction
-            llp = ll.link_loop_prev
-            # if there is same pair, skip it
-            found = False
-            for p in pairs_:
-                if (ll in p) and (llp in p):
-                    found = True
-                    break
-            # two loops must be selected
-            if ll[uv_layer_].select and llp[uv_layer_].select:
-                if not found:
-                    pairs_.append([ll, llp])
-                if llp not in parsed_:
-                    __get_loop_pairs_internal(llp, pairs_, uv_layer_, parsed_)
+# get graph of selected edges
+# vertex -> list of [loop on vertex, loop on the other vertex]
+def __get_selected_edge_graph(loops, uv_layer):
+    graph = defaultdict(list)
+    for l in loops:
+        ln = l.link_loop_next
+        if l[uv_layer].select and ln[uv_layer].select:
+            graph[l.vert].append([l, ln])
+            graph[ln.vert].append([ln, l])
+
+    return graph
 
+
+# get selected loop pair whose loops are connected each other
+def __get_loop_pairs(l, graph):
     pairs = []
-    parsed = []
-    __get_loop_pairs_internal(l, pairs, uv_layer, parsed)
+    added = set()
+    parsed = {l.vert}
+    stack = [l.vert]
+    while stack:
+        v = stack.pop()
+        for l1, l2 in graph[v]:
+            # the edge is identified by the loop whose next loop is other
+            key = l1 if l1.link_loop_next == l2 else l2
+            if key not in added:
+                added.add(key)
+                pairs.append([l1, l2])
+            if l2.vert not in parsed:
+                parsed.add(l2.vert)
+                stack.append(l2.vert)
 
     return pairs
 
@@ -398,39 +981,46 @@ def __get_loop_pairs(l, uv_layer):
 # (v0, v1) - (v1, v2) - (v2, v3) ....
 def __sort_loop_pairs(uv_layer, pairs, closed):
     rest = pairs
-    sorted_pairs = [rest[0]]
-    rest.remove(rest[0])
+    vert_to_pairs = defaultdict(list)
+    for i, p in enumerate(rest):
+        vert_to_pairs[p[0].vert].append(i)
+        vert_to_pairs[p[1].vert].append(i)
+    used = [False] * len(rest)
+
+    # get the first pair which is not sorted yet
+    def pop_pair(vert):
+        for i in vert_to_pairs[vert]:
+            if not used[i]:
+                used[i] = True
+                return rest[i]
+        return None
+
+    sorted_pairs = deque([rest[0]])
+    used[0] = True
 
     # prepend
     while True:
         p1 = sorted_pairs[0]
-        for p2 in rest:
-            if p1[0].vert == p2[0].vert:
-                sorted_pairs.insert(0, [p2[1], p2[0]])
-                rest.remove(p2)
-                break
-            elif p1[0].vert == p2[1].vert:
-                sorted_pairs.insert(0, [p2[0], p2[1]])
-                rest.remove(p2)
-                break
-        else:
+        p2 = pop_pair(p1[0].vert)
+        if p2 is None:
             break
+        if p1[0].vert == p2[0].vert:
+            sorted_pairs.appendleft([p2[1], p2[0]])
+        else:
+            sorted_pairs.appendleft([p2[0], p2[1]])
 
     # append
     while True:
         p1 = sorted_pairs[-1]
-        for p2 in rest:
-            if p1[1].vert == p2[0].vert:
-                sorted_pairs.append([p2[0], p2[1]])
-                rest.remove(p2)
-                break
-            elif p1[1].vert == p2[1].vert:
-                sorted_pairs.append([p2[1], p2[0]])
-                rest.remove(p2)
-                break
-        else:
+        p2 = pop_pair(p1[1].vert)
+        if p2 is None:
             break
+        if p1[1].vert == p2[0].vert:
+            sorted_pairs.append([p2[0], p2[1]])
+        else:
+            sorted_pairs.append([p2[1], p2[0]])
 
+    sorted_pairs = list(sorted_pairs)
     begin_vert = sorted_pairs[0][0].vert
     end_vert = sorted_pairs[-1][-1].vert
     if begin_vert != end_vert:
@@ -460,26 +1050,15 @@ def __sort_loop_pairs(uv_layer, pairs, closed):
     return sorted_pairs, ""
 
 
-# get index of the island group which includes loop
-def __get_island_group_include_loop(loop, island_info):
-    for i, isl in enumerate(island_info):
-        for f in isl['faces']:
-            for l in f['face'].loops:
-                if l == loop:
-                    return i    # found
-
-    return -1   # not found
-
-
 # get index of the island group which includes pair.
 # if island group is not same between loops, it will be invalid
-def __get_island_group_include_pair(pair, island_info):
-    l1_grp = __get_island_group_include_loop(pair[0], island_info)
+def __get_island_group_include_pair(pair, face_to_island):
+    l1_grp = face_to_island.get(pair[0].face, -1)
     if l1_grp == -1:
         return -1   # not found
 
     for p in pair[1:]:
-        l2_grp = __get_island_group_include_loop(p, island_info)
+        l2_grp = face_to_island.get(p.face, -1)
         if (l2_grp == -1) or (l1_grp != l2_grp):
             return -1   # not found or invalid
 
@@ -536,12 +1115,13 @@ def __get_next_poly_loop_pair(pair):
 
 
 # get loop sequence in the same island
-def __get_loop_sequence_internal(uv_layer, pairs, island_info, closed):
+def __get_loop_sequence_internal(uv_layer, pairs, face_to_island, closed):
     loop_sequences = []
     for pair in pairs:
         seqs = [pair]
+        parsed = {frozenset(pair)}
         p = pair
-        isl_grp = __get_island_group_include_pair(pair, island_info)
+        isl_grp = __get_island_group_include_pair(pair, face_to_island)
         if isl_grp == -1:
             return None, "Can not find the island or invalid island"
 
@@ -549,7 +1129,8 @@ def __get_loop_sequence_internal(uv_layer, pairs, island_info, closed):
             nlp = __get_next_loop_pair(p)
             if not nlp:
                 break       # no more loop pair
-            nlp_isl_grp = __get_island_group_include_pair(nlp, island_info)
+            nlp_isl_grp = __get_island_group_include_pair(nlp,
+                                                          face_to_island)
             if nlp_isl_grp != isl_grp:
                 break       # another island
             for nlpl in nlp:
@@ -558,6 +1139,7 @@ def __get_loop_sequence_internal(uv_layer, pairs, island_info, closed):
                                  "the end edge"
 
             seqs.append(nlp)
+            parsed.add(frozenset(nlp))
 
             # when face is triangle, it indicates CLOSED
             if (len(nlp) == 1) and closed:
@@ -566,20 +1148,15 @@ def __get_loop_sequence_internal(uv_layer, pairs, island_info, closed):
             nplp = __get_next_poly_loop_pair(nlp)
             if not nplp:
                 break       # no more loop pair
-            nplp_isl_grp = __get_island_group_include_pair(nplp, island_info)
+            nplp_isl_grp = __get_island_group_include_pair(nplp,
+                                                           face_to_island)
             if nplp_isl_grp != isl_grp:
                 break       # another island
 
             # check if the UVs are already parsed.
             # this check is needed for the mesh which has the circular
             # sequence of the verticies
-            matched = False
-            for p1 in seqs:
-                p2 = nplp
-                if ((p1[0] == p2[0]) and (p1[1] == p2[1])) or \
-                   ((p1[0] == p2[1]) and (p1[1] == p2[0])):
-                    matched = True
-            if matched:
+            if frozenset(nplp) in parsed:
                 debug_print("This is a circular sequence")
                 break
 
@@ -589,6 +1166,7 @@ def __get_loop_sequence_internal(uv_layer, pairs, island_info, closed):
                                  "the end edge"
 
             seqs.append(nplp)
+            parsed.add(frozenset(nplp))
 
             p = nplp
 
@@ -610,13 +1188,18 @@ def get_loop_sequences(bm, uv_layer, closed=False):
         return None, "More than 2 UVs must be selected"
 
     first_loop = cand_loops[0]
-    isl_info = get_island_info_from_bmesh(bm, False)
-    loop_pairs = __get_loop_pairs(first_loop, uv_layer)
+    isl_table = get_island_table_from_bmesh(bm, False)
+    face_to_island = dict(zip(isl_table.faces,
+                              isl_table.face_island.tolist()))
+    graph = __get_selected_edge_graph(cand_loops, uv_layer)
+    loop_pairs = __get_loop_pairs(first_loop, graph)
+    if not loop_pairs:
+        return None, "More than 2 UVs must be selected"
     loop_pairs, err = __sort_loop_pairs(uv_layer, loop_pairs, closed)
     if not loop_pairs:
         return None, err
     loop_seqs, err = __get_loop_sequence_internal(uv_layer, loop_pairs,
-                                                  isl_info, closed)
+                                                  face_to_island, closed)
     if not loop_seqs:
         return None, err
 
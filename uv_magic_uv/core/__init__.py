@@ -0,0 +1,52 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+# Geometry kernels of UV algorithms
+# This package must not depend on bpy/bmesh/mathutils, so that it can be
+# profiled and tested with plain Python.
+
+if "geometry" in locals():
+    import importlib
+    importlib.reload(debug)
+    importlib.reload(clip)
+    importlib.reload(geometry)
+    importlib.reload(island)
+    importlib.reload(mapping)
+    importlib.reload(packing)
+    importlib.reload(profiler)
+    importlib.reload(raster)
+    importlib.reload(spatial)
+    importlib.reload(topology)
+else:
+    from . import debug
+    from . import clip
+    from . import geometry
+    from . import island
+    from . import mapping
+    from . import packing
+    from . import profiler
+    from . import raster
+    from . import spatial
+    from . import topology
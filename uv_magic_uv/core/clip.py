@@ -0,0 +1,657 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+import numpy as np
+
+from . import debug
+from . import geometry
+
+
+__all__ = [
+    'RingBuffer',
+    'is_polygon_same',
+    'is_segment_intersect',
+    'is_polygon_flipped',
+    'is_point_in_polygon',
+    'is_points_in_polygon',
+    'do_weiler_atherton_cliping',
+    'MIN_OVERLAPPED_AREA',
+    'calc_polygon_convex',
+    'triangulate_polygon',
+    'clip_convex_polygons',
+    'calc_padded_polygon_area',
+    'clip_polygon_pairs',
+]
+
+
+# intersection whose area is smaller than this is regarded as touching
+# (e.g. faces sharing an edge)
+MIN_OVERLAPPED_AREA = 1e-10
+
+
+# Points are plain (x, y) tuples, so the clipping can be run on any
+# sequence of 2D points such as rows of NumPy array.
+
+
+def __sub(p1, p2):
+    return (p1[0] - p2[0], p1[1] - p2[1])
+
+
+def is_polygon_same(points1, points2):
+    if len(points1) != len(points2):
+        return False
+
+    pts1 = points1.as_list()
+    pts2 = points2.as_list()
+
+    for p1 in pts1:
+        for p2 in pts2:
+            dx = p2[0] - p1[0]
+            dy = p2[1] - p1[1]
+            if dx * dx + dy * dy < 0.0000001 * 0.0000001:
+                pts2.remove(p2)
+                break
+        else:
+            return False
+
+    return True
+
+
+def is_segment_intersect(start1, end1, start2, end2):
+    seg1 = __sub(end1, start1)
+    seg2 = __sub(end2, start2)
+
+    a1 = -seg1[1]
+    b1 = seg1[0]
+    d1 = -(a1 * start1[0] + b1 * start1[1])
+
+    a2 = -seg2[1]
+    b2 = seg2[0]
+    d2 = -(a2 * start2[0] + b2 * start2[1])
+
+    seg1_line2_start = a2 * start1[0] + b2 * start1[1] + d2
+    seg1_line2_end = a2 * end1[0] + b2 * end1[1] + d2
+
+    seg2_line1_start = a1 * start2[0] + b1 * start2[1] + d1
+    seg2_line1_end = a1 * end2[0] + b1 * end2[1] + d1
+
+    if (seg1_line2_start * seg1_line2_end >= 0) or \
+            (seg2_line1_start * seg2_line1_end >= 0):
+        return False, None
+
+    u = seg1_line2_start / (seg1_line2_start - seg1_line2_end)
+    out = (start1[0] + u * seg1[0], start1[1] + u * seg1[1])
+
+    return True, out
+
+
+class RingBuffer:
+    def __init__(self, arr):
+        self.__buffer = list(arr)
+        self.__pointer = 0
+
+    def __repr__(self):
+        return repr(self.__buffer)
+
+    def __len__(self):
+        return len(self.__buffer)
+
+    def insert(self, val, offset=0):
+        self.__buffer.insert(self.__pointer + offset, val)
+
+    def head(self):
+        return self.__buffer[0]
+
+    def tail(self):
+        return self.__buffer[-1]
+
+    def get(self, offset=0):
+        size = len(self.__buffer)
+        val = self.__buffer[(self.__pointer + offset) % size]
+        return val
+
+    def next(self):
+        size = len(self.__buffer)
+        self.__pointer = (self.__pointer + 1) % size
+
+    def reset(self):
+        self.__pointer = 0
+
+    def find(self, obj):
+        try:
+            idx = self.__buffer.index(obj)
+        except ValueError:
+            return None
+        return self.__buffer[idx]
+
+    def find_and_next(self, obj):
+        size = len(self.__buffer)
+        idx = self.__buffer.index(obj)
+        self.__pointer = (idx + 1) % size
+
+    def find_and_set(self, obj):
+        idx = self.__buffer.index(obj)
+        self.__pointer = idx
+
+    def as_list(self):
+        return self.__buffer.copy()
+
+    def reverse(self):
+        self.__buffer.reverse()
+        self.reset()
+
+
+def is_polygon_flipped(points):
+    area = 0.0
+    for i in range(len(points)):
+        uv1 = points.get(i)
+        uv2 = points.get(i + 1)
+        a = uv1[0] * uv2[1] - uv1[1] * uv2[0]
+        area = area + a
+    if area < 0:
+        # clock-wise
+        return True
+    return False
+
+
+def is_point_in_polygon(point, subject_points):
+    count = 0
+    for i in range(len(subject_points)):
+        uv_start1 = subject_points.get(i)
+        uv_end1 = subject_points.get(i + 1)
+        uv_start2 = point
+        uv_end2 = (1000000.0, point[1])
+        intersected, _ = is_segment_intersect(uv_start1, uv_end1,
+                                              uv_start2, uv_end2)
+        if intersected:
+            count = count + 1
+
+    return count % 2
+
+
+def is_points_in_polygon(points, subject_points):
+    for i in range(len(points)):
+        internal = is_point_in_polygon(points.get(i), subject_points)
+        if not internal:
+            return False
+
+    return True
+
+
+# clip: reference polygon
+# subject: tested polygon
+def do_weiler_atherton_cliping(clip, subject, mode):
+    """
+    Clip subject polygon by clip polygon
+    clip/subject are sequences of (x, y), and the list of overlapped
+    polygons is returned as lists of (x, y) tuples
+    """
+
+    clip_uvs = RingBuffer([(p[0], p[1]) for p in clip])
+    if is_polygon_flipped(clip_uvs):
+        clip_uvs.reverse()
+    subject_uvs = RingBuffer([(p[0], p[1]) for p in subject])
+    if is_polygon_flipped(subject_uvs):
+        subject_uvs.reverse()
+
+    debug.debug_print("===== Clip UV List =====")
+    debug.debug_print(clip_uvs)
+    debug.debug_print("===== Subject UV List =====")
+    debug.debug_print(subject_uvs)
+
+    # check if clip and subject is overlapped completely
+    if is_polygon_same(clip_uvs, subject_uvs):
+        polygons = [subject_uvs.as_list()]
+        debug.debug_print("===== Polygons Overlapped Completely =====")
+        debug.debug_print(polygons)
+        return True, polygons
+
+    # check if subject is in clip
+    if is_points_in_polygon(subject_uvs, clip_uvs):
+        polygons = [subject_uvs.as_list()]
+        return True, polygons
+
+    # check if clip is in subject
+    if is_points_in_polygon(clip_uvs, subject_uvs):
+        polygons = [subject_uvs.as_list()]
+        return True, polygons
+
+    # check if clip and subject is overlapped partially
+    intersections = []
+    while True:
+        subject_uvs.reset()
+        while True:
+            uv_start1 = clip_uvs.get()
+            uv_end1 = clip_uvs.get(1)
+            uv_start2 = subject_uvs.get()
+            uv_end2 = subject_uvs.get(1)
+            intersected, point = is_segment_intersect(uv_start1, uv_end1,
+                                                      uv_start2, uv_end2)
+            if intersected:
+                clip_uvs.insert(point, 1)
+                subject_uvs.insert(point, 1)
+                intersections.append([point,
+                                      [clip_uvs.get(), clip_uvs.get(1)]])
+            subject_uvs.next()
+            if subject_uvs.get() == subject_uvs.head():
+                break
+        clip_uvs.next()
+        if clip_uvs.get() == clip_uvs.head():
+            break
+
+    debug.debug_print("===== Intersection List =====")
+    debug.debug_print(intersections)
+
+    # no intersection, so subject and clip is not overlapped
+    if not intersections:
+        return False, None
+
+    def get_intersection_pair(intersects, key):
+        for sect in intersects:
+            if sect[0] == key:
+                return sect[1]
+
+        return None
+
+    # make enter/exit pair
+    subject_uvs.reset()
+    subject_entering = []
+    subject_exiting = []
+    clip_entering = []
+    clip_exiting = []
+    intersect_uv_list = []
+    while True:
+        pair = get_intersection_pair(intersections, subject_uvs.get())
+        if pair:
+            sub = __sub(subject_uvs.get(1), subject_uvs.get(-1))
+            inter = __sub(pair[1], pair[0])
+            cross = sub[0] * inter[1] - inter[0] * sub[1]
+            if cross < 0:
+                subject_entering.append(subject_uvs.get())
+                clip_exiting.append(subject_uvs.get())
+            else:
+                subject_exiting.append(subject_uvs.get())
+                clip_entering.append(subject_uvs.get())
+            intersect_uv_list.append(subject_uvs.get())
+
+        subject_uvs.next()
+        if subject_uvs.get() == subject_uvs.head():
+            break
+
+    debug.debug_print("===== Enter List =====")
+    debug.debug_print(clip_entering)
+    debug.debug_print(subject_entering)
+    debug.debug_print("===== Exit List =====")
+    debug.debug_print(clip_exiting)
+    debug.debug_print(subject_exiting)
+
+    # for now, can't handle the situation when fulfill all below conditions
+    #        * two faces have common edge
+    #        * each face is intersected
+    #        * Show Mode is "Part"
+    #       so for now, ignore this situation
+    if len(subject_entering) != len(subject_exiting):
+        if mode == 'FACE':
+            polygons = [subject_uvs.as_list()]
+            return True, polygons
+        return False, None
+
+    def traverse(current_list, entering, exiting, p, current, other_list):
+        result = current_list.find(current)
+        if not result:
+            return None
+        if result != current:
+            print("Internal Error")
+            return None
+
+        # enter
+        if entering.count(current) >= 1:
+            entering.remove(current)
+
+        current_list.find_and_next(current)
+        current = current_list.get()
+
+        while exiting.count(current) == 0:
+            p.append(current)
+            current_list.find_and_next(current)
+            current = current_list.get()
+
+        # exit
+        p.append(current)
+        exiting.remove(current)
+
+        other_list.find_and_set(current)
+        return other_list.get()
+
+    # Traverse
+    polygons = []
+    current_uv_list = subject_uvs
+    other_uv_list = clip_uvs
+    current_entering = subject_entering
+    current_exiting = subject_exiting
+
+    poly = []
+    current_uv = current_entering[0]
+
+    while True:
+        current_uv = traverse(current_uv_list, current_entering,
+                              current_exiting, poly, current_uv, other_uv_list)
+
+        if current_uv_list == subject_uvs:
+            current_uv_list = clip_uvs
+            other_uv_list = subject_uvs
+            current_entering = clip_entering
+            current_exiting = clip_exiting
+            debug.debug_print("-- Next: Clip --")
+        else:
+            current_uv_list = subject_uvs
+            other_uv_list = clip_uvs
+            current_entering = subject_entering
+            current_exiting = subject_exiting
+            debug.debug_print("-- Next: Subject --")
+
+        debug.debug_print(clip_entering)
+        debug.debug_print(clip_exiting)
+        debug.debug_print(subject_entering)
+        debug.debug_print(subject_exiting)
+
+        if not clip_entering and not clip_exiting \
+                and not subject_entering and not subject_exiting:
+            break
+
+    polygons.append(poly)
+
+    debug.debug_print("===== Polygons Overlapped Partially =====")
+    debug.debug_print(polygons)
+
+    return True, polygons
+
+
+# Polygons below are stored as flat arrays:
+#   CSR:    points (num_points, 2) with offsets (num_polygon + 1)
+#   padded: points (num_polygon, capacity, 2) with counts (num_polygon)
+# and the clipping of many polygon pairs runs at once.
+
+
+def __gather_padded(points, offsets, indices):
+    starts = offsets[indices]
+    counts = offsets[indices + 1] - starts
+    capacity = max(int(np.max(counts)), 1) if len(counts) else 1
+    local = np.minimum(np.arange(capacity)[None, :],
+                       np.maximum(counts - 1, 0)[:, None])
+    return points[starts[:, None] + local], counts
+
+
+def calc_polygon_convex(points, offsets):
+    """
+    Check if each polygon is convex
+    Collinear vertices are allowed
+    """
+
+    points = np.asarray(points, dtype=np.float64)
+    offsets = np.asarray(offsets)
+    counts = np.diff(offsets)
+    num_points = len(points)
+    if num_points == 0:
+        return np.ones(len(counts), dtype=bool)
+    face_of_points = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(num_points) - offsets[face_of_points]
+    size = counts[face_of_points]
+    next1 = offsets[face_of_points] + (local + 1) % size
+    next2 = offsets[face_of_points] + (local + 2) % size
+    e1 = points[next1] - points
+    e2 = points[next2] - points[next1]
+    cross = e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]
+    eps = 1e-12 * (np.abs(e1).sum(axis=1) * np.abs(e2).sum(axis=1))
+    pos = np.zeros(len(counts), dtype=bool)
+    neg = np.zeros(len(counts), dtype=bool)
+    pos[face_of_points[cross > eps]] = True
+    neg[face_of_points[cross < -eps]] = True
+
+    return ~(pos & neg)
+
+
+def triangulate_polygon(points):
+    """
+    Triangulate simple polygon (concave is allowed) by ear clipping
+    Return array of vertex indices with shape (num_triangle, 3)
+    """
+
+    pts = [(float(p[0]), float(p[1])) for p in points]
+    remaining = list(range(len(pts)))
+    if len(remaining) < 3:
+        return np.zeros((0, 3), dtype=np.int64)
+
+    # make counter-clockwise
+    area = 0.0
+    for i in range(len(pts)):
+        p1 = pts[i]
+        p2 = pts[(i + 1) % len(pts)]
+        area += p1[0] * p2[1] - p1[1] * p2[0]
+    if area < 0.0:
+        remaining.reverse()
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    tris = []
+    while len(remaining) > 3:
+        n = len(remaining)
+        for i in range(n):
+            ia, ib, ic = remaining[i - 1], remaining[i], remaining[(i + 1) % n]
+            a, b, c = pts[ia], pts[ib], pts[ic]
+            if cross(a, b, c) <= 0.0:
+                continue
+            for j in remaining:
+                if j in (ia, ib, ic):
+                    continue
+                p = pts[j]
+                if cross(a, b, p) >= 0.0 and cross(b, c, p) >= 0.0 and \
+                        cross(c, a, p) >= 0.0:
+                    break
+            else:
+                tris.append((ia, ib, ic))
+                remaining.pop(i)
+                break
+        else:
+            # no ear is found (self-intersecting or degenerate polygon),
+            # so fall back to triangle fan over the rest
+            for i in range(1, len(remaining) - 1):
+                tris.append((remaining[0], remaining[i], remaining[i + 1]))
+            remaining = []
+            break
+    if len(remaining) == 3:
+        tris.append(tuple(remaining))
+
+    return np.array(tris, dtype=np.int64).reshape(-1, 3)
+
+
+def clip_convex_polygons(clip_points, clip_counts, subject_points,
+                         subject_counts):
+    """
+    Clip subject polygons by convex clip polygons with Sutherland-Hodgman
+    algorithm, for all pairs at once
+    clip polygons must be counter-clockwise, while subject polygons can be
+    concave (then the result may include zero-width bridges, which does not
+    change its area).
+    Degenerate clip or subject polygons (collapsed to a point or a line)
+    give empty intersections.
+    Return padded intersection polygons (points, counts)
+    """
+
+    clip_points = np.asarray(clip_points, dtype=np.float64)
+    clip_counts = np.asarray(clip_counts)
+    poly = np.asarray(subject_points, dtype=np.float64)
+    counts = np.asarray(subject_counts).copy()
+    rows = np.arange(len(counts))
+
+    # every point is inside the edges of a degenerate clip polygon
+    degenerate = \
+        (calc_padded_polygon_area(clip_points, clip_counts) <
+         MIN_OVERLAPPED_AREA) | \
+        (calc_padded_polygon_area(poly, counts) < MIN_OVERLAPPED_AREA)
+    counts[degenerate] = 0
+
+    for e in range(clip_points.shape[1]):
+        if poly.shape[1] == 0:
+            break
+        active = e < clip_counts
+        a = clip_points[:, e]
+        b = clip_points[rows, (e + 1) % np.maximum(clip_counts, 1)]
+        edge = b - a
+
+        capacity = poly.shape[1]
+        idx = np.arange(capacity)
+        valid = idx[None, :] < counts[:, None]
+        prev_idx = (idx[None, :] - 1) % np.maximum(counts, 1)[:, None]
+        prev = poly[rows[:, None], prev_idx]
+
+        def side(p):
+            return edge[:, None, 0] * (p[:, :, 1] - a[:, None, 1]) - \
+                edge[:, None, 1] * (p[:, :, 0] - a[:, None, 0])
+
+        side_cur = side(poly)
+        side_prev = side(prev)
+        inside_cur = (side_cur >= 0.0) | ~active[:, None]
+        inside_prev = (side_prev >= 0.0) | ~active[:, None]
+
+        denom = side_prev - side_cur
+        denom[denom == 0.0] = 1.0
+        t = (side_prev / denom)[:, :, None]
+        sect = prev + t * (poly - prev)
+
+        # each vertex emits intersection with the previous edge and itself
+        out = np.empty((len(counts), capacity * 2, 2))
+        out[:, 0::2] = sect
+        out[:, 1::2] = poly
+        emit = np.empty((len(counts), capacity * 2), dtype=bool)
+        emit[:, 0::2] = valid & (inside_cur != inside_prev)
+        emit[:, 1::2] = valid & inside_cur
+
+        order = np.argsort(~emit, axis=1, kind='stable')
+        counts = np.sum(emit, axis=1)
+        new_capacity = int(np.max(counts)) if len(counts) else 0
+        order = order[:, :new_capacity]
+        poly = out[rows[:, None], order]
+
+    return poly, counts
+
+
+def calc_padded_polygon_area(points, counts):
+    """
+    Calculate area of padded polygons
+    """
+
+    points = np.asarray(points, dtype=np.float64)
+    counts = np.asarray(counts)
+    if points.shape[1] == 0:
+        return np.zeros(len(counts))
+    idx = np.arange(points.shape[1])
+    rows = np.arange(len(counts))[:, None]
+    valid = idx[None, :] < counts[:, None]
+    nxt = points[rows, (idx[None, :] + 1) % np.maximum(counts, 1)[:, None]]
+    cross = points[:, :, 0] * nxt[:, :, 1] - points[:, :, 1] * nxt[:, :, 0]
+
+    return np.abs(np.sum(np.where(valid, cross, 0.0), axis=1)) * 0.5
+
+
+def clip_polygon_pairs(points, offsets, clip_indices, subject_indices):
+    """
+    Calculate intersections of polygon pairs
+    Convex clip polygons (almost all triangles and quads) are clipped
+    directly. Concave clip polygons are triangulated and the subject is
+    clipped by each triangle, unless the subject is convex and the roles
+    can be swapped.  Pairs with degenerate faces are skipped.
+    Return (areas, points, counts, pair_indices), where areas is the
+    intersection area of each pair, and points/counts are padded polygons
+    which make up the intersections of pairs[pair_indices].
+    """
+
+    points = np.asarray(points, dtype=np.float64)
+    offsets = np.asarray(offsets)
+    clip_indices = np.asarray(clip_indices, dtype=np.int64)
+    subject_indices = np.asarray(subject_indices, dtype=np.int64)
+    num_pair = len(clip_indices)
+    if num_pair == 0:
+        return np.zeros(0), np.zeros((0, 0, 2)), \
+            np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    convex = calc_polygon_convex(points, offsets)
+    swap = ~convex[clip_indices] & convex[subject_indices]
+    ci = np.where(swap, subject_indices, clip_indices)
+    si = np.where(swap, clip_indices, subject_indices)
+
+    # pairs with degenerate faces are not overlapped
+    face_areas = geometry.calc_polygon_2d_area(points, offsets)
+    valid = (face_areas[ci] >= MIN_OVERLAPPED_AREA) & \
+        (face_areas[si] >= MIN_OVERLAPPED_AREA)
+
+    # clip polygon in triangles if it is concave
+    tri_pairs = []
+    tri_points = []
+    for k in np.flatnonzero(~convex[ci] & valid).tolist():
+        poly = points[offsets[ci[k]]:offsets[ci[k] + 1]]
+        for tri in triangulate_polygon(poly):
+            tri_pairs.append(k)
+            tri_points.append(poly[tri])
+    direct = np.flatnonzero(convex[ci] & valid)
+
+    clip_pts, clip_counts = __gather_padded(points, offsets, ci[direct])
+    if tri_pairs:
+        capacity = max(clip_pts.shape[1], 3)
+        pad = np.zeros((len(direct), capacity, 2))
+        pad[:, :clip_pts.shape[1]] = clip_pts
+        tris = np.zeros((len(tri_pairs), capacity, 2))
+        tris[:, :3] = np.array(tri_points)
+        clip_pts = np.concatenate((pad, tris))
+        clip_counts = np.concatenate(
+            (clip_counts, np.full(len(tri_pairs), 3, dtype=np.int64)))
+    pair_indices = np.concatenate(
+        (direct, np.array(tri_pairs, dtype=np.int64)))
+
+    # clip polygons must be counter-clockwise
+    idx = np.arange(clip_pts.shape[1])
+    rows = np.arange(len(pair_indices))[:, None]
+    nxt = clip_pts[rows,
+                   (idx[None, :] + 1) % np.maximum(clip_counts, 1)[:, None]]
+    cross = clip_pts[:, :, 0] * nxt[:, :, 1] - clip_pts[:, :, 1] * nxt[:, :, 0]
+    signed = np.sum(np.where(idx[None, :] < clip_counts[:, None], cross, 0.0),
+                    axis=1)
+    cw = signed < 0.0
+    if np.any(cw):
+        rev = (clip_counts[:, None] - 1 - idx[None, :]) % \
+            np.maximum(clip_counts, 1)[:, None]
+        clip_pts[cw] = clip_pts[rows, rev][cw]
+
+    subject_pts, subject_counts = __gather_padded(points, offsets,
+                                                  si[pair_indices])
+    poly, counts = clip_convex_polygons(clip_pts, clip_counts,
+                                        subject_pts, subject_counts)
+    piece_areas = calc_padded_polygon_area(poly, counts)
+    piece_areas[counts < 3] = 0.0
+    areas = np.zeros(num_pair)
+    np.add.at(areas, pair_indices, piece_areas)
+
+    return areas, poly, counts, pair_indices
@@ -0,0 +1,384 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+from math import pi
+
+import numpy as np
+
+
+__all__ = [
+    'get_face_of_loops',
+    'get_next_loops',
+    'get_polygon_loops',
+    'get_flipped_rotated_loops',
+    'get_last_loops_of_edges',
+    'calc_origin',
+    'find_uv_edge_neighbours',
+    'find_folded_uv_edges',
+    'calc_face_hashes',
+    'triangulate_polygons',
+    'calc_polygon_2d_signed_area',
+    'calc_polygon_2d_area',
+    'find_flipped_polygons',
+    'calc_polygon_3d_area',
+    'calc_circle',
+    'calc_points_on_circle',
+    'calc_tri_vert',
+]
+
+
+# Polygons are passed in CSR layout.
+#   offsets: int array of length (num_face + 1), loops of face i are
+#            offsets[i] ... offsets[i + 1] - 1
+#   points:  float array of shape (num_loop, 2) or (num_loop, 3)
+
+
+def get_face_of_loops(offsets):
+    """
+    Get index of face which each loop belongs to
+    """
+
+    counts = np.diff(offsets)
+    return np.repeat(np.arange(len(counts)), counts)
+
+
+def get_next_loops(offsets):
+    """
+    Get index of next loop in the same face
+    """
+
+    num_loop = int(offsets[-1]) if len(offsets) else 0
+    next_loops = np.arange(1, num_loop + 1)
+    if num_loop:
+        next_loops[offsets[1:] - 1] = offsets[:-1]
+
+    return next_loops
+
+
+def get_polygon_loops(offsets, indices):
+    """
+    Get loops of polygons of indices
+    Return (loop indices, offsets of the polygons in the returned loops)
+    """
+
+    indices = np.asarray(indices, dtype=np.int64)
+    counts = offsets[indices + 1] - offsets[indices]
+    sub_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+    np.cumsum(counts, out=sub_offsets[1:])
+    loops = np.repeat(offsets[indices] - sub_offsets[:-1], counts) + \
+        np.arange(sub_offsets[-1])
+
+    return loops, sub_offsets
+
+
+def get_flipped_rotated_loops(offsets, flip=False, rotate=0):
+    """
+    Get index of loop whose data moves to each loop when loops in each face
+    are flipped (reversed) and then rotated by 'rotate' steps
+    """
+
+    face_of_loops = get_face_of_loops(offsets)
+    starts = offsets[:-1][face_of_loops]
+    counts = np.diff(offsets)[face_of_loops]
+    local = np.arange(len(face_of_loops)) - starts
+    local = (local - rotate) % counts
+    if flip:
+        local = counts - 1 - local
+
+    return starts + local
+
+
+def get_last_loops_of_edges(loop_edges):
+    """
+    Get index of the last loop which shares the edge with each loop
+    Data stored per edge is reduced by this, so that the last face wins
+    when faces sharing the edge disagree.
+    """
+
+    _, inverse = np.unique(loop_edges, return_inverse=True)
+    last = np.zeros(int(inverse.max()) + 1 if len(inverse) else 0,
+                    dtype=np.int64)
+    np.maximum.at(last, inverse, np.arange(len(loop_edges)))
+
+    return last[inverse]
+
+
+def calc_origin(points, origin):
+    """
+    Calculate origin of points
+    origin is one of 'CENTER', 'LEFT_TOP', 'LEFT_CENTER', 'LEFT_BOTTOM',
+    'CENTER_TOP', 'CENTER_BOTTOM', 'RIGHT_TOP', 'RIGHT_CENTER' and
+    'RIGHT_BOTTOM'.  Center is the average of points.
+    """
+
+    if origin == 'CENTER':
+        return np.mean(points, axis=0)
+
+    if origin.startswith('LEFT'):
+        x = np.min(points[:, 0])
+    elif origin.startswith('RIGHT'):
+        x = np.max(points[:, 0])
+    else:
+        x = np.mean(points[:, 0])
+    if origin.endswith('TOP'):
+        y = np.max(points[:, 1])
+    elif origin.endswith('BOTTOM'):
+        y = np.min(points[:, 1])
+    else:
+        y = np.mean(points[:, 1])
+
+    return np.array([x, y])
+
+
+def find_uv_edge_neighbours(uvs, offsets, loop_edges, precision=5):
+    """
+    Find pairs of faces which share an edge connected on UV space
+    The edge is shared when both faces use the same mesh edge with the same
+    UV coordinates at both ends.
+    Return (face a, face b, loop of face a starting the shared edge)
+    """
+
+    empty = np.zeros(0, dtype=np.int64)
+    if len(loop_edges) == 0:
+        return empty, empty, empty
+
+    face_of_loops = get_face_of_loops(offsets)
+    start = np.round(uvs, precision)
+    end = start[get_next_loops(offsets)]
+
+    # order both ends so that the key does not depend on the direction
+    swap = (start[:, 0] > end[:, 0]) | \
+        ((start[:, 0] == end[:, 0]) & (start[:, 1] > end[:, 1]))
+    lo = np.where(swap[:, np.newaxis], end, start)
+    hi = np.where(swap[:, np.newaxis], start, end)
+    order = np.lexsort((hi[:, 1], hi[:, 0], lo[:, 1], lo[:, 0], loop_edges))
+
+    la = order[:-1]
+    lb = order[1:]
+    same = (loop_edges[la] == loop_edges[lb]) & \
+        np.all(lo[la] == lo[lb], axis=1) & np.all(hi[la] == hi[lb], axis=1) & \
+        (face_of_loops[la] != face_of_loops[lb])
+    la = la[same]
+    lb = lb[same]
+
+    return face_of_loops[la], face_of_loops[lb], la
+
+
+def find_folded_uv_edges(uvs, offsets, loop_edges, face_centers,
+                         precision=5):
+    """
+    Find pairs of faces folded over the edge they share on UV space
+    Faces sharing an edge are folded when both of them lie on the same side
+    of the edge.  The side of face is decided by its center.
+    Return (face a, face b, folded mask) for all pairs sharing an edge
+    """
+
+    a, b, la = find_uv_edge_neighbours(uvs, offsets, loop_edges, precision)
+    p = uvs[la]
+    d = uvs[get_next_loops(offsets)[la]] - p
+    ca = face_centers[a] - p
+    cb = face_centers[b] - p
+    side_a = d[:, 0] * ca[:, 1] - d[:, 1] * ca[:, 0]
+    side_b = d[:, 0] * cb[:, 1] - d[:, 1] * cb[:, 0]
+
+    return a, b, side_a * side_b > 0.0
+
+
+def calc_face_hashes(points, offsets, precision=5):
+    """
+    Calculate hash of coordinates of each polygon
+    Hash depends on the order of loops, and coordinates are rounded to
+    'precision' digits.
+    """
+
+    num_face = len(offsets) - 1
+    if num_face <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    q = np.round(np.asarray(points) * (10 ** precision)).astype(np.int64)
+    face_of_loops = get_face_of_loops(offsets)
+    local = np.arange(len(q)) - offsets[:-1][face_of_loops]
+    h = local * 83492791
+    for i in range(q.shape[1]):
+        h = (h ^ q[:, i]) * 1099511628211
+    hashes = np.zeros(num_face, dtype=np.int64)
+    nonempty = np.diff(offsets) > 0
+    hashes[nonempty] = np.bitwise_xor.reduceat(
+        h, offsets[:-1][nonempty])
+
+    return hashes
+
+
+def triangulate_polygons(points, offsets):
+    """
+    Triangulate polygons as triangle fans (p0, pi, pi+1)
+    Return array of shape (num_triangle * 3, dim), which can be drawn
+    as GL_TRIANGLES
+    """
+
+    points = np.asarray(points)
+    counts = np.diff(offsets)
+    num_tris = np.maximum(counts - 2, 0)
+    num_tri = int(np.sum(num_tris))
+    if num_tri == 0:
+        return np.zeros((0, points.shape[1]), dtype=points.dtype)
+
+    face_of_tris = np.repeat(np.arange(len(counts)), num_tris)
+    starts = np.cumsum(num_tris) - num_tris
+    local = np.arange(num_tri) - starts[face_of_tris] + 1
+    first = offsets[:-1][face_of_tris]
+    indices = np.column_stack((first, first + local, first + local + 1))
+
+    return points[indices.ravel()]
+
+
+def __calc_fan_cross(points, offsets):
+    """
+    Cross products of fan triangles (p0, pi, pi+1) for each loop
+    """
+
+    face_of_loops = get_face_of_loops(offsets)
+    first = points[offsets[:-1]][face_of_loops]
+    v1 = points - first
+    v2 = points[get_next_loops(offsets)] - first
+    if points.shape[1] == 2:
+        return v1[:, 0] * v2[:, 1] - v1[:, 1] * v2[:, 0], face_of_loops
+
+    return np.cross(v1, v2), face_of_loops
+
+
+def calc_polygon_2d_signed_area(points, offsets):
+    """
+    Calculate signed area of each polygon
+    Area is negative when polygon is clock-wise
+    """
+
+    num_face = len(offsets) - 1
+    if num_face <= 0:
+        return np.zeros(0)
+    cross, face_of_loops = __calc_fan_cross(points, offsets)
+
+    return 0.5 * np.bincount(face_of_loops, weights=cross,
+                             minlength=num_face)
+
+
+def calc_polygon_2d_area(points, offsets):
+    """
+    Calculate area of each polygon on 2D space
+    """
+
+    return np.fabs(calc_polygon_2d_signed_area(points, offsets))
+
+
+def find_flipped_polygons(points, offsets):
+    """
+    Find clock-wise (flipped) polygons
+    Return (mask, indices) of flipped polygons
+    """
+
+    mask = calc_polygon_2d_signed_area(points, offsets) < 0.0
+
+    return mask, np.flatnonzero(mask)
+
+
+def calc_polygon_3d_area(points, offsets):
+    """
+    Calculate area of each polygon on 3D space
+    """
+
+    num_face = len(offsets) - 1
+    if num_face <= 0:
+        return np.zeros(0)
+    cross, face_of_loops = __calc_fan_cross(points, offsets)
+    lengths = np.sqrt(np.einsum('ij,ij->i', cross, cross))
+
+    return 0.5 * np.bincount(face_of_loops, weights=lengths,
+                             minlength=num_face)
+
+
+def calc_circle(points):
+    """
+    Get center/radius of circle which passes through 3 points
+    """
+
+    p0, p1, p2 = np.asarray(points, dtype=np.float64)[:3]
+    alpha = np.arctan2(p0[1] - p1[1], p0[0] - p1[0]) + pi / 2
+    beta = np.arctan2(p1[1] - p2[1], p1[0] - p2[0]) + pi / 2
+    ex, ey = (p0 + p1) / 2.0
+    fx, fy = (p1 + p2) / 2.0
+    cx = (ey - fy - ex * np.tan(alpha) + fx * np.tan(beta)) / \
+        (np.tan(beta) - np.tan(alpha))
+    cy = ey - (ex - cx) * np.tan(alpha)
+    center = np.array([cx, cy])
+
+    return center, float(np.linalg.norm(p0 - center))
+
+
+def calc_points_on_circle(base, center, radius, num):
+    """
+    Get points on circle which are placed with same arc length
+    """
+
+    theta = np.arctan2(base[1] - center[1], base[0] - center[0])
+    angles = theta + np.arange(num) * 2 * pi / num
+
+    return np.column_stack((center[0] + radius * np.sin(angles),
+                            center[1] + radius * np.cos(angles)))
+
+
+def calc_tri_vert(v0, v1, angle0, angle1):
+    """
+    Calculate rest coordinate of triangles from other coordinates and
+    angles of end
+    Each argument can be array of triangles, and two candidates are
+    returned for each triangle
+    """
+
+    v0 = np.asarray(v0, dtype=np.float64)
+    v1 = np.asarray(v1, dtype=np.float64)
+    angle0 = np.asarray(angle0, dtype=np.float64)
+    angle1 = np.asarray(angle1, dtype=np.float64)
+    angle = pi - angle0 - angle1
+
+    diff = v1 - v0
+    alpha = np.arctan2(diff[..., 1], diff[..., 0])
+    d = np.hypot(diff[..., 0], diff[..., 1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = d * np.sin(angle0) / np.sin(angle)
+        b = d * np.sin(angle1) / np.sin(angle)
+        s = (a + b + d) / 2.0
+        r = s * (s - a) * (s - b) * (s - d)
+        invalid = (np.fabs(d) < 0.0000001) | ~(r >= 0)
+        xd = np.where(invalid, 0.0, (b * b - a * a + d * d) / (2 * d))
+        yd = np.where(invalid, 0.0, 2 * np.sqrt(np.fabs(r)) / d)
+
+    ca = np.cos(alpha)
+    sa = np.sin(alpha)
+    p1 = np.stack((xd * ca - yd * sa + v0[..., 0],
+                   xd * sa + yd * ca + v0[..., 1]), axis=-1)
+    p2 = np.stack((xd * ca + yd * sa + v0[..., 0],
+                   xd * sa - yd * ca + v0[..., 1]), axis=-1)
+
+    return p1, p2
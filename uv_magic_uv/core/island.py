@@ -0,0 +1,274 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+from itertools import product
+
+import numpy as np
+
+
+__all__ = [
+    'IslandTable',
+    'concat_island_tables',
+    'calc_connected_components',
+    'find_islands',
+    'group_similar_islands',
+]
+
+
+def calc_connected_components(num, a, b):
+    """
+    Label connected components of graph whose edges are (a[i], b[i])
+    Returned label is the smallest node index in the component.
+    Roots are hooked to smaller roots and paths are compressed by pointer
+    jumping, so no recursion nor per-node Python loop is needed.
+    """
+
+    labels = np.arange(num)
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    while True:
+        la = labels[a]
+        lb = labels[b]
+        diff = la != lb
+        if not np.any(diff):
+            break
+        la = la[diff]
+        lb = lb[diff]
+        m = np.minimum(la, lb)
+        np.minimum.at(labels, la, m)
+        np.minimum.at(labels, lb, m)
+        # pointer jumping
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+    return labels
+
+
+def find_islands(uvs, loop_verts, offsets, precision=5):
+    """
+    Find UV islands
+    Faces which share the same UV on the same vertex belong to the same
+    island. Islands are numbered in the order they are found.
+    """
+
+    num_face = len(offsets) - 1
+    if num_face <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    counts = np.diff(offsets)
+    face_of_loops = np.repeat(np.arange(num_face), counts)
+
+    # group loops by (rounded UV, vertex index)
+    rounded = np.round(uvs, precision) + 0.0    # remove negative zero
+    order = np.lexsort((rounded[:, 1], rounded[:, 0], loop_verts))
+    key_changed = np.ones(len(order), dtype=bool)
+    key_changed[1:] = (np.diff(loop_verts[order]) != 0) | \
+        np.any(np.diff(rounded[order], axis=0) != 0, axis=1)
+    key_of_sorted = np.cumsum(key_changed) - 1
+
+    # connect each face with the first face which has the same key
+    first_loop_of_key = order[key_changed]
+    a = face_of_loops[order]
+    b = face_of_loops[first_loop_of_key][key_of_sorted]
+    labels = calc_connected_components(num_face, a, b)
+
+    # renumber in order of appearance
+    _, first_face, inverse = np.unique(labels, return_index=True,
+                                       return_inverse=True)
+    rank = np.empty(len(first_face), dtype=np.int64)
+    rank[np.argsort(first_face)] = np.arange(len(first_face))
+
+    return rank[inverse.reshape(-1)]
+
+
+class IslandTable():
+    """
+    Island information stored as arrays (struct of arrays)
+    Faces are indexed in the order they are passed, and islands are
+    indexed in the order they are found.
+    """
+
+    def __init__(self, face_island, loop_offsets, uvs, loop_verts=None):
+        num_face = len(loop_offsets) - 1
+        num_island = int(face_island.max()) + 1 if num_face else 0
+        counts = np.diff(loop_offsets)
+
+        self.face_island = face_island
+        self.loop_offsets = loop_offsets
+        self.uvs = uvs
+        # vertex index of each loop
+        self.loop_verts = loop_verts
+
+        # per-face information
+        if num_face:
+            starts = loop_offsets[:-1]
+            self.face_min_uv = np.minimum.reduceat(uvs, starts, axis=0)
+            self.face_max_uv = np.maximum.reduceat(uvs, starts, axis=0)
+            face_sum_uv = np.add.reduceat(uvs, starts, axis=0)
+        else:
+            self.face_min_uv = np.zeros((0, 2))
+            self.face_max_uv = np.zeros((0, 2))
+            face_sum_uv = np.zeros((0, 2))
+        self.face_ave_uv = face_sum_uv / counts[:, np.newaxis]
+
+        # faces are grouped by island (CSR layout)
+        self.island_face_order = np.argsort(face_island, kind='mergesort')
+        self.island_face_offsets = np.zeros(num_island + 1, dtype=np.int64)
+        np.cumsum(np.bincount(face_island, minlength=num_island),
+                  out=self.island_face_offsets[1:])
+
+        # per-island information
+        if num_island:
+            order = self.island_face_order
+            starts = self.island_face_offsets[:-1]
+            self.island_min_uv = np.minimum.reduceat(
+                self.face_min_uv[order], starts, axis=0)
+            self.island_max_uv = np.maximum.reduceat(
+                self.face_max_uv[order], starts, axis=0)
+            self.island_num_uv = np.add.reduceat(counts[order], starts)
+            island_sum_uv = np.add.reduceat(face_sum_uv[order], starts,
+                                            axis=0)
+        else:
+            self.island_min_uv = np.zeros((0, 2))
+            self.island_max_uv = np.zeros((0, 2))
+            self.island_num_uv = np.zeros(0, dtype=np.int64)
+            island_sum_uv = np.zeros((0, 2))
+        self.island_center = \
+            island_sum_uv / self.island_num_uv[:, np.newaxis]
+        self.island_size = self.island_max_uv - self.island_min_uv
+
+    def __len__(self):
+        return len(self.island_num_uv)
+
+    def island_faces(self, isl_idx):
+        """
+        Get indices of faces which belong to island
+        """
+
+        start = self.island_face_offsets[isl_idx]
+        end = self.island_face_offsets[isl_idx + 1]
+        return self.island_face_order[start:end]
+
+
+def concat_island_tables(tables):
+    """
+    Concatenate island tables (of different meshes) into one table
+    Islands, faces and loops of each table follow those of the previous
+    tables.  Vertex indices are shifted, so that the tables do not share
+    any vertex.
+    Return (table, loop offsets of each table)
+    """
+
+    loop_starts = np.zeros(len(tables) + 1, dtype=np.int64)
+    np.cumsum([len(t.uvs) for t in tables], out=loop_starts[1:])
+    if not tables:
+        return IslandTable(np.zeros(0, dtype=np.int64),
+                           np.zeros(1, dtype=np.int64), np.zeros((0, 2)),
+                           np.zeros(0, dtype=np.int64)), loop_starts
+
+    face_island = []
+    offsets = [np.zeros(1, dtype=np.int64)]
+    loop_verts = []
+    num_island = 0
+    num_vert = 0
+    for t, start in zip(tables, loop_starts[:-1].tolist()):
+        face_island.append(t.face_island + num_island)
+        offsets.append(t.loop_offsets[1:] + start)
+        loop_verts.append(t.loop_verts + num_vert)
+        num_island = num_island + len(t)
+        if len(t.loop_verts):
+            num_vert = num_vert + int(t.loop_verts.max()) + 1
+
+    table = IslandTable(np.concatenate(face_island),
+                        np.concatenate(offsets),
+                        np.concatenate([t.uvs for t in tables]),
+                        np.concatenate(loop_verts))
+
+    return table, loop_starts
+
+
+def group_similar_islands(centers, sizes, num_uvs, center_deviation,
+                          size_deviation):
+    """
+    Group islands which have the same center, size and number of UVs
+    Islands are bucketed by center and size quantized by the cells four
+    times as large as the allowable deviations, and only the buckets
+    overlapping the deviations around the base island are searched.
+    The first ungrouped island becomes the base of a new group, and
+    ungrouped islands whose differences from the base are less than the
+    deviations join the group.
+    Return (group of each island, number of groups)
+    """
+
+    num_island = len(num_uvs)
+    groups = np.full(num_island, -1, dtype=np.int64)
+    if num_island == 0:
+        return groups, 0
+
+    values = np.hstack((np.asarray(centers, dtype=np.float64),
+                        np.asarray(sizes, dtype=np.float64)))
+    deviation = np.hstack((center_deviation, size_deviation))
+    cell = deviation * 4.0
+    num_uvs = np.asarray(num_uvs, dtype=np.int64)
+    keys = np.column_stack((num_uvs,
+                            np.floor(values / cell).astype(np.int64)))
+    lower = np.floor((values - deviation) / cell).astype(np.int64).tolist()
+    upper = np.floor((values + deviation) / cell).astype(np.int64).tolist()
+
+    # bucket islands by key
+    uniq, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(inverse, kind='mergesort')
+    starts = np.searchsorted(inverse[order], np.arange(len(uniq) + 1))
+    buckets = {}
+    for i, k in enumerate(uniq.tolist()):
+        buckets[tuple(k)] = order[starts[i]:starts[i + 1]]
+
+    num_uvs = num_uvs.tolist()
+    num_group = 0
+    for base in range(num_island):
+        if groups[base] >= 0:
+            continue
+        ranges = [range(lo, hi + 1)
+                  for lo, hi in zip(lower[base], upper[base])]
+        for cells in product(*ranges):
+            key = (num_uvs[base],) + cells
+            cand = buckets.get(key)
+            if cand is None:
+                continue
+            matched = np.all(np.fabs(values[cand] - values[base]) <
+                             deviation, axis=1)
+            groups[cand[matched]] = num_group
+            # grouped islands are never tested again
+            if np.all(matched):
+                del buckets[key]
+            elif np.any(matched):
+                buckets[key] = cand[~matched]
+        num_group = num_group + 1
+
+    return groups, num_group
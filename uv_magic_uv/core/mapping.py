@@ -0,0 +1,91 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+from math import pi
+
+import numpy as np
+
+
+__all__ = [
+    'calc_box_map',
+]
+
+
+def calc_box_map(cos, normals, size=1.0, rotation=(0.0, 0.0, 0.0),
+                 offset=(0.0, 0.0, 0.0), tex_aspect=1.0):
+    """
+    Calculate UV of box mapping
+    cos: vertex coordinate of each loop (num_loop, 3)
+    normals: normal of the face which each loop belongs to (num_loop, 3)
+    rotation: rotation around each axis in degree
+    """
+
+    cos = np.asarray(cos, dtype=np.float64).reshape(-1, 3)
+    normals = np.asarray(normals, dtype=np.float64).reshape(-1, 3)
+
+    scale = 1.0 / size
+    x = cos[:, 0] * scale
+    y = cos[:, 1] * scale
+    z = cos[:, 2] * scale
+    ofx, ofy, ofz = offset
+    crx, cry, crz = np.cos(np.asarray(rotation) * pi / 180.0)
+    srx, sry, srz = np.sin(np.asarray(rotation) * pi / 180.0)
+    aspect = tex_aspect
+
+    # select projection plane from normal
+    an = np.fabs(normals)
+    x_plane = (an[:, 0] >= an[:, 1]) & (an[:, 0] >= an[:, 2])
+    y_plane = ~x_plane & (an[:, 1] >= an[:, 0]) & (an[:, 1] >= an[:, 2])
+    z_plane = ~x_plane & ~y_plane
+    positive = normals >= 0.0
+
+    u = np.empty(len(cos))
+    v = np.empty(len(cos))
+
+    # X-plane
+    m = x_plane & positive[:, 0]
+    u[m] = (y[m] - ofy) * crx + (z[m] - ofz) * srx
+    v[m] = -(y[m] * aspect - ofy) * srx + (z[m] * aspect - ofz) * crx
+    m = x_plane & ~positive[:, 0]
+    u[m] = -(y[m] - ofy) * crx + (z[m] - ofz) * srx
+    v[m] = (y[m] * aspect - ofy) * srx + (z[m] * aspect - ofz) * crx
+
+    # Y-plane
+    m = y_plane & positive[:, 1]
+    u[m] = -(x[m] - ofx) * cry + (z[m] - ofz) * sry
+    v[m] = (x[m] * aspect - ofx) * sry + (z[m] * aspect - ofz) * cry
+    m = y_plane & ~positive[:, 1]
+    u[m] = (x[m] - ofx) * cry + (z[m] - ofz) * sry
+    v[m] = -(x[m] * aspect - ofx) * sry + (z[m] * aspect - ofz) * cry
+
+    # Z-plane
+    m = z_plane & positive[:, 2]
+    u[m] = (x[m] - ofx) * crz + (y[m] - ofy) * srz
+    v[m] = -(x[m] * aspect - ofx) * srz + (y[m] * aspect - ofy) * crz
+    m = z_plane & ~positive[:, 2]
+    u[m] = -(x[m] - ofx) * crz - (y[m] + ofy) * srz
+    v[m] = -(x[m] * aspect + ofx) * srz + (y[m] * aspect - ofy) * crz
+
+    return np.column_stack((u, v))
@@ -0,0 +1,376 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+import numpy as np
+
+
+__all__ = [
+    'UDIM_TILES_PER_ROW',
+    'MAX_FIT_ITERATIONS',
+    'MAX_SHRINK_ITERATIONS',
+    'SHRINK_RATIO',
+    'INITIAL_FILL_RATIO',
+    'SkylinePacker',
+    'MaxRectsPacker',
+    'get_udim_tile_offsets',
+    'pack_rects',
+    'pack_islands',
+]
+
+
+# number of UDIM tiles in a row (1001 - 1010)
+UDIM_TILES_PER_ROW = 10
+
+# islands are re-packed at most this number of times to fit in a tile
+MAX_FIT_ITERATIONS = 4
+
+# when islands still overflow the tile, the filled ratio is shrunk by
+# SHRINK_RATIO at most this number of times with margin held fixed
+MAX_SHRINK_ITERATIONS = 16
+SHRINK_RATIO = 0.9
+
+# ratio of tile expected to be filled by islands at the first packing
+INITIAL_FILL_RATIO = 0.8
+
+# tolerance of comparing coordinates
+EPSILON = 1e-9
+
+
+class SkylinePacker():
+    """
+    Pack rectangles on the skyline (bottom-left heuristic)
+    Skyline is the list of segments (x, y) sorted by x, where segment i
+    covers x[i] ... x[i + 1] at height y[i].  A rectangle is put on the
+    start of the segment where its top is the lowest.
+    When height is None, bin is unbounded in vertical direction.
+    """
+
+    def __init__(self, width=1.0, height=None):
+        self.width = width
+        self.height = np.inf if height is None else height
+        self.xs = np.zeros(1)
+        # heights of segments followed by the sentinel
+        self.ys = np.array([0.0, -np.inf])
+
+    def __find_position(self, w, h):
+        """
+        Find the lowest (and the leftmost) position
+        Return (top, segment index), or None
+        """
+
+        xs = self.xs
+        num_cand = int(np.searchsorted(xs, self.width - w + EPSILON,
+                                       side='right'))
+        if num_cand == 0:
+            return None
+
+        # height where rectangle is put is the max of covered segments
+        indices = np.empty(num_cand * 2, dtype=np.int64)
+        indices[0::2] = np.arange(num_cand)
+        indices[1::2] = np.searchsorted(xs, xs[:num_cand] + w - EPSILON,
+                                        side='left')
+        tops = np.maximum.reduceat(self.ys, indices)[0::2] + h
+        best = int(np.argmin(tops))
+        if tops[best] > self.height + EPSILON:
+            return None
+
+        return float(tops[best]), best
+
+    def insert(self, w, h, rotate=False):
+        """
+        Put rectangle of w x h
+        Return (x, y, rotated), or None if rectangle does not fit
+        """
+
+        pos = self.__find_position(w, h)
+        rotated = False
+        if rotate and (w != h):
+            pos_rot = self.__find_position(h, w)
+            if (pos_rot is not None) and \
+                    ((pos is None) or (pos_rot[0] < pos[0])):
+                pos = pos_rot
+                rotated = True
+                w, h = h, w
+        if pos is None:
+            return None
+
+        top, i = pos
+        x = float(self.xs[i])
+        end = x + w
+        j = int(np.searchsorted(self.xs, end - EPSILON, side='left'))
+        new_xs = [x]
+        new_ys = [top]
+        # part of the last covered segment remains
+        seg_end = self.xs[j] if j < len(self.xs) else self.width
+        if seg_end > end + EPSILON:
+            new_xs.append(end)
+            new_ys.append(float(self.ys[j - 1]))
+        # merge with the neighbour segments of the same height
+        if (i > 0) and (self.ys[i - 1] == top):
+            i = i - 1
+            new_xs[0] = float(self.xs[i])
+        if (j < len(self.xs)) and (self.ys[j] == new_ys[-1]):
+            j = j + 1
+        self.xs = np.concatenate((self.xs[:i], new_xs, self.xs[j:]))
+        self.ys = np.concatenate((self.ys[:i], new_ys, self.ys[j:]))
+
+        return x, top - h, rotated
+
+    def used_height(self):
+        return float(np.max(self.ys))
+
+
+class MaxRectsPacker():
+    """
+    Pack rectangles by MaxRects (best short side fit)
+    All maximal free rectangles are kept, and a rectangle is put on the
+    free rectangle which leaves the shortest side.
+    When height is None, bin is unbounded in vertical direction.
+    """
+
+    def __init__(self, width=1.0, height=None):
+        self.width = width
+        self.height = np.inf if height is None else height
+        # free rectangles (x, y, w, h)
+        self.free = np.array([[0.0, 0.0, width, self.height]])
+        self.__top = 0.0
+
+    def __find_position(self, w, h):
+        free = self.free
+        fit = (free[:, 2] >= w - EPSILON) & (free[:, 3] >= h - EPSILON)
+        if not np.any(fit):
+            return None
+        cand = np.flatnonzero(fit)
+        dw = free[cand, 2] - w
+        dh = free[cand, 3] - h
+        short = np.minimum(dw, dh)
+        long = np.maximum(dw, dh)
+        best = np.lexsort((free[cand, 0], free[cand, 1], long, short))[0]
+
+        return short[best], long[best], int(cand[best])
+
+    def __split(self, x, y, w, h):
+        free = self.free
+        fx, fy, fw, fh = free.T
+        hit = (fx < x + w - EPSILON) & (fx + fw > x + EPSILON) & \
+            (fy < y + h - EPSILON) & (fy + fh > y + EPSILON)
+        if not np.any(hit):
+            return
+        hx, hy, hw, hh = free[hit].T
+
+        # free parts of hit rectangles on each side of the placed one
+        parts = np.vstack((
+            np.column_stack((hx, hy, x - hx, hh)),
+            np.column_stack((np.full_like(hx, x + w), hy,
+                             hx + hw - x - w, hh)),
+            np.column_stack((hx, hy, hw, y - hy)),
+            np.column_stack((hx, np.full_like(hy, y + h), hw,
+                             hy + hh - y - h)),
+        ))
+        parts = parts[(parts[:, 2] > EPSILON) & (parts[:, 3] > EPSILON)]
+        rest = free[~hit]
+
+        # remove parts contained in the other free rectangles
+        others = np.vstack((rest, parts))
+        px, py = parts[:, 0:1], parts[:, 1:2]
+        px1 = px + parts[:, 2:3]
+        py1 = py + parts[:, 3:4]
+        ox, oy = others[:, 0], others[:, 1]
+        ox1 = ox + others[:, 2]
+        oy1 = oy + others[:, 3]
+        contained = (ox <= px + EPSILON) & (oy <= py + EPSILON) & \
+            (ox1 >= px1 - EPSILON) & (oy1 >= py1 - EPSILON)
+        # same rectangles are contained each other, and the first is kept
+        num_rest = len(rest)
+        same = contained & (ox >= px - EPSILON) & (oy >= py - EPSILON) & \
+            (ox1 <= px1 + EPSILON) & (oy1 <= py1 + EPSILON)
+        later = np.arange(len(others))[np.newaxis, :] >= \
+            num_rest + np.arange(len(parts))[:, np.newaxis]
+        contained &= ~(same & later)
+        parts = parts[~np.any(contained, axis=1)]
+
+        self.free = np.vstack((rest, parts))
+
+    def insert(self, w, h, rotate=False):
+        """
+        Put rectangle of w x h
+        Return (x, y, rotated), or None if rectangle does not fit
+        """
+
+        pos = self.__find_position(w, h)
+        rotated = False
+        if rotate and (w != h):
+            pos_rot = self.__find_position(h, w)
+            if (pos_rot is not None) and \
+                    ((pos is None) or (pos_rot[:2] < pos[:2])):
+                pos = pos_rot
+                rotated = True
+                w, h = h, w
+        if pos is None:
+            return None
+
+        x, y = self.free[pos[2], 0:2].tolist()
+        self.__split(x, y, w, h)
+        self.__top = max(self.__top, y + h)
+
+        return x, y, rotated
+
+    def used_height(self):
+        return self.__top
+
+
+def get_udim_tile_offsets(tiles):
+    """
+    Get offset of UDIM tiles (tile 0 is 1001)
+    """
+
+    tiles = np.asarray(tiles)
+
+    return np.column_stack((tiles % UDIM_TILES_PER_ROW,
+                            tiles // UDIM_TILES_PER_ROW)).astype(np.float64)
+
+
+def pack_rects(widths, heights, method='SKYLINE', width=1.0, height=None,
+               rotate=False, multi_tile=False):
+    """
+    Pack rectangles, from the tallest one
+    method is 'SKYLINE' or 'MAXRECTS'.  When multi_tile is True,
+    rectangles which do not fit in the bin go to the next bins (tiles).
+    Return (positions, rotated, tiles, packers), or None if a rectangle
+    never fits in the bin
+    """
+
+    packer_class = {
+        'SKYLINE': SkylinePacker,
+        'MAXRECTS': MaxRectsPacker,
+    }[method]
+    widths = np.asarray(widths, dtype=np.float64)
+    heights = np.asarray(heights, dtype=np.float64)
+    num_rect = len(widths)
+    positions = np.zeros((num_rect, 2))
+    rotated = np.zeros(num_rect, dtype=bool)
+    tiles = np.zeros(num_rect, dtype=np.int64)
+
+    if rotate:
+        keys = (-np.minimum(widths, heights), -np.maximum(widths, heights))
+    else:
+        keys = (-widths, -heights)
+    order = np.lexsort(keys)
+
+    packers = [packer_class(width, height)]
+    for i, w, h in zip(order.tolist(), widths[order].tolist(),
+                       heights[order].tolist()):
+        for tile, packer in enumerate(packers):
+            pos = packer.insert(w, h, rotate)
+            if pos is not None:
+                break
+        else:
+            if not multi_tile:
+                return None
+            packers.append(packer_class(width, height))
+            tile = len(packers) - 1
+            pos = packers[-1].insert(w, h, rotate)
+            if pos is None:
+                return None
+        positions[i] = pos[0:2]
+        rotated[i] = pos[2]
+        tiles[i] = tile
+
+    return positions, rotated, tiles, packers
+
+
+def __calc_fit_scale(sizes, margin, fill):
+    """
+    Calculate scale of islands whose rectangles (including margin) fill
+    the ratio of unit tile
+    """
+
+    # sum of (w * s + margin) * (h * s + margin) = fill
+    a = float(np.sum(sizes[:, 0] * sizes[:, 1]))
+    b = float(np.sum(sizes)) * margin
+    c = len(sizes) * margin * margin - fill
+    if c >= 0.0:
+        return EPSILON
+    if a <= 0.0:
+        return -c / b if b > 0.0 else 1.0
+
+    return (-b + np.sqrt(b * b - 4.0 * a * c)) / (2.0 * a)
+
+
+def pack_islands(sizes, method='SKYLINE', margin=0.0, rotate=False,
+                 multi_tile=False):
+    """
+    Pack bounding rectangles of islands in UV tiles
+    Islands are apart from each other by margin, and from the border of
+    tile by margin / 2.
+    When multi_tile is False, islands are scaled to fit in one tile.
+    Otherwise, scale of islands is kept (unless the largest one does not
+    fit in a tile), and islands overflow into the next UDIM tiles.
+    Return (scale, positions of the min corner of islands, rotated, tiles)
+    """
+
+    sizes = np.asarray(sizes, dtype=np.float64).reshape(-1, 2)
+    num_island = len(sizes)
+    if num_island == 0:
+        return 1.0, np.zeros((0, 2)), np.zeros(0, dtype=bool), \
+            np.zeros(0, dtype=np.int64)
+
+    # island whose longer side fits in a tile fits even if it is rotated
+    largest = float(np.max(sizes))
+    if multi_tile:
+        scale = 1.0
+        if largest + margin > 1.0:
+            scale = max(1.0 - margin, EPSILON) / largest
+        rects = sizes * scale + margin
+        positions, rotated, tiles, _ = pack_rects(
+            rects[:, 0], rects[:, 1], method, 1.0, 1.0, rotate, True)
+        return scale, positions + margin * 0.5, rotated, tiles
+
+    # pack in the strip of unit width, and shrink until it fits in height
+    # margin is held fixed while shrinking, so that the gap between islands
+    # is never less than margin
+    fill = INITIAL_FILL_RATIO
+    for i in range(MAX_FIT_ITERATIONS + MAX_SHRINK_ITERATIONS):
+        scale = min(__calc_fit_scale(sizes, margin, fill),
+                    max(1.0 - margin, EPSILON) / max(largest, EPSILON))
+        rects = sizes * scale + margin
+        positions, rotated, tiles, packers = pack_rects(
+            rects[:, 0], rects[:, 1], method, 1.0, None, rotate)
+        used = packers[0].used_height()
+        if used <= 1.0 + EPSILON:
+            break
+        if i < MAX_FIT_ITERATIONS - 1:
+            # retry with the ratio actually filled
+            fill = float(np.sum(np.prod(rects, axis=1))) / used * 0.98
+        else:
+            fill = fill * SHRINK_RATIO
+    else:
+        # margins alone do not fit in a tile, so islands and margin are
+        # shrunk together as the last resort
+        positions = positions / used
+        scale = scale / used
+        margin = margin / used
+
+    return scale, positions + margin * 0.5, rotated, tiles
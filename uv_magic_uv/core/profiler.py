@@ -0,0 +1,233 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+import csv
+import json
+import threading
+import time
+import tracemalloc
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+
+
+__all__ = [
+    'ProfileRecord',
+    'Profiler',
+]
+
+
+class ProfileRecord():
+    """
+    Timings of one operator call
+    Times are in seconds from time.perf_counter()
+    """
+
+    def __init__(self, name, start):
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+        self.phases = []        # [(name, start, duration)]
+        self.counts = OrderedDict()
+        self.peak_memory = 0    # bytes, allocated on top of the start
+        self.memory_traced = False
+        self.result = None
+
+
+class Profiler():
+    """
+    Record wall time, phase timings, element counts and peak allocations
+    of operator calls
+    Phases and counts are ignored while no call is being recorded, so
+    instrumented code costs nearly nothing when profiling is disabled.
+    Phases and counts from threads other than the one recording the call
+    are also ignored.
+    Peak allocations are traced only while trace_memory is set because
+    tracemalloc slows down every allocation, so timings of such calls
+    should not be compared with untraced ones.
+    """
+
+    def __init__(self, max_records=200, trace_memory=False):
+        self.records = deque(maxlen=max_records)
+        self.trace_memory = trace_memory
+        self.__stack = []
+        self.__memory = []      # [[traced memory at begin, peak so far]]
+        self.__tracing = False
+        self.__thread = None
+
+    def is_recording(self):
+        return (len(self.__stack) > 0) and \
+            (self.__thread == threading.get_ident())
+
+    def __reset_peak(self):
+        """
+        Return traced memory and its peak, and restart the peak from now
+        tracemalloc.reset_peak() is not available before Python 3.9, so the
+        peak keeps including allocations before the call and the recorded
+        peak may be too large there.
+        """
+
+        current, peak = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        if self.__memory:
+            self.__memory[-1][1] = max(self.__memory[-1][1], peak)
+        return current
+
+    def begin(self, name):
+        if not self.__stack:
+            self.__thread = threading.get_ident()
+            if self.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.__tracing = True
+        traced = self.trace_memory and tracemalloc.is_tracing()
+        if traced:
+            current = self.__reset_peak()
+            self.__memory.append([current, current])
+        rec = ProfileRecord(name, time.perf_counter())
+        rec.memory_traced = traced
+        self.__stack.append(rec)
+        return rec
+
+    def end(self, result=None, keep=True):
+        rec = self.__stack.pop()
+        rec.duration = time.perf_counter() - rec.start
+        rec.result = result
+        if rec.memory_traced:
+            self.__reset_peak()
+            base, peak = self.__memory.pop()
+            rec.peak_memory = max(peak - base, 0)
+            if self.__memory:
+                self.__memory[-1][1] = max(self.__memory[-1][1], peak)
+        if not self.__stack and self.__tracing:
+            tracemalloc.stop()
+            self.__tracing = False
+        if keep:
+            self.records.append(rec)
+        return rec
+
+    @contextmanager
+    def phase(self, name):
+        if not self.is_recording():
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__stack[-1].phases.append(
+                (name, start, time.perf_counter() - start))
+
+    def count(self, **counts):
+        if not self.is_recording():
+            return
+        self.__stack[-1].counts.update(counts)
+
+    def clear(self):
+        self.records.clear()
+
+    def summary(self):
+        """
+        Summarize records per operator
+        Return list of (name, calls, total time, max time, max peak memory)
+        """
+
+        info = OrderedDict()
+        for rec in self.records:
+            calls, total, max_time, max_mem = info.get(rec.name,
+                                                       (0, 0.0, 0.0, 0))
+            info[rec.name] = (calls + 1, total + rec.duration,
+                              max(max_time, rec.duration),
+                              max(max_mem, rec.peak_memory))
+
+        return [(k,) + v for k, v in info.items()]
+
+    def export_csv(self, filepath):
+        """
+        Export records as CSV
+        One row is written for the whole call and one for each phase
+        """
+
+        count_keys = []
+        for rec in self.records:
+            for k in rec.counts.keys():
+                if k not in count_keys:
+                    count_keys.append(k)
+
+        with open(filepath, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['operator', 'call', 'phase', 'start_ms',
+                             'duration_ms', 'peak_memory_kb'] + count_keys)
+            base = self.records[0].start if self.records else 0.0
+            for i, rec in enumerate(self.records):
+                counts = [rec.counts.get(k, '') for k in count_keys]
+                writer.writerow([rec.name, i, '',
+                                 '{:.3f}'.format((rec.start - base) * 1e3),
+                                 '{:.3f}'.format(rec.duration * 1e3),
+                                 '{:.1f}'.format(rec.peak_memory / 1024.0)
+                                 if rec.memory_traced else '']
+                                + counts)
+                for name, start, duration in rec.phases:
+                    writer.writerow([rec.name, i, name,
+                                     '{:.3f}'.format((start - base) * 1e3),
+                                     '{:.3f}'.format(duration * 1e3),
+                                     ''] + [''] * len(count_keys))
+
+    def export_chrome_trace(self, filepath):
+        """
+        Export records as Chrome trace event JSON
+        File can be loaded by chrome://tracing or Perfetto
+        """
+
+        events = []
+        base = self.records[0].start if self.records else 0.0
+        for rec in self.records:
+            args = OrderedDict(rec.counts)
+            if rec.memory_traced:
+                args['peak_memory_kb'] = rec.peak_memory / 1024.0
+            if rec.result is not None:
+                args['result'] = str(rec.result)
+            events.append({
+                'name': rec.name,
+                'cat': 'operator',
+                'ph': 'X',
+                'ts': (rec.start - base) * 1e6,
+                'dur': rec.duration * 1e6,
+                'pid': 0,
+                'tid': 0,
+                'args': args,
+            })
+            for name, start, duration in rec.phases:
+                events.append({
+                    'name': name,
+                    'cat': 'phase',
+                    'ph': 'X',
+                    'ts': (start - base) * 1e6,
+                    'dur': duration * 1e6,
+                    'pid': 0,
+                    'tid': 0,
+                })
+
+        with open(filepath, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,350 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+import numpy as np
+
+from . import geometry
+
+
+__all__ = [
+    'MAX_SAMPLES_PER_CHUNK',
+    'MAX_TEXELS_PER_TILE',
+    'calc_disk_offsets',
+    'TexelCoverage',
+    'TexelConflicts',
+    'rasterize_islands',
+]
+
+
+# number of pixel samples processed at once, which bounds the memory
+MAX_SAMPLES_PER_CHUNK = 1 << 22
+
+# number of pixels of texel grid allocated at once
+# Large textures are rasterized by tiles of rows, so that the memory is
+# bounded regardless of texture size.
+MAX_TEXELS_PER_TILE = 1 << 22
+
+# Texel grid is stored as flat arrays of length (width * height), and
+# pixel (x, y) is the index (y * width + x).  The center of pixel (x, y)
+# is ((x + 0.5) / width, (y + 0.5) / height) on UV space.
+
+
+def calc_disk_offsets(radius):
+    """
+    Get offsets (dx, dy) of pixels in the disk of radius, except (0, 0)
+    """
+
+    r = int(np.floor(radius))
+    if r < 1:
+        return np.zeros((0, 2), dtype=np.int64)
+    d = np.arange(-r, r + 1)
+    dx, dy = np.meshgrid(d, d)
+    dx = dx.ravel()
+    dy = dy.ravel()
+    mask = (dx * dx + dy * dy <= radius * radius) & ((dx != 0) | (dy != 0))
+
+    return np.column_stack((dx[mask], dy[mask]))
+
+
+class TexelCoverage():
+    """
+    Owner of each pixel of texel grid (or tile of texel grid)
+    A pixel is claimed by an island when the pixel center is covered by
+    the island (dilated by padding radius). One of the first claims makes
+    the island (and face) the owner, and claims of the other islands mark
+    the pixel as conflicted.
+    Face and island indices are stored as int32 to halve the memory.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.owner = np.full(width * height, -1, dtype=np.int32)
+        self.owner_face = np.full(width * height, -1, dtype=np.int32)
+        self.conflict = np.zeros(width * height, dtype=bool)
+        # (pixels, faces, faces, islands, islands) of conflicted claims
+        self.claims = []
+
+    def claim(self, pix, isl, face):
+        """
+        Claim pixels by islands (and faces)
+        """
+
+        if len(pix) == 0:
+            return
+
+        # unowned pixels are taken by one of the claims, and the other
+        # claims which differ from the owner are conflicted
+        cur = self.owner[pix]
+        new = cur < 0
+        self.owner[pix[new]] = isl[new]
+        self.owner_face[pix[new]] = face[new]
+        owner = self.owner[pix]
+        bad = owner != isl
+        if np.any(bad):
+            pix = pix[bad]
+            self.conflict[pix] = True
+            self.claims.append((pix, face[bad], self.owner_face[pix],
+                                owner[bad], isl[bad]))
+
+    def boundary(self):
+        """
+        Get pixels whose 4-neighbours are owned by the other (or no) island
+        """
+
+        owner = self.owner.reshape(self.height, self.width)
+        edge = np.zeros(owner.shape, dtype=bool)
+        edge[:, 1:] |= owner[:, 1:] != owner[:, :-1]
+        edge[:, :-1] |= owner[:, :-1] != owner[:, 1:]
+        edge[1:, :] |= owner[1:, :] != owner[:-1, :]
+        edge[:-1, :] |= owner[:-1, :] != owner[1:, :]
+        edge &= owner >= 0
+
+        return np.flatnonzero(edge.ravel())
+
+    def dilate(self, radius):
+        """
+        Dilate each island by radius (in pixels)
+        """
+
+        offsets = calc_disk_offsets(radius)
+        if len(offsets) == 0:
+            return
+        boundary = self.boundary()
+        bx = boundary % self.width
+        by = boundary // self.width
+        chunk = max(1, MAX_SAMPLES_PER_CHUNK // len(offsets))
+        for start in range(0, len(boundary), chunk):
+            x = (bx[start:start + chunk, None] + offsets[None, :, 0]).ravel()
+            y = (by[start:start + chunk, None] + offsets[None, :, 1]).ravel()
+            src = np.repeat(boundary[start:start + chunk], len(offsets))
+            inside = (x >= 0) & (x < self.width) & \
+                (y >= 0) & (y < self.height)
+            src = src[inside]
+            self.claim(y[inside] * self.width + x[inside],
+                       self.owner[src], self.owner_face[src])
+
+    def mark_touching(self):
+        """
+        Mark 4-neighbour pixels owned by different islands as conflicted
+        """
+
+        owner = self.owner.reshape(self.height, self.width)
+        pix = np.arange(len(self.owner)).reshape(self.height, self.width)
+        for a, b in ((pix[:, :-1], pix[:, 1:]), (pix[:-1, :], pix[1:, :])):
+            oa = owner.ravel()[a.ravel()]
+            ob = owner.ravel()[b.ravel()]
+            touching = (oa >= 0) & (ob >= 0) & (oa != ob)
+            a = a.ravel()[touching]
+            b = b.ravel()[touching]
+            self.conflict[a] = True
+            self.conflict[b] = True
+            self.claims.append((a, self.owner_face[a], self.owner_face[b],
+                                oa[touching], ob[touching]))
+            self.claims.append((b, self.owner_face[a], self.owner_face[b],
+                                oa[touching], ob[touching]))
+
+
+class TexelConflicts():
+    """
+    Conflicted pixels of texel grid extracted from the tiles
+    Only conflicted pixels are kept, and the grids of tiles are freed
+    after extracting them.
+        pixels:        conflicted pixels (y * width + x) in sorted order
+        pixel_faces:   face owning each conflicted pixel
+        island_texels: number of pixels owned by each island
+    """
+
+    def __init__(self, width, height, num_island):
+        self.width = width
+        self.height = height
+        self.island_texels = np.zeros(num_island, dtype=np.int64)
+        self.__pixels = []
+        self.__pixel_faces = []
+        self.__faces = []
+        self.__pairs = []
+        self.pixels = np.zeros(0, dtype=np.int64)
+        self.pixel_faces = np.zeros(0, dtype=np.int32)
+
+    def add_tile(self, coverage, start, end, y):
+        """
+        Extract rows [start, end) of tile whose first row is row y of the
+        texel grid
+        """
+
+        width = coverage.width
+        lo = start * width
+        hi = end * width
+        base = (y - start) * width + lo
+
+        owner = coverage.owner[lo:hi]
+        self.island_texels += np.bincount(
+            owner[owner >= 0], minlength=len(self.island_texels))
+        pix = np.flatnonzero(coverage.conflict[lo:hi])
+        self.__pixels.append(pix + base)
+        self.__pixel_faces.append(coverage.owner_face[pix + lo])
+        for cpix, face_a, face_b, isl_a, isl_b in coverage.claims:
+            mask = (cpix >= lo) & (cpix < hi)
+            self.__faces.extend((face_a[mask], face_b[mask]))
+            self.__pairs.append(np.column_stack((isl_a[mask],
+                                                 isl_b[mask])))
+
+        self.pixels = np.concatenate(self.__pixels).astype(np.int64)
+        self.pixel_faces = np.concatenate(self.__pixel_faces)
+
+    def conflicted_faces(self):
+        """
+        Get faces covering (or dilated to) conflicted pixels
+        """
+
+        if not self.__faces:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.unique(np.concatenate(self.__faces)).astype(np.int64)
+
+    def conflicted_island_pairs(self):
+        """
+        Get pairs of islands (a < b) which claim the same pixels
+        """
+
+        if not self.__pairs:
+            return np.zeros((0, 2), dtype=np.int64)
+        pairs = np.sort(np.concatenate(self.__pairs), axis=1)
+
+        return np.unique(pairs, axis=0).astype(np.int64)
+
+
+def __rasterize_triangles(coverage, tris, tri_island, tri_face):
+    """
+    Claim pixels whose center is inside triangles
+    tris is array of shape (num_triangle, 3, 2) on pixel space
+    """
+
+    width = coverage.width
+    height = coverage.height
+
+    # make counter-clockwise
+    e1 = tris[:, 1] - tris[:, 0]
+    e2 = tris[:, 2] - tris[:, 0]
+    signed = e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]
+    cw = signed < 0.0
+    tris[cw] = tris[cw][:, [0, 2, 1]]
+    valid = signed != 0.0
+
+    # pixel centers are on integer coordinates after shifting by 0.5
+    x0 = np.maximum(np.ceil(np.min(tris[:, :, 0], axis=1) - 0.5), 0)
+    x1 = np.minimum(np.floor(np.max(tris[:, :, 0], axis=1) - 0.5),
+                    width - 1)
+    y0 = np.maximum(np.ceil(np.min(tris[:, :, 1], axis=1) - 0.5), 0)
+    y1 = np.minimum(np.floor(np.max(tris[:, :, 1], axis=1) - 0.5),
+                    height - 1)
+    nx = np.where(valid, np.maximum(x1 - x0 + 1, 0), 0).astype(np.int64)
+    ny = np.where(valid, np.maximum(y1 - y0 + 1, 0), 0).astype(np.int64)
+    num_samples = nx * ny
+
+    # split triangles so that the samples fit in chunks
+    cum = np.cumsum(num_samples)
+    bounds = [0]
+    while bounds[-1] < len(tris):
+        base = cum[bounds[-1] - 1] if bounds[-1] > 0 else 0
+        end = int(np.searchsorted(cum, base + MAX_SAMPLES_PER_CHUNK,
+                                  side='right'))
+        bounds.append(max(end, bounds[-1] + 1))
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        counts = num_samples[start:end]
+        total = int(np.sum(counts))
+        if total == 0:
+            continue
+        t = np.repeat(np.arange(start, end), counts)
+        local = np.arange(total) - np.repeat(np.cumsum(counts) - counts,
+                                             counts)
+        px = x0[t] + local % nx[t]
+        py = y0[t] + local // nx[t]
+        cx = px + 0.5
+        cy = py + 0.5
+
+        inside = np.ones(total, dtype=bool)
+        for i in range(3):
+            a = tris[t, i]
+            b = tris[t, (i + 1) % 3]
+            inside &= (b[:, 0] - a[:, 0]) * (cy - a[:, 1]) - \
+                (b[:, 1] - a[:, 1]) * (cx - a[:, 0]) >= 0.0
+        t = t[inside]
+        pix = (py[inside] * width + px[inside]).astype(np.int64)
+        coverage.claim(pix, tri_island[t], tri_face[t])
+
+
+def rasterize_islands(uvs, offsets, face_island, width, height, padding=0,
+                      max_texels=MAX_TEXELS_PER_TILE, cancelled=None):
+    """
+    Rasterize UV polygons to texel grid of width x height
+    Each island is dilated by padding / 2 pixels, so that islands whose
+    distance is less than padding claim the same pixels. For odd padding,
+    dilated islands touching each other are also conflicted.
+    The grid is rasterized by tiles of rows of about max_texels pixels.
+    Each tile has the margin of rows which can be reached by dilation, so
+    that the conflicted pixels are same as rasterizing the whole grid.
+    UVs outside of [0, 1] are ignored.
+    cancelled is called before each tile, and rasterizing is stopped when
+    it returns True.
+    Return TexelConflicts, or None when cancelled
+    """
+
+    face_island = np.asarray(face_island)
+    num_island = int(np.max(face_island)) + 1 if len(face_island) else 0
+    conflicts = TexelConflicts(width, height, num_island)
+    tris = geometry.triangulate_polygons(uvs, offsets)
+    if len(tris) == 0:
+        return conflicts
+    tris = tris.reshape(-1, 3, 2) * (width, height)
+    tris = tris.astype(np.float64)
+    counts = np.diff(offsets)
+    tri_face = np.repeat(np.arange(len(counts)), np.maximum(counts - 2, 0))
+    tri_island = face_island[tri_face]
+    tri_y0 = np.min(tris[:, :, 1], axis=1)
+    tri_y1 = np.max(tris[:, :, 1], axis=1)
+
+    radius = padding // 2
+    margin = radius + 1
+    rows = max(1, max_texels // width - 2 * margin)
+    for y0 in range(0, height, rows):
+        if (cancelled is not None) and cancelled():
+            return None
+        y1 = min(y0 + rows, height)
+        tile_y0 = max(0, y0 - margin)
+        tile_y1 = min(height, y1 + margin)
+        coverage = TexelCoverage(width, tile_y1 - tile_y0)
+        mask = (tri_y1 >= tile_y0) & (tri_y0 <= tile_y1)
+        tile_tris = tris[mask]
+        tile_tris[:, :, 1] -= tile_y0
+        __rasterize_triangles(coverage, tile_tris, tri_island[mask],
+                              tri_face[mask])
+        coverage.dilate(radius)
+        if padding % 2 == 1:
+            coverage.mark_touching()
+        conflicts.add_tile(coverage, y0 - tile_y0, y1 - tile_y0, y0)
+
+    return conflicts
@@ -0,0 +1,355 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+import numpy as np
+
+
+__all__ = [
+    'calc_cell_size',
+    'filter_bbox_pairs',
+    'find_overlapped_bbox_pairs',
+    'UniformGrid',
+]
+
+
+# cells are enlarged until boxes are registered to this number of cells
+# on average
+MAX_ENTRIES_PER_BOX = 16
+
+# entries of moved boxes are merged into the sorted entries when they
+# exceed this ratio of the sorted entries
+MAX_PENDING_ENTRY_RATIO = 0.25
+
+# cell key is (x << 32) + y, so that the key of a cell never changes
+CELL_KEY_STRIDE = 1 << 32
+
+# bounding boxes are passed as two float arrays of shape (num_box, 2)
+#   bb_min: minimum coordinate of each box
+#   bb_max: maximum coordinate of each box
+
+
+def calc_cell_size(bb_min, bb_max):
+    """
+    Calculate cell size of uniform grid from size of boxes
+    Median of box extents is used so that most boxes cover only a few cells
+    """
+
+    if len(bb_min) == 0:
+        return 1.0
+    extent = np.max(bb_max - bb_min, axis=1)
+    size = float(np.median(extent))
+    if size <= 0.0:
+        size = float(np.max(extent))
+    if size <= 0.0:
+        size = 1.0
+
+    return size
+
+
+def __count_cell_entries(bb_min, bb_max, cell_size):
+    cmin = np.floor(bb_min / cell_size)
+    cmax = np.floor(bb_max / cell_size)
+
+    return np.sum(np.prod(cmax - cmin + 1, axis=1))
+
+
+def __get_cell_entries(bb_min, bb_max, cell_size):
+    """
+    Register each box to all cells it covers
+    Return (cell key, box index) for each entry
+    """
+
+    cmin = np.floor(bb_min / cell_size).astype(np.int64)
+    cmax = np.floor(bb_max / cell_size).astype(np.int64)
+    base = np.min(cmin, axis=0)
+    cmin -= base
+    cmax -= base
+    num_x = cmax[:, 0] - cmin[:, 0] + 1
+    num_y = cmax[:, 1] - cmin[:, 1] + 1
+    counts = num_x * num_y
+
+    boxes = np.repeat(np.arange(len(bb_min)), counts)
+    starts = np.cumsum(counts) - counts
+    local = np.arange(len(boxes)) - np.repeat(starts, counts)
+    cx = cmin[boxes, 0] + local % num_x[boxes]
+    cy = cmin[boxes, 1] + local // num_x[boxes]
+    keys = cx * (int(np.max(cmax[:, 1])) + 1) + cy
+
+    return keys, boxes
+
+
+def __get_pairs_in_cells(keys, boxes):
+    """
+    Enumerate all pairs of boxes registered to the same cell
+    """
+
+    order = np.argsort(keys, kind='mergesort')
+    keys = keys[order]
+    boxes = boxes[order]
+
+    # number of following entries in the same cell
+    is_start = np.ones(len(keys), dtype=bool)
+    is_start[1:] = keys[1:] != keys[:-1]
+    cell_starts = np.flatnonzero(is_start)
+    cell_ends = np.append(cell_starts[1:], len(keys))
+    cell_of_entry = np.cumsum(is_start) - 1
+    pos = np.arange(len(keys))
+    num_after = cell_ends[cell_of_entry] - pos - 1
+
+    first = np.repeat(pos, num_after)
+    starts = np.cumsum(num_after) - num_after
+    second = np.arange(len(first)) - np.repeat(starts, num_after) + \
+        first + 1
+
+    return boxes[first], boxes[second]
+
+
+def find_overlapped_bbox_pairs(bb_min, bb_max, groups=None, cell_size=None,
+                               same_group=False):
+    """
+    Find pairs of overlapped boxes by uniform grid
+    Boxes are registered to the cells they cover, and only boxes sharing a
+    cell are tested.  Touching boxes are treated as overlapped.
+    When groups is given, boxes in the same group are not paired unless
+    same_group is True, and each pair (a, b) satisfies
+    groups[a] <= groups[b] (and a < b in the same group).
+    Return two index arrays sorted by (groups of a, groups of b, a, b).
+    """
+
+    bb_min = np.asarray(bb_min, dtype=np.float64)
+    bb_max = np.asarray(bb_max, dtype=np.float64)
+    num_box = len(bb_min)
+    empty = np.zeros(0, dtype=np.int64)
+    if num_box < 2:
+        return empty, empty
+    if cell_size is None:
+        cell_size = calc_cell_size(bb_min, bb_max)
+    # enlarge cells when large boxes cover too many cells
+    while __count_cell_entries(bb_min, bb_max, cell_size) > \
+            MAX_ENTRIES_PER_BOX * num_box:
+        cell_size = cell_size * 2.0
+
+    keys, boxes = __get_cell_entries(bb_min, bb_max, cell_size)
+    a, b = __get_pairs_in_cells(keys, boxes)
+
+    return filter_bbox_pairs(a, b, bb_min, bb_max, groups, same_group)
+
+
+def filter_bbox_pairs(a, b, bb_min, bb_max, groups=None, same_group=False):
+    """
+    Filter candidate pairs of boxes found in the same cells
+    Pairs are oriented and deduplicated, and only pairs whose boxes overlap
+    are kept.  See find_overlapped_bbox_pairs for groups and same_group.
+    Return two index arrays sorted by (groups of a, groups of b, a, b).
+    """
+
+    num_box = len(bb_min)
+
+    # remove pairs in the same group
+    if groups is None:
+        groups = np.arange(num_box)
+    else:
+        groups = np.asarray(groups)
+    mask = a != b
+    if not same_group:
+        mask &= groups[a] != groups[b]
+    a = a[mask]
+    b = b[mask]
+
+    # orient and remove pairs found in multiple cells
+    swap = (groups[a] > groups[b]) | ((groups[a] == groups[b]) & (a > b))
+    a, b = np.where(swap, b, a), np.where(swap, a, b)
+    pair_keys = np.unique(a * num_box + b)
+    a = pair_keys // num_box
+    b = pair_keys % num_box
+
+    # exact test of boxes
+    mask = np.all(bb_max[a] >= bb_min[b], axis=1) & \
+        np.all(bb_max[b] >= bb_min[a], axis=1)
+    a = a[mask]
+    b = b[mask]
+
+    order = np.lexsort((b, a, groups[b], groups[a]))
+
+    return a[order], b[order]
+
+
+class UniformGrid():
+    """
+    Uniform grid of bounding boxes which can be moved one by one
+    Entries (cell key, box) are kept sorted by cell key, and the entries of
+    moved boxes are appended to a small unsorted array until it is merged.
+    Each entry has the stamp of its box when it is registered, and entries
+    whose stamp is older than the box are dropped.  So moving and querying
+    boxes costs only the cells of these boxes, not the whole grid.
+    Boxes moved to cover more cells than any box did when the grid was built
+    are not registered to cells but tested against all boxes instead.
+    """
+
+    def __init__(self, bb_min, bb_max, cell_size=None):
+        self.bb_min = np.array(bb_min, dtype=np.float64).reshape(-1, 2)
+        self.bb_max = np.array(bb_max, dtype=np.float64).reshape(-1, 2)
+        num_box = len(self.bb_min)
+        if cell_size is None:
+            cell_size = calc_cell_size(self.bb_min, self.bb_max)
+            # enlarge cells when large boxes cover too many cells
+            while np.sum(self.__count_cells(np.arange(num_box),
+                                            cell_size)) > \
+                    MAX_ENTRIES_PER_BOX * num_box:
+                cell_size = cell_size * 2.0
+        self.cell_size = cell_size
+        self.__box_stamps = np.zeros(num_box, dtype=np.int64)
+        counts = self.__count_cells(np.arange(num_box), cell_size)
+        self.__max_cells = max(MAX_ENTRIES_PER_BOX, np.max(counts)) \
+            if num_box > 0 else MAX_ENTRIES_PER_BOX
+        self.__oversized = np.zeros(num_box, dtype=bool)
+
+        keys, boxes = self.__get_entries(np.arange(num_box))
+        order = np.argsort(keys, kind='mergesort')
+        self.__keys = keys[order]
+        self.__boxes = boxes[order]
+        self.__stamps = np.zeros(len(keys), dtype=np.int64)
+        empty = np.zeros(0, dtype=np.int64)
+        self.__pending = (empty, empty, empty)
+
+    def __len__(self):
+        return len(self.bb_min)
+
+    def __count_cells(self, indices, cell_size):
+        # counted in float so that huge boxes do not overflow
+        cmin = np.floor(self.bb_min[indices] / cell_size)
+        cmax = np.floor(self.bb_max[indices] / cell_size)
+
+        return np.prod(cmax - cmin + 1, axis=1)
+
+    def __get_entries(self, indices):
+        """
+        Register boxes of indices to all cells they cover
+        Return (cell key, box index) for each entry
+        """
+
+        cmin = np.floor(self.bb_min[indices] / self.cell_size) \
+            .astype(np.int64)
+        cmax = np.floor(self.bb_max[indices] / self.cell_size) \
+            .astype(np.int64)
+        num_x = cmax[:, 0] - cmin[:, 0] + 1
+        num_y = cmax[:, 1] - cmin[:, 1] + 1
+        counts = num_x * num_y
+
+        entry_of = np.repeat(np.arange(len(indices)), counts)
+        starts = np.cumsum(counts) - counts
+        local = np.arange(len(entry_of)) - np.repeat(starts, counts)
+        cx = cmin[entry_of, 0] + local % num_x[entry_of]
+        cy = cmin[entry_of, 1] + local // num_x[entry_of]
+
+        return cx * CELL_KEY_STRIDE + cy, indices[entry_of]
+
+    def __match_entries(self, entries, keys, boxes):
+        """
+        Pair query entries (keys, boxes) with the live entries sorted by
+        cell key
+        """
+
+        entry_keys, entry_boxes, entry_stamps = entries
+        lo = np.searchsorted(entry_keys, keys, 'left')
+        hi = np.searchsorted(entry_keys, keys, 'right')
+        counts = hi - lo
+        starts = np.cumsum(counts) - counts
+        found = np.repeat(lo - starts, counts) + np.arange(np.sum(counts))
+        a = np.repeat(boxes, counts)
+        b = entry_boxes[found]
+        live = entry_stamps[found] == self.__box_stamps[b]
+
+        return a[live], b[live]
+
+    def __merge(self):
+        keys, boxes, stamps = self.__pending
+        keys = np.concatenate((self.__keys, keys))
+        boxes = np.concatenate((self.__boxes, boxes))
+        stamps = np.concatenate((self.__stamps, stamps))
+        live = stamps == self.__box_stamps[boxes]
+        order = np.argsort(keys[live], kind='mergesort')
+        self.__keys = keys[live][order]
+        self.__boxes = boxes[live][order]
+        self.__stamps = stamps[live][order]
+        empty = np.zeros(0, dtype=np.int64)
+        self.__pending = (empty, empty, empty)
+
+    def move(self, indices, bb_min, bb_max):
+        """
+        Move boxes of indices to new bounding boxes
+        """
+
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == 0:
+            return
+        self.bb_min[indices] = bb_min
+        self.bb_max[indices] = bb_max
+        self.__box_stamps[indices] += 1
+        oversized = self.__count_cells(indices, self.cell_size) > \
+            self.__max_cells
+        self.__oversized[indices] = oversized
+
+        keys, boxes = self.__get_entries(indices[~oversized])
+        pending_keys, pending_boxes, pending_stamps = self.__pending
+        self.__pending = (
+            np.concatenate((pending_keys, keys)),
+            np.concatenate((pending_boxes, boxes)),
+            np.concatenate((pending_stamps, self.__box_stamps[boxes])))
+        if len(self.__pending[0]) > \
+                MAX_PENDING_ENTRY_RATIO * len(self.__keys):
+            self.__merge()
+
+    def find_pairs(self, indices, groups=None, same_group=False):
+        """
+        Find pairs of overlapped boxes which include any box of indices
+        See find_overlapped_bbox_pairs for groups and same_group.
+        Return two index arrays sorted by (groups of a, groups of b, a, b).
+        """
+
+        indices = np.asarray(indices, dtype=np.int64)
+        is_oversized = self.__oversized[indices]
+        small = indices[~is_oversized]
+        large = indices[is_oversized]
+        keys, boxes = self.__get_entries(small)
+        a1, b1 = self.__match_entries(
+            (self.__keys, self.__boxes, self.__stamps), keys, boxes)
+        pending_keys, pending_boxes, pending_stamps = self.__pending
+        order = np.argsort(pending_keys, kind='mergesort')
+        a2, b2 = self.__match_entries(
+            (pending_keys[order], pending_boxes[order],
+             pending_stamps[order]), keys, boxes)
+
+        # oversized boxes are not in cells
+        oversized = np.flatnonzero(self.__oversized)
+        a3 = np.repeat(small, len(oversized))
+        b3 = np.tile(oversized, len(small))
+        a4 = np.repeat(large, len(self))
+        b4 = np.tile(np.arange(len(self)), len(large))
+
+        return filter_bbox_pairs(np.concatenate((a1, a2, a3, a4)),
+                                 np.concatenate((b1, b2, b3, b4)),
+                                 self.bb_min, self.bb_max, groups,
+                                 same_group)
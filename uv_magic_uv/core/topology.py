@@ -0,0 +1,321 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+import numpy as np
+
+from . import geometry
+
+
+__all__ = [
+    'MAX_REFINEMENT_ROUNDS',
+    'find_loop_twins',
+    'calc_face_signatures',
+    'calc_island_signatures',
+    'IslandTopology',
+]
+
+
+# face signatures are refined at most this number of times
+MAX_REFINEMENT_ROUNDS = 16
+
+# Signatures are 64 bit hashes.  Integer overflow wraps around, so that
+# same topology always results in the same signature.
+
+
+def __mix(x):
+    x = (x ^ (x >> 29)) * 6364136223846793005
+    x = (x ^ (x >> 32)) * 1442695040888963407
+    return x ^ (x >> 29)
+
+
+def find_loop_twins(uvs, loop_verts, offsets, precision=5):
+    """
+    Find the loop in the other face sharing the edge starting at each loop
+    The edge is shared when both faces use the same vertices with the same
+    UV coordinates at both ends.  Edges shared by more than two faces are
+    treated as boundary.
+    Return twin loop of each loop (-1 for boundary)
+    """
+
+    num_loop = len(loop_verts)
+    twins = np.full(num_loop, -1, dtype=np.int64)
+    if num_loop == 0:
+        return twins
+
+    # identify vertex on UV space by (vertex index, rounded UV)
+    rounded = np.round(uvs, precision) + 0.0    # remove negative zero
+    keys = np.column_stack((loop_verts, rounded.view(np.int64)))
+    _, uv_verts = np.unique(keys, axis=0, return_inverse=True)
+    uv_verts = uv_verts.reshape(-1)
+
+    start = uv_verts
+    end = uv_verts[geometry.get_next_loops(offsets)]
+    lo = np.minimum(start, end)
+    hi = np.maximum(start, end)
+    order = np.lexsort((hi, lo))
+    lo = lo[order]
+    hi = hi[order]
+    same = (lo[1:] == lo[:-1]) & (hi[1:] == hi[:-1])
+
+    # only pairs which are not followed nor preceded by the same edge
+    single = same.copy()
+    single[1:] &= ~same[:-1]
+    single[:-1] &= ~same[1:]
+    la = order[:-1][single]
+    lb = order[1:][single]
+    face_of_loops = geometry.get_face_of_loops(offsets)
+    valid = face_of_loops[la] != face_of_loops[lb]
+    twins[la[valid]] = lb[valid]
+    twins[lb[valid]] = la[valid]
+
+    return twins
+
+
+def calc_face_signatures(offsets, twins, max_rounds=MAX_REFINEMENT_ROUNDS):
+    """
+    Calculate signature of topology around each face
+    Starting from the number of loops, the signature is refined by the
+    multiset of signatures of the adjacent faces (Weisfeiler-Lehman
+    refinement) until the number of distinct signatures stops growing.
+    Signature does not depend on the order nor the direction of loops.
+    """
+
+    num_face = len(offsets) - 1
+    if num_face <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    face_of_loops = geometry.get_face_of_loops(offsets)
+    boundary = twins < 0
+    twin_faces = face_of_loops[np.where(boundary, 0, twins)]
+    sigs = __mix(np.diff(offsets).astype(np.int64))
+    num_sig = len(np.unique(sigs))
+    for _ in range(max_rounds):
+        neighbours = np.where(boundary, -1, sigs[twin_faces])
+        multiset = np.add.reduceat(__mix(neighbours), offsets[:-1])
+        new_sigs = __mix(sigs * 31 + multiset)
+        num_new_sig = len(np.unique(new_sigs))
+        sigs = new_sigs
+        if num_new_sig <= num_sig:
+            break
+        num_sig = num_new_sig
+
+    return sigs
+
+
+def calc_island_signatures(face_signatures, face_island, num_island):
+    """
+    Calculate signature of topology of each island
+    Islands which are the same topology have the same signature.
+    """
+
+    sigs = np.zeros(num_island, dtype=np.int64)
+    np.add.at(sigs, face_island, __mix(face_signatures))
+    counts = np.bincount(face_island, minlength=num_island)
+
+    return __mix(sigs * 31 + counts)
+
+
+class IslandTopology():
+    """
+    Connectivity of loops on UV space and signatures of islands
+    Faces of islands which have the same signature are matched by walking
+    both islands in the same canonical order.
+    """
+
+    def __init__(self, uvs, loop_verts, offsets, face_island,
+                 precision=5):
+        num_island = int(face_island.max()) + 1 if len(face_island) else 0
+
+        self.uvs = uvs
+        self.offsets = offsets
+        self.twins = find_loop_twins(uvs, loop_verts, offsets, precision)
+        self.face_signatures = calc_face_signatures(offsets, self.twins)
+        self.island_signatures = calc_island_signatures(
+            self.face_signatures, face_island, num_island)
+
+        self.next_loops = geometry.get_next_loops(offsets)
+        self.prev_loops = np.empty(len(self.next_loops), dtype=np.int64)
+        self.prev_loops[self.next_loops] = np.arange(len(self.next_loops))
+
+        # walking is done on lists, which are faster to index one by one
+        self.__face_of_loops = geometry.get_face_of_loops(offsets).tolist()
+        self.__counts = np.diff(offsets).tolist()
+        self.__next = self.next_loops.tolist()
+        self.__prev = self.prev_loops.tolist()
+        self.__twins = self.twins.tolist()
+        self.__offsets = offsets.tolist()
+        self.__uvs = uvs.tolist()
+        self.__face_counts = np.diff(offsets)
+        if len(self.__face_counts):
+            self.__face_uv_sums = np.add.reduceat(uvs, offsets[:-1], axis=0)
+        else:
+            self.__face_uv_sums = np.zeros((0, 2))
+        self.__bases = {}       # first face of island -> walk of island
+
+    def walk(self, start, reverse=False, expected=None):
+        """
+        Enumerate loops of the island which contains the start loop
+        Faces are visited in breadth first order across the shared edges,
+        and loops of each face are enumerated from the loop the face is
+        entered.  When reverse is True, loops are enumerated backwards, so
+        that the mirrored island is walked in the same order.
+        The code records the number of loops of each face and where the
+        twin of each loop is.  Walking stops as soon as the code differs
+        from expected.
+        Return (loops, code), or None when the code differs.
+        """
+
+        face_of_loops = self.__face_of_loops
+        counts = self.__counts
+        step = self.__prev if reverse else self.__next
+        twins = self.__twins
+        nxt = self.__next
+        prev = self.__prev
+
+        def twin(l):
+            if not reverse:
+                return twins[l]
+            t = twins[prev[l]]
+            return nxt[t] if t >= 0 else -1
+
+        entered = {}        # face -> order of visit
+        position = {}       # loop -> position in the face
+        faces = []          # loops of visited faces
+
+        def enter(l):
+            entered[face_of_loops[l]] = len(faces)
+            seq = []
+            for i in range(counts[face_of_loops[l]]):
+                position[l] = i
+                seq.append(l)
+                l = step[l]
+            faces.append(seq)
+
+        code = []
+        checked = 0
+        enter(start)
+        i = 0
+        while i < len(faces):
+            code.append(len(faces[i]))
+            for l in faces[i]:
+                t = twin(l)
+                if t < 0:
+                    code.extend((-1, -1))
+                else:
+                    if face_of_loops[t] not in entered:
+                        enter(t)
+                    code.extend((entered[face_of_loops[t]], position[t]))
+            if expected is not None:
+                if code[checked:] != expected[checked:len(code)]:
+                    return None
+                checked = len(code)
+            i = i + 1
+
+        if (expected is not None) and (len(code) != len(expected)):
+            return None
+
+        return [l for seq in faces for l in seq], code
+
+    def __get_center(self, faces):
+        return np.sum(self.__face_uv_sums[faces], axis=0) / \
+            np.sum(self.__face_counts[faces])
+
+    def __walk_base(self, faces):
+        """
+        Walk island from a face whose signature is the rarest in the island
+        Result is kept, because the same island is matched with many
+        islands.
+        """
+
+        key = int(faces[0])
+        if key in self.__bases:
+            return self.__bases[key]
+
+        sigs = self.face_signatures[faces]
+        uniq, counts = np.unique(sigs, return_counts=True)
+        anchor = uniq[np.argmin(counts)]
+        start = int(self.offsets[faces[sigs == anchor][0]])
+        loops, code = self.walk(start)
+        if len(loops) != int(np.sum(self.__face_counts[faces])):
+            base = None     # faces connected only by vertices
+        else:
+            center = self.__get_center(faces)
+            uvs = self.uvs[[start, self.__next[start]]] - center
+            base = {
+                'anchor': anchor,
+                'num_anchor': int(np.min(counts)),
+                'loops': np.array(loops, dtype=np.int64),
+                'code': code,
+                'uvs': uvs.ravel().tolist(),
+            }
+        self.__bases[key] = base
+
+        return base
+
+    def match(self, faces_1, faces_2):
+        """
+        Find correspondence of loops between islands of the same topology
+        Island 1 is walked from a face whose signature is the rarest in
+        the island, and island 2 is walked from every loop (in both
+        directions) of the faces with the same signature until the walk
+        results in the same code.  Among the automorphisms, the one whose
+        start loop is the nearest on UV space (relative to the island
+        center) is tried first.
+        Return (loops of island 1, loops of island 2), or None if islands
+        do not match.
+        """
+
+        faces_1 = np.asarray(faces_1)
+        faces_2 = np.asarray(faces_2)
+        if len(faces_1) != len(faces_2):
+            return None
+        base = self.__walk_base(faces_1)
+        if base is None:
+            return None
+
+        # candidates of start loop in island 2
+        cand_faces = faces_2[self.face_signatures[faces_2] == base['anchor']]
+        if len(cand_faces) != base['num_anchor']:
+            return None
+        cx, cy = self.__get_center(faces_2).tolist()
+        bx0, by0, bx1, by1 = base['uvs']
+        uvs = self.__uvs
+        cands = []
+        for f in cand_faces.tolist():
+            for l in range(self.__offsets[f], self.__offsets[f + 1]):
+                d = (uvs[l][0] - cx - bx0) ** 2 + (uvs[l][1] - cy - by0) ** 2
+                for reverse, n in ((False, self.__next[l]),
+                                   (True, self.__prev[l])):
+                    cands.append((d + (uvs[n][0] - cx - bx1) ** 2 +
+                                  (uvs[n][1] - cy - by1) ** 2,
+                                  len(cands), l, reverse))
+        cands.sort()
+
+        for _, _, l, reverse in cands:
+            result = self.walk(l, reverse, base['code'])
+            if result is not None:
+                return base['loops'], np.array(result[0], dtype=np.int64)
+
+        return None
@@ -23,15 +23,13 @@ __status__ = "production"
 __version__ = "5.1"
 __date__ = "24 Feb 2018"
 
-import math
-from math import atan2, tan, sin, cos
-
 import bpy
 import bmesh
 from mathutils import Vector
 from bpy.props import EnumProperty, BoolProperty
 
 from .. import common
+from .. import core
 
 
 __all__ = [
@@ -84,34 +82,17 @@ def get_loop_uv_len(loops, uv_layer):
 
 # get center/radius of circle by 3 vertices
 def get_circle(v):
-    alpha = atan2((v[0].y - v[1].y), (v[0].x - v[1].x)) + math.pi / 2
-    beta = atan2((v[1].y - v[2].y), (v[1].x - v[2].x)) + math.pi / 2
-    ex = (v[0].x + v[1].x) / 2.0
-    ey = (v[0].y + v[1].y) / 2.0
-    fx = (v[1].x + v[2].x) / 2.0
-    fy = (v[1].y + v[2].y) / 2.0
-    cx = (ey - fy - ex * tan(alpha) + fx * tan(beta)) / \
-         (tan(beta) - tan(alpha))
-    cy = ey - (ex - cx) * tan(alpha)
-    center = Vector((cx, cy))
-
-    r = v[0] - center
-    radian = r.length
+    center, radius = core.geometry.calc_circle([p[:] for p in v[:3]])
 
-    return center, radian
+    return Vector(center.tolist()), radius
 
 
 # get position on circle with same arc length
 def calc_v_on_circle(v, center, radius):
-    base = v[0]
-    theta = atan2(base.y - center.y, base.x - center.x)
-    new_v = []
-    for i in range(len(v)):
-        angle = theta + i * 2 * math.pi / len(v)
-        new_v.append(Vector((center.x + radius * sin(angle),
-                             center.y + radius * cos(angle))))
+    new_v = core.geometry.calc_points_on_circle(v[0][:], center[:], radius,
+                                                len(v))
 
-    return new_v
+    return [Vector(p) for p in new_v.tolist()]
 
 
 class MUV_AUVCircle(bpy.types.Operator):
@@ -190,7 +171,7 @@ class MUV_AUVCircle(bpy.types.Operator):
                     pair[0][uv_layer].select = True
                     pair[1][uv_layer].select = True
 
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
 
@@ -405,7 +386,7 @@ class MUV_AUVStraighten(bpy.types.Operator):
         # align
         self.__align(loop_seqs, uv_layer)
 
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
 
@@ -780,6 +761,6 @@ class MUV_AUVAxis(bpy.types.Operator):
 
         self.__align(loop_seqs, uv_layer, uv_min, width, height)
 
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
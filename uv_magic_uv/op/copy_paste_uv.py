@@ -28,6 +28,7 @@ from math import atan2, sin, cos
 
 import bpy
 import bmesh
+import numpy as np
 from bpy.props import (
     StringProperty,
     BoolProperty,
@@ -37,6 +38,7 @@ from bpy.props import (
 from mathutils import Vector
 
 from .. import common
+from .. import core
 
 
 __all__ = [
@@ -72,6 +74,66 @@ def is_valid_context(context):
     return True
 
 
+def copy_uv_data(props, bm, uv_layer, faces):
+    """
+    Store UVs, pinned flags and seams of faces to props
+    """
+
+    if not faces:
+        props.src_offsets = None
+        props.src_uvs = None
+        props.src_pin_uvs = None
+        props.src_seams = None
+        return
+
+    arrays = common.MeshArrays(bm, uv_layer, faces)
+    props.src_offsets = arrays.offsets
+    props.src_uvs = arrays.uvs
+    props.src_pin_uvs = arrays.pin_uvs
+    props.src_seams = arrays.seams
+
+
+def paste_uv_data(op, props, bm, uv_layer, faces):
+    """
+    Paste UVs, pinned flags and seams stored in props to faces
+    Return False when faces do not match to the copied faces
+    """
+
+    src_offsets = props.src_offsets
+    num_src = len(src_offsets) - 1
+    if op.strategy == 'N_N' and num_src != len(faces):
+        op.report(
+            {'WARNING'},
+            "Number of selected faces is different from copied faces " +
+            "(src:%d, dest:%d)" % (num_src, len(faces)))
+        return False
+
+    arrays = common.MeshArrays(bm, uv_layer, faces)
+    dest_offsets = arrays.offsets
+
+    # source face of each destination face
+    src_faces = np.arange(len(faces)) % num_src
+    src_counts = np.diff(src_offsets)[src_faces]
+    if np.any(src_counts != np.diff(dest_offsets)):
+        op.report({'WARNING'}, "Some faces are different size")
+        return False
+
+    # map flipped/rotated loops of destination to source loops
+    dest_src = core.geometry.get_flipped_rotated_loops(
+        dest_offsets, op.flip_copied_uv, op.rotate_copied_uv)
+    face_of_loops = core.geometry.get_face_of_loops(dest_offsets)
+    src = src_offsets[src_faces][face_of_loops] + \
+        (dest_src - dest_offsets[face_of_loops])
+
+    arrays.uvs[:] = props.src_uvs[src]
+    arrays.pin_uvs[:] = props.src_pin_uvs[src]
+    if op.copy_seams is True:
+        arrays.seams[:] = props.src_seams[src]
+    arrays.write_back()
+
+    return True
+
+
 class MUV_CPUVCopyUV(bpy.types.Operator):
     """
     Operation class: Copy UV coordinate
@@ -111,21 +173,12 @@ class MUV_CPUVCopyUV(bpy.types.Operator):
             uv_layer = bm.loops.layers.uv[self.uv_map]
 
         # get selected face
-        props.src_uvs = []
-        props.src_pin_uvs = []
-        props.src_seams = []
-        for face in bm.faces:
-            if face.select:
-                uvs = [l[uv_layer].uv.copy() for l in face.loops]
-                pin_uvs = [l[uv_layer].pin_uv for l in face.loops]
-                seams = [l.edge.seam for l in face.loops]
-                props.src_uvs.append(uvs)
-                props.src_pin_uvs.append(pin_uvs)
-                props.src_seams.append(seams)
-        if not props.src_uvs or not props.src_pin_uvs:
+        sel_faces = [f for f in bm.faces if f.select]
+        copy_uv_data(props, bm, uv_layer, sel_faces)
+        if not sel_faces:
             self.report({'WARNING'}, "No faces are selected")
             return {'CANCELLED'}
-        self.report({'INFO'}, "%d face(s) are selected" % len(props.src_uvs))
+        self.report({'INFO'}, "%d face(s) are selected" % len(sel_faces))
 
         return {'FINISHED'}
 
@@ -203,13 +256,13 @@ class MUV_CPUVPasteUV(bpy.types.Operator):
     def poll(cls, context):
         sc = context.scene
         props = sc.muv_props.cpuv
-        if not props.src_uvs or not props.src_pin_uvs:
+        if props.src_offsets is None:
             return False
         return is_valid_context(context)
 
     def execute(self, context):
         props = context.scene.muv_props.cpuv
-        if not props.src_uvs or not props.src_pin_uvs:
+        if props.src_offsets is None:
             self.report({'WARNING'}, "Need copy UV at first")
             return {'CANCELLED'}
         if self.uv_map == "":
@@ -233,75 +286,17 @@ class MUV_CPUVPasteUV(bpy.types.Operator):
             uv_layer = bm.loops.layers.uv[self.uv_map]
 
         # get selected face
-        dest_uvs = []
-        dest_pin_uvs = []
-        dest_seams = []
-        dest_face_indices = []
-        for face in bm.faces:
-            if face.select:
-                dest_face_indices.append(face.index)
-                uvs = [l[uv_layer].uv.copy() for l in face.loops]
-                pin_uvs = [l[uv_layer].pin_uv for l in face.loops]
-                seams = [l.edge.seam for l in face.loops]
-                dest_uvs.append(uvs)
-                dest_pin_uvs.append(pin_uvs)
-                dest_seams.append(seams)
-        if not dest_uvs or not dest_pin_uvs:
+        sel_faces = [f for f in bm.faces if f.select]
+        if not sel_faces:
             self.report({'WARNING'}, "No faces are selected")
             return {'CANCELLED'}
-        if self.strategy == 'N_N' and len(props.src_uvs) != len(dest_uvs):
-            self.report(
-                {'WARNING'},
-                "Number of selected faces is different from copied" +
-                "(src:%d, dest:%d)" %
-                (len(props.src_uvs), len(dest_uvs)))
-            return {'CANCELLED'}
 
         # paste
-        for i, idx in enumerate(dest_face_indices):
-            suv = None
-            spuv = None
-            ss = None
-            duv = None
-            if self.strategy == 'N_N':
-                suv = props.src_uvs[i]
-                spuv = props.src_pin_uvs[i]
-                ss = props.src_seams[i]
-                duv = dest_uvs[i]
-            elif self.strategy == 'N_M':
-                suv = props.src_uvs[i % len(props.src_uvs)]
-                spuv = props.src_pin_uvs[i % len(props.src_pin_uvs)]
-                ss = props.src_seams[i % len(props.src_seams)]
-                duv = dest_uvs[i]
-            if len(suv) != len(duv):
-                self.report({'WARNING'}, "Some faces are different size")
-                return {'CANCELLED'}
-            suvs_fr = [uv for uv in suv]
-            spuvs_fr = [pin_uv for pin_uv in spuv]
-            ss_fr = [s for s in ss]
-            # flip UVs
-            if self.flip_copied_uv is True:
-                suvs_fr.reverse()
-                spuvs_fr.reverse()
-                ss_fr.reverse()
-            # rotate UVs
-            for _ in range(self.rotate_copied_uv):
-                uv = suvs_fr.pop()
-                pin_uv = spuvs_fr.pop()
-                s = ss_fr.pop()
-                suvs_fr.insert(0, uv)
-                spuvs_fr.insert(0, pin_uv)
-                ss_fr.insert(0, s)
-            # paste UVs
-            for l, suv, spuv, ss in zip(bm.faces[idx].loops, suvs_fr,
-                                        spuvs_fr, ss_fr):
-                l[uv_layer].uv = suv
-                l[uv_layer].pin_uv = spuv
-                if self.copy_seams is True:
-                    l.edge.seam = ss
-        self.report({'INFO'}, "%d face(s) are copied" % len(dest_uvs))
-
-        bmesh.update_edit_mesh(obj.data)
+        if not paste_uv_data(self, props, bm, uv_layer, sel_faces):
+            return {'CANCELLED'}
+        self.report({'INFO'}, "%d face(s) are copied" % len(sel_faces))
+
+        common.update_edit_mesh(obj.data)
         if self.copy_seams is True:
             obj.data.show_edge_seams = True
 
@@ -321,7 +316,7 @@ class MUV_CPUVPasteUVMenu(bpy.types.Menu):
     def poll(cls, context):
         sc = context.scene
         props = sc.muv_props.cpuv
-        if not props.src_uvs or not props.src_pin_uvs:
+        if props.src_offsets is None:
             return False
         return is_valid_context(context)
 
@@ -386,21 +381,13 @@ class MUV_CPUVSelSeqCopyUV(bpy.types.Operator):
             uv_layer = bm.loops.layers.uv[self.uv_map]
 
         # get selected face
-        props.src_uvs = []
-        props.src_pin_uvs = []
-        props.src_seams = []
-        for hist in bm.select_history:
-            if isinstance(hist, bmesh.types.BMFace) and hist.select:
-                uvs = [l[uv_layer].uv.copy() for l in hist.loops]
-                pin_uvs = [l[uv_layer].pin_uv for l in hist.loops]
-                seams = [l.edge.seam for l in hist.loops]
-                props.src_uvs.append(uvs)
-                props.src_pin_uvs.append(pin_uvs)
-                props.src_seams.append(seams)
-        if not props.src_uvs or not props.src_pin_uvs:
+        sel_faces = [hist for hist in bm.select_history
+                     if isinstance(hist, bmesh.types.BMFace) and hist.select]
+        copy_uv_data(props, bm, uv_layer, sel_faces)
+        if not sel_faces:
             self.report({'WARNING'}, "No faces are selected")
             return {'CANCELLED'}
-        self.report({'INFO'}, "%d face(s) are selected" % len(props.src_uvs))
+        self.report({'INFO'}, "%d face(s) are selected" % len(sel_faces))
 
         return {'FINISHED'}
 
@@ -473,13 +460,13 @@ class MUV_CPUVSelSeqPasteUV(bpy.types.Operator):
     def poll(cls, context):
         sc = context.scene
         props = sc.muv_props.cpuv_selseq
-        if not props.src_uvs or not props.src_pin_uvs:
+        if props.src_offsets is None:
             return False
         return is_valid_context(context)
 
     def execute(self, context):
         props = context.scene.muv_props.cpuv_selseq
-        if not props.src_uvs or not props.src_pin_uvs:
+        if props.src_offsets is None:
             self.report({'WARNING'}, "Need copy UV at first")
             return {'CANCELLED'}
         if self.uv_map == "":
@@ -506,76 +493,18 @@ class MUV_CPUVSelSeqPasteUV(bpy.types.Operator):
             uv_layer = bm.loops.layers.uv[self.uv_map]
 
         # get selected face
-        dest_uvs = []
-        dest_pin_uvs = []
-        dest_seams = []
-        dest_face_indices = []
-        for hist in bm.select_history:
-            if isinstance(hist, bmesh.types.BMFace) and hist.select:
-                dest_face_indices.append(hist.index)
-                uvs = [l[uv_layer].uv.copy() for l in hist.loops]
-                pin_uvs = [l[uv_layer].pin_uv for l in hist.loops]
-                seams = [l.edge.seam for l in hist.loops]
-                dest_uvs.append(uvs)
-                dest_pin_uvs.append(pin_uvs)
-                dest_seams.append(seams)
-        if not dest_uvs or not dest_pin_uvs:
+        sel_faces = [hist for hist in bm.select_history
+                     if isinstance(hist, bmesh.types.BMFace) and hist.select]
+        if not sel_faces:
             self.report({'WARNING'}, "No faces are selected")
             return {'CANCELLED'}
-        if self.strategy == 'N_N' and len(props.src_uvs) != len(dest_uvs):
-            self.report(
-                {'WARNING'},
-                "Number of selected faces is different from copied faces " +
-                "(src:%d, dest:%d)"
-                % (len(props.src_uvs), len(dest_uvs)))
-            return {'CANCELLED'}
 
         # paste
-        for i, idx in enumerate(dest_face_indices):
-            suv = None
-            spuv = None
-            ss = None
-            duv = None
-            if self.strategy == 'N_N':
-                suv = props.src_uvs[i]
-                spuv = props.src_pin_uvs[i]
-                ss = props.src_seams[i]
-                duv = dest_uvs[i]
-            elif self.strategy == 'N_M':
-                suv = props.src_uvs[i % len(props.src_uvs)]
-                spuv = props.src_pin_uvs[i % len(props.src_pin_uvs)]
-                ss = props.src_seams[i % len(props.src_seams)]
-                duv = dest_uvs[i]
-            if len(suv) != len(duv):
-                self.report({'WARNING'}, "Some faces are different size")
-                return {'CANCELLED'}
-            suvs_fr = [uv for uv in suv]
-            spuvs_fr = [pin_uv for pin_uv in spuv]
-            ss_fr = [s for s in ss]
-            # flip UVs
-            if self.flip_copied_uv is True:
-                suvs_fr.reverse()
-                spuvs_fr.reverse()
-                ss_fr.reverse()
-            # rotate UVs
-            for _ in range(self.rotate_copied_uv):
-                uv = suvs_fr.pop()
-                pin_uv = spuvs_fr.pop()
-                s = ss_fr.pop()
-                suvs_fr.insert(0, uv)
-                spuvs_fr.insert(0, pin_uv)
-                ss_fr.insert(0, s)
-            # paste UVs
-            for l, suv, spuv, ss in zip(bm.faces[idx].loops, suvs_fr,
-                                        spuvs_fr, ss_fr):
-                l[uv_layer].uv = suv
-                l[uv_layer].pin_uv = spuv
-                if self.copy_seams is True:
-                    l.edge.seam = ss
-
-        self.report({'INFO'}, "%d face(s) are copied" % len(dest_uvs))
-
-        bmesh.update_edit_mesh(obj.data)
+        if not paste_uv_data(self, props, bm, uv_layer, sel_faces):
+            return {'CANCELLED'}
+        self.report({'INFO'}, "%d face(s) are copied" % len(sel_faces))
+
+        common.update_edit_mesh(obj.data)
         if self.copy_seams is True:
             obj.data.show_edge_seams = True
 
@@ -595,7 +524,7 @@ class MUV_CPUVSelSeqPasteUVMenu(bpy.types.Menu):
     def poll(cls, context):
         sc = context.scene
         props = sc.muv_props.cpuv_selseq
-        if not props.src_uvs or not props.src_pin_uvs:
+        if props.src_offsets is None:
             return False
         return is_valid_context(context)
 
@@ -263,7 +263,7 @@ class MUV_CPUVObjPasteUV(bpy.types.Operator):
                     if self.copy_seams is True:
                         l.edge.seam = ss
 
-            bmesh.update_edit_mesh(obj.data)
+            common.update_edit_mesh(obj.data)
             if self.copy_seams is True:
                 obj.data.show_edge_seams = True
 
@@ -171,6 +171,6 @@ class MUV_CPUVIEPasteUV(bpy.types.Operator):
                     dest_base
                 l[uv_layer].uv = target_uv
 
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
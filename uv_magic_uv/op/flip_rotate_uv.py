@@ -31,6 +31,7 @@ from bpy.props import (
 )
 
 from .. import common
+from .. import core
 
 
 __all__ = [
@@ -104,54 +105,26 @@ class MUV_FlipRot(bpy.types.Operator):
         uv_layer = bm.loops.layers.uv.verify()
 
         # get selected face
-        dest_uvs = []
-        dest_pin_uvs = []
-        dest_seams = []
-        dest_face_indices = []
-        for face in bm.faces:
-            if face.select:
-                dest_face_indices.append(face.index)
-                uvs = [l[uv_layer].uv.copy() for l in face.loops]
-                pin_uvs = [l[uv_layer].pin_uv for l in face.loops]
-                seams = [l.edge.seam for l in face.loops]
-                dest_uvs.append(uvs)
-                dest_pin_uvs.append(pin_uvs)
-                dest_seams.append(seams)
-        if not dest_uvs or not dest_pin_uvs:
+        sel_faces = [f for f in bm.faces if f.select]
+        if not sel_faces:
             self.report({'WARNING'}, "No faces are selected")
             return {'CANCELLED'}
-        self.report({'INFO'}, "%d face(s) are selected" % len(dest_uvs))
-
-        # paste
-        for idx, duvs, dpuvs, dss in zip(dest_face_indices, dest_uvs,
-                                         dest_pin_uvs, dest_seams):
-            duvs_fr = [uv for uv in duvs]
-            dpuvs_fr = [pin_uv for pin_uv in dpuvs]
-            dss_fr = [s for s in dss]
-            # flip UVs
-            if self.flip is True:
-                duvs_fr.reverse()
-                dpuvs_fr.reverse()
-                dss_fr.reverse()
-            # rotate UVs
-            for _ in range(self.rotate):
-                uv = duvs_fr.pop()
-                pin_uv = dpuvs_fr.pop()
-                s = dss_fr.pop()
-                duvs_fr.insert(0, uv)
-                dpuvs_fr.insert(0, pin_uv)
-                dss_fr.insert(0, s)
-            # paste UVs
-            for l, duv, dpuv, ds in zip(
-                    bm.faces[idx].loops, duvs_fr, dpuvs_fr, dss_fr):
-                l[uv_layer].uv = duv
-                l[uv_layer].pin_uv = dpuv
-                if self.seams is True:
-                    l.edge.seam = ds
-
-        self.report({'INFO'}, "%d face(s) are flipped/rotated" % len(dest_uvs))
-
-        bmesh.update_edit_mesh(obj.data)
+        self.report({'INFO'}, "%d face(s) are selected" % len(sel_faces))
+
+        # flip/rotate UVs
+        arrays = common.MeshArrays(bm, uv_layer, sel_faces)
+        src = core.geometry.get_flipped_rotated_loops(
+            arrays.offsets, self.flip, self.rotate)
+        arrays.uvs[:] = arrays.uvs[src]
+        arrays.pin_uvs[:] = arrays.pin_uvs[src]
+        if self.seams is True:
+            arrays.seams[:] = arrays.seams[src]
+        arrays.write_back()
+
+        self.report({'INFO'}, "%d face(s) are flipped/rotated"
+                    % len(sel_faces))
+
+        common.update_edit_mesh(obj.data)
         if self.seams is True:
             obj.data.show_edge_seams = True
 
@@ -175,6 +175,6 @@ class MUV_MirrorUV(bpy.types.Operator):
                     self.__mirror_uvs(
                         uv_layer, f_src, f_dst, self.axis, self.error)
 
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
@@ -27,6 +27,8 @@ import bpy
 import bmesh
 from mathutils import Vector
 
+from .. import common
+
 
 __all__ = [
     'MUV_MVUV',
@@ -130,7 +132,7 @@ class MUV_MVUV(bpy.types.Operator):
         for fidx, vidx in self.__topology_dict:
             l = bm.faces[fidx].loops[vidx]
             l[active_uv].uv = l[active_uv].uv + dv
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
         # check mouse preference
         if context.user_preferences.inputs.select_mouse == 'RIGHT':
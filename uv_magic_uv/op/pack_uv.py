@@ -23,26 +23,32 @@ __status__ = "production"
 __version__ = "5.1"
 __date__ = "24 Feb 2018"
 
-from math import fabs
-
 import bpy
 import bmesh
-import mathutils
+import numpy as np
 from bpy.props import (
     FloatProperty,
     FloatVectorProperty,
     BoolProperty,
+    EnumProperty,
+    IntProperty,
 )
-from mathutils import Vector
 
 from .. import common
+from .. import core
 
 
 __all__ = [
     'MUV_PackUV',
+    'island_mapping_cache',
 ]
 
 
+# correspondence of loops among same islands, which is reused while the
+# topology, UVs and groups of islands are not changed (e.g. redo of Pack UV)
+island_mapping_cache = common.IslandCache()
+
+
 def is_valid_context(context):
     obj = context.object
 
@@ -71,6 +77,7 @@ class MUV_PackUV(bpy.types.Operator):
      - Same center of UV island
      - Same size of UV island
      - Same number of UV
+     - Same topology (faces and loops are matched by topology)
     """
 
     bl_idname = "uv.muv_packuv"
@@ -78,9 +85,22 @@ class MUV_PackUV(bpy.types.Operator):
     bl_description = "Pack UV (Same UV Islands are integrated)"
     bl_options = {'REGISTER', 'UNDO'}
 
+    method = EnumProperty(
+        name="Method",
+        description="How to pack UV islands",
+        items=[
+            ('BLENDER', "Blender", "Use default pack UV function"),
+            ('SKYLINE', "Skyline",
+             "Pack bounding boxes of islands on skyline (fast)"),
+            ('MAXRECTS', "MaxRects",
+             "Pack bounding boxes of islands by MaxRects (tight, but slow "
+             "for many islands)")
+        ],
+        default='BLENDER'
+    )
     rotate = BoolProperty(
         name="Rotate",
-        description="Rotate option used by default pack UV function",
+        description="Rotate islands to pack tightly",
         default=False)
     margin = FloatProperty(
         name="Margin",
@@ -104,6 +124,39 @@ class MUV_PackUV(bpy.types.Operator):
         default=(0.001, 0.001),
         size=2
     )
+    texture_width = IntProperty(
+        name="Width",
+        description="Width of texture to calculate margin",
+        default=1024,
+        min=1,
+        max=16384
+    )
+    texture_height = IntProperty(
+        name="Height",
+        description="Height of texture to calculate margin",
+        default=1024,
+        min=1,
+        max=16384
+    )
+    padding = IntProperty(
+        name="Padding",
+        description="Pixels needed between islands",
+        default=4,
+        min=0,
+        max=256
+    )
+    multi_tile = BoolProperty(
+        name="Multi Tile",
+        description="Keep scale of islands, and put islands which do not "
+                    "fit into the next UDIM tiles",
+        default=False
+    )
+    multi_object = BoolProperty(
+        name="Multi Object",
+        description="Pack islands of all selected mesh objects into one "
+                    "layout",
+        default=False
+    )
 
     @classmethod
     def poll(cls, context):
@@ -119,36 +172,95 @@ class MUV_PackUV(bpy.types.Operator):
             return {'CANCELLED'}
         uv_layer = bm.loops.layers.uv.verify()
 
-        selected_faces = [f for f in bm.faces if f.select]
-        island_info = common.get_island_info(obj)
-        num_group = self.__group_island(island_info)
+        if self.multi_object:
+            return self.__execute_multi_object(context)
 
-        loop_lists = [l for f in bm.faces for l in f.loops]
-        bpy.ops.mesh.select_all(action='DESELECT')
+        selected_faces = [f for f in bm.faces if f.select]
+        isl = common.get_island_table(obj)
+        groups, src_loops, dest_loops = self.__match_island(bm, uv_layer,
+                                                            isl)
 
         # pack UV
-        for gidx in range(num_group):
-            group = list(filter(
-                lambda i, idx=gidx: i['group'] == idx, island_info))
-            for f in group[0]['faces']:
-                f['face'].select = True
-        bmesh.update_edit_mesh(obj.data)
-        bpy.ops.uv.select_all(action='SELECT')
-        bpy.ops.uv.pack_islands(rotate=self.rotate, margin=self.margin)
+        if self.method == 'BLENDER':
+            self.__pack_by_blender(obj, isl, groups, selected_faces)
+        # UVs are gathered after packing by default pack UV function
+        arrays = common.MeshArrays(bm, uv_layer, isl.faces)
+        if self.method != 'BLENDER':
+            with common.profiler.phase("pack"):
+                self.__pack(arrays.uvs, isl, groups)
 
         # copy/paste UV among same islands
-        for gidx in range(num_group):
-            group = list(filter(
-                lambda i, idx=gidx: i['group'] == idx, island_info))
-            if len(group) <= 1:
-                continue
-            for g in group[1:]:
-                for (src_face, dest_face) in zip(
-                        group[0]['sorted'], g['sorted']):
-                    for (src_loop, dest_loop) in zip(
-                            src_face['face'].loops, dest_face['face'].loops):
-                        loop_lists[dest_loop.index][uv_layer].uv = loop_lists[
-                            src_loop.index][uv_layer].uv
+        uvs = arrays.uvs
+        uvs[dest_loops] = uvs[src_loops]
+        arrays.write_back()
+
+        common.update_edit_mesh(obj.data)
+
+        return {'FINISHED'}
+
+    def __execute_multi_object(self, context):
+        """
+        Pack islands of the mesh in edit mode (selected faces) and the
+        other selected meshes (all faces) into one layout
+        Same islands are integrated across the meshes.  Meshes in edit mode
+        are written through their edit bmesh, so that the undo step of this
+        operator records them, and the others are written by foreach_set.
+        """
+
+        if self.method == 'BLENDER':
+            self.report({'WARNING'},
+                        "Multi Object needs Skyline or MaxRects method")
+            return {'CANCELLED'}
+
+        # objects sharing the same mesh are packed once
+        obj = context.active_object
+        meshes = {obj.data}
+        others = []
+        for o in context.selected_objects:
+            if (o.type == 'MESH') and (o.data not in meshes):
+                meshes.add(o.data)
+                others.append(o)
+        tables = common.get_island_tables([obj]) + \
+            common.get_island_tables(others, only_selected=False)
+
+        isl, loop_starts = core.island.concat_island_tables(
+            [t for _, t in tables])
+        groups, src_loops, dest_loops = self.__match_groups(
+            isl, self.__group_island(isl))
+        uvs = isl.uvs.copy()
+        with common.profiler.phase("pack"):
+            self.__pack(uvs, isl, groups)
+        uvs[dest_loops] = uvs[src_loops]
+
+        for (o, table), start, end in zip(tables, loop_starts[:-1].tolist(),
+                                          loop_starts[1:].tolist()):
+            if o.mode == 'EDIT':
+                bm = bmesh.from_edit_mesh(o.data)
+                arrays = common.MeshArrays(bm, bm.loops.layers.uv.verify(),
+                                           table.faces)
+                arrays.uvs[:] = uvs[start:end]
+                arrays.write_back()
+                common.update_edit_mesh(o.data)
+            else:
+                common.set_mesh_uvs(o.data, table.loop_indices,
+                                    uvs[start:end])
+
+        self.report({'INFO'}, "Packed %d object(s)" % len(tables))
+
+        return {'FINISHED'}
+
+    def __pack_by_blender(self, obj, isl, groups, selected_faces):
+        """
+        Pack the first island of each group by default pack UV function
+        """
+
+        bpy.ops.mesh.select_all(action='DESELECT')
+        for group in groups:
+            for fidx in isl.island_faces(group[0]).tolist():
+                isl.faces[fidx].select = True
+        common.update_edit_mesh(obj.data)
+        bpy.ops.uv.select_all(action='SELECT')
+        bpy.ops.uv.pack_islands(rotate=self.rotate, margin=self.margin)
 
         # restore face/UV selection
         bpy.ops.uv.select_all(action='DESELECT')
@@ -157,81 +269,114 @@ class MUV_PackUV(bpy.types.Operator):
             f.select = True
         bpy.ops.uv.select_all(action='SELECT')
 
-        bmesh.update_edit_mesh(obj.data)
+    def __pack(self, uvs, isl, groups):
+        """
+        Pack bounding boxes of the first island of each group, and
+        transform UVs (of loops in island table) of the islands in place
+        Margin is padding in pixels of the shorter side of texture, so
+        that islands are apart by padding at least in both directions.
+        """
+
+        bases = np.array([g[0] for g in groups], dtype=np.int64)
+        sizes = isl.island_size[bases]
+        margin = self.padding / min(self.texture_width, self.texture_height)
+        scale, positions, rotated, tiles = core.packing.pack_islands(
+            sizes, self.method, margin, self.rotate, self.multi_tile)
+        positions = positions + core.packing.get_udim_tile_offsets(tiles)
 
-        return {'FINISHED'}
+        # transform loops of the packed islands
+        slot = np.full(len(isl), -1, dtype=np.int64)
+        slot[bases] = np.arange(len(bases))
+        loop_island = np.repeat(isl.face_island, np.diff(isl.loop_offsets))
+        loop_slot = slot[loop_island]
+        mask = loop_slot >= 0
+        k = loop_slot[mask]
 
-    def __sort_island_faces(self, kd, uvs, isl1, isl2):
+        d = (uvs[mask] - isl.island_min_uv[loop_island[mask]]) * scale
+        # rotate by 90 degrees counter-clockwise in the bounding box
+        rot = rotated[k]
+        height = sizes[k[rot], 1] * scale
+        d[rot] = np.column_stack((height - d[rot, 1], d[rot, 0]))
+        uvs[mask] = d + positions[k]
+
+    def __match_island(self, bm, uv_layer, isl):
         """
-        Sort faces in island
+        Group same islands, and find correspondence of loops between the
+        first island of each group and the others
+        Islands in the same group but of the different topology are split
+        into the other groups.
+        Return (island indices of each group, source loops, destination
+        loops), where loops are indices in the island table.
         """
 
-        sorted_faces = []
-        for f in isl1['sorted']:
-            _, idx, _ = kd.find(
-                Vector((f['ave_uv'].x, f['ave_uv'].y, 0.0)))
-            sorted_faces.append(isl2['faces'][uvs[idx]['face_idx']])
-        return sorted_faces
+        groups = self.__group_island(isl)
+        # island_mapping_cache is not invalidated by editing UVs, so the
+        # digest of UVs is also a part of the fingerprint
+        fingerprint = (len(bm.verts), len(bm.edges), len(bm.faces),
+                       hash(tuple(f.index for f in isl.faces)),
+                       hash(isl.loop_verts.tobytes()),
+                       hash(isl.face_island.tobytes()),
+                       hash(isl.uvs.tobytes()),
+                       tuple(tuple(g) for g in groups))
+        mapping = island_mapping_cache.get(bm, uv_layer, fingerprint)
+        if mapping is not None:
+            common.debug_print("Island mapping cache hit")
+            return mapping
+
+        mapping = self.__match_groups(isl, groups)
+        island_mapping_cache.put(bm, uv_layer, fingerprint, mapping)
 
-    def __group_island(self, island_info):
+        return mapping
+
+    def __match_groups(self, isl, groups):
         """
-        Group island
+        Find correspondence of loops between the first island of each
+        group and the others
+        Return (island indices of each group, source loops, destination
+        loops)
         """
 
-        num_group = 0
-        while True:
-            # search islands which is not parsed yet
-            isl_1 = None
-            for isl_1 in island_info:
-                if isl_1['group'] == -1:
-                    break
-            else:
-                break   # all faces are parsed
-            if isl_1 is None:
-                break
-            isl_1['group'] = num_group
-            isl_1['sorted'] = isl_1['faces']
-
-            # search same island
-            for isl_2 in island_info:
-                if isl_2['group'] == -1:
-                    dcx = isl_2['center'].x - isl_1['center'].x
-                    dcy = isl_2['center'].y - isl_1['center'].y
-                    dsx = isl_2['size'].x - isl_1['size'].x
-                    dsy = isl_2['size'].y - isl_1['size'].y
-                    center_x_matched = (
-                        fabs(dcx) < self.allowable_center_deviation[0]
-                    )
-                    center_y_matched = (
-                        fabs(dcy) < self.allowable_center_deviation[1]
-                    )
-                    size_x_matched = (
-                        fabs(dsx) < self.allowable_size_deviation[0]
-                    )
-                    size_y_matched = (
-                        fabs(dsy) < self.allowable_size_deviation[1]
-                    )
-                    center_matched = center_x_matched and center_y_matched
-                    size_matched = size_x_matched and size_y_matched
-                    num_uv_matched = (isl_2['num_uv'] == isl_1['num_uv'])
-                    # are islands have same?
-                    if center_matched and size_matched and num_uv_matched:
-                        isl_2['group'] = num_group
-                        kd = mathutils.kdtree.KDTree(len(isl_2['faces']))
-                        uvs = [
-                            {
-                                'uv': Vector(
-                                    (f['ave_uv'].x, f['ave_uv'].y, 0.0)
-                                ),
-                                'face_idx': fidx
-                            } for fidx, f in enumerate(isl_2['faces'])
-                        ]
-                        for i, uv in enumerate(uvs):
-                            kd.insert(uv['uv'], i)
-                        kd.balance()
-                        # sort faces for copy/paste UV
-                        isl_2['sorted'] = self.__sort_island_faces(
-                            kd, uvs, isl_1, isl_2)
-            num_group = num_group + 1
-
-        return num_group
+        topology = core.topology.IslandTopology(
+            isl.uvs, isl.loop_verts, isl.loop_offsets, isl.face_island)
+        sigs = topology.island_signatures.tolist()
+        matched_groups = []
+        src_loops = [np.zeros(0, dtype=np.int64)]
+        dest_loops = [np.zeros(0, dtype=np.int64)]
+        for group in groups:
+            while group:
+                base = group[0]
+                base_faces = isl.island_faces(base)
+                matched = [base]
+                unmatched = []
+                for isl_idx in group[1:]:
+                    loops = None
+                    if sigs[isl_idx] == sigs[base]:
+                        loops = topology.match(base_faces,
+                                               isl.island_faces(isl_idx))
+                    if loops is None:
+                        unmatched.append(isl_idx)
+                        continue
+                    matched.append(isl_idx)
+                    src_loops.append(loops[0])
+                    dest_loops.append(loops[1])
+                matched_groups.append(matched)
+                group = unmatched
+
+        return (matched_groups, np.concatenate(src_loops),
+                np.concatenate(dest_loops))
+
+    def __group_island(self, isl):
+        """
+        Group same islands
+        Return list of island indices of each group
+        """
+
+        group_of_island, num_group = core.island.group_similar_islands(
+            isl.island_center, isl.island_size, isl.island_num_uv,
+            self.allowable_center_deviation, self.allowable_size_deviation)
+
+        groups = [[] for _ in range(num_group)]
+        for isl_idx, gidx in enumerate(group_of_island.tolist()):
+            groups[gidx].append(isl_idx)
+
+        return groups
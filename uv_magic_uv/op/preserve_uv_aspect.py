@@ -25,10 +25,11 @@ __date__ = "24 Feb 2018"
 
 import bpy
 import bmesh
+import numpy as np
 from bpy.props import StringProperty, EnumProperty
-from mathutils import Vector
 
 from .. import common
+from .. import core
 
 
 __all__ = [
@@ -110,121 +111,31 @@ class MUV_PreserveUVAspect(bpy.types.Operator):
         sel_faces = [f for f in bm.faces if f.select]
         dest_img = bpy.data.images[self.dest_img_name]
 
-        info = {}
-
-        for f in sel_faces:
-            if not f[tex_layer].image in info.keys():
-                info[f[tex_layer].image] = {}
-                info[f[tex_layer].image]['faces'] = []
-            info[f[tex_layer].image]['faces'].append(f)
+        arrays = common.MeshArrays(bm, uv_layer, sel_faces)
+        face_of_loops = core.geometry.get_face_of_loops(arrays.offsets)
+        face_images = [f[tex_layer].image for f in sel_faces]
 
-        for img in info:
+        info = {}
+        for fidx, img in enumerate(face_images):
             if img is None:
                 continue
+            info.setdefault(img, []).append(fidx)
 
-            src_img = img
-            ratio = Vector((
-                dest_img.size[0] / src_img.size[0],
-                dest_img.size[1] / src_img.size[1]))
-
-            if self.origin == 'CENTER':
-                origin = Vector((0.0, 0.0))
-                num = 0
-                for f in info[img]['faces']:
-                    for l in f.loops:
-                        uv = l[uv_layer].uv
-                        origin = origin + uv
-                        num = num + 1
-                origin = origin / num
-            elif self.origin == 'LEFT_TOP':
-                origin = Vector((100000.0, -100000.0))
-                for f in info[img]['faces']:
-                    for l in f.loops:
-                        uv = l[uv_layer].uv
-                        origin.x = min(origin.x, uv.x)
-                        origin.y = max(origin.y, uv.y)
-            elif self.origin == 'LEFT_CENTER':
-                origin = Vector((100000.0, 0.0))
-                num = 0
-                for f in info[img]['faces']:
-                    for l in f.loops:
-                        uv = l[uv_layer].uv
-                        origin.x = min(origin.x, uv.x)
-                        origin.y = origin.y + uv.y
-                        num = num + 1
-                origin.y = origin.y / num
-            elif self.origin == 'LEFT_BOTTOM':
-                origin = Vector((100000.0, 100000.0))
-                for f in info[img]['faces']:
-                    for l in f.loops:
-                        uv = l[uv_layer].uv
-                        origin.x = min(origin.x, uv.x)
-                        origin.y = min(origin.y, uv.y)
-            elif self.origin == 'CENTER_TOP':
-                origin = Vector((0.0, -100000.0))
-                num = 0
-                for f in info[img]['faces']:
-                    for l in f.loops:
-                        uv = l[uv_layer].uv
-                        origin.x = origin.x + uv.x
-                        origin.y = max(origin.y, uv.y)
-                        num = num + 1
-                origin.x = origin.x / num
-            elif self.origin == 'CENTER_BOTTOM':
-                origin = Vector((0.0, 100000.0))
-                num = 0
-                for f in info[img]['faces']:
-                    for l in f.loops:
-                        uv = l[uv_layer].uv
-                        origin.x = origin.x + uv.x
-                        origin.y = min(origin.y, uv.y)
-                        num = num + 1
-                origin.x = origin.x / num
-            elif self.origin == 'RIGHT_TOP':
-                origin = Vector((-100000.0, -100000.0))
-                for f in info[img]['faces']:
-                    for l in f.loops:
-                        uv = l[uv_layer].uv
-                        origin.x = max(origin.x, uv.x)
-                        origin.y = max(origin.y, uv.y)
-            elif self.origin == 'RIGHT_CENTER':
-                origin = Vector((-100000.0, 0.0))
-                num = 0
-                for f in info[img]['faces']:
-                    for l in f.loops:
-                        uv = l[uv_layer].uv
-                        origin.x = max(origin.x, uv.x)
-                        origin.y = origin.y + uv.y
-                        num = num + 1
-                origin.y = origin.y / num
-            elif self.origin == 'RIGHT_BOTTOM':
-                origin = Vector((-100000.0, 100000.0))
-                for f in info[img]['faces']:
-                    for l in f.loops:
-                        uv = l[uv_layer].uv
-                        origin.x = max(origin.x, uv.x)
-                        origin.y = min(origin.y, uv.y)
-
-            info[img]['ratio'] = ratio
-            info[img]['origin'] = origin
-
-        for img in info:
-            if img is None:
-                continue
+        uvs = arrays.uvs
+        for img, fidxs in info.items():
+            ratio = np.array([dest_img.size[0] / img.size[0],
+                              dest_img.size[1] / img.size[1]])
+            face_mask = np.zeros(len(sel_faces), dtype=bool)
+            face_mask[fidxs] = True
+            loop_mask = face_mask[face_of_loops]
+
+            origin = core.geometry.calc_origin(uvs[loop_mask], self.origin)
+            uvs[loop_mask] = origin + (uvs[loop_mask] - origin) / ratio
+
+            for fidx in fidxs:
+                sel_faces[fidx][tex_layer].image = dest_img
+        arrays.write_back()
 
-            for f in info[img]['faces']:
-                f[tex_layer].image = dest_img
-                for l in f.loops:
-                    uv = l[uv_layer].uv
-                    origin = info[img]['origin']
-                    ratio = info[img]['ratio']
-                    diff = uv - origin
-                    diff.x = diff.x / ratio.x
-                    diff.y = diff.y / ratio.y
-                    uv.x = origin.x + diff.x
-                    uv.y = origin.y + diff.y
-                    l[uv_layer].uv = uv
-
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
@@ -0,0 +1,110 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+import os
+
+import bpy
+from bpy.props import StringProperty, EnumProperty
+
+from .. import common
+
+
+__all__ = [
+    'MUV_ProfilerExport',
+    'MUV_ProfilerClear',
+]
+
+
+class MUV_ProfilerExport(bpy.types.Operator):
+    """
+    Operation class: Export profile of operators
+    """
+
+    bl_idname = "uv.muv_profiler_export"
+    bl_label = "Export Profile"
+    bl_description = "Export profile of Magic UV operators to file"
+    bl_options = {'REGISTER'}
+
+    # do not record this operator itself
+    muv_profile_disabled = True
+
+    filepath = StringProperty(subtype='FILE_PATH')
+    format = EnumProperty(
+        name="Format",
+        description="File format",
+        items=[
+            ('CSV', "CSV", "Comma separated values"),
+            ('CHROME_TRACE', "Chrome Trace",
+             "Trace event JSON (chrome://tracing)")
+        ],
+        default='CSV'
+    )
+
+    @classmethod
+    def poll(cls, _):
+        return len(common.profiler.records) > 0
+
+    def invoke(self, context, _):
+        if not self.filepath:
+            ext = ".csv" if self.format == 'CSV' else ".json"
+            self.filepath = "muv_profile" + ext
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, _):
+        filepath = bpy.path.abspath(self.filepath)
+        try:
+            if self.format == 'CSV':
+                common.profiler.export_csv(filepath)
+            else:
+                common.profiler.export_chrome_trace(filepath)
+        except OSError as e:
+            self.report({'WARNING'}, "Failed to export profile: {0}"
+                        .format(e))
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, "Exported profile to {0}"
+                    .format(os.path.basename(filepath)))
+
+        return {'FINISHED'}
+
+
+class MUV_ProfilerClear(bpy.types.Operator):
+    """
+    Operation class: Clear recorded profile
+    """
+
+    bl_idname = "uv.muv_profiler_clear"
+    bl_label = "Clear Profile"
+    bl_description = "Clear recorded profile of Magic UV operators"
+    bl_options = {'REGISTER'}
+
+    muv_profile_disabled = True
+
+    def execute(self, _):
+        common.profiler.clear()
+        common.redraw_all_areas()
+
+        return {'FINISHED'}
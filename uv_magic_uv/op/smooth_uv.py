@@ -236,6 +236,6 @@ class MUV_AUVSmooth(bpy.types.Operator):
         # smooth
         self.__smooth(loop_seqs, uv_layer)
 
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
@@ -24,7 +24,6 @@ __version__ = "5.1"
 __date__ = "24 Feb 2018"
 
 import math
-from math import atan2, cos, sqrt, sin, fabs
 
 import bpy
 import bmesh
@@ -32,6 +31,7 @@ from mathutils import Vector
 from bpy.props import BoolProperty
 
 from .. import common
+from .. import core
 
 
 __all__ = [
@@ -167,30 +167,9 @@ def calc_tri_vert(v0, v1, angle0, angle1):
     """
     Calculate rest coordinate from other coordinates and angle of end
     """
-    angle = math.pi - angle0 - angle1
-
-    alpha = atan2(v1.y - v0.y, v1.x - v0.x)
-    d = (v1.x - v0.x) / cos(alpha)
-    a = d * sin(angle0) / sin(angle)
-    b = d * sin(angle1) / sin(angle)
-    s = (a + b + d) / 2.0
-    if fabs(d) < 0.0000001:
-        xd = 0
-        yd = 0
-    else:
-        r = s * (s - a) * (s - b) * (s - d)
-        if r < 0:
-            xd = 0
-            yd = 0
-        else:
-            xd = (b * b - a * a + d * d) / (2 * d)
-            yd = 2 * sqrt(r) / d
-    x1 = xd * cos(alpha) - yd * sin(alpha) + v0.x
-    y1 = xd * sin(alpha) + yd * cos(alpha) + v0.y
-    x2 = xd * cos(alpha) + yd * sin(alpha) + v0.x
-    y2 = xd * sin(alpha) - yd * cos(alpha) + v0.y
+    p1, p2 = core.geometry.calc_tri_vert(v0[:], v1[:], angle0, angle1)
 
-    return Vector((x1, y1)), Vector((x2, y2))
+    return Vector(p1.tolist()), Vector(p2.tolist())
 
 
 def is_valid_context(context):
@@ -328,7 +307,7 @@ class MUV_TexLockUnlock(bpy.types.Operator):
                 for r in result:
                     r["l"][uv_layer].uv = r["uv"]
             v_orig["moved"] = True
-            bmesh.update_edit_mesh(obj.data)
+            common.update_edit_mesh(obj.data)
 
         props.verts_orig = None
 
@@ -417,7 +396,7 @@ class MUV_TexLockIntr(bpy.types.Operator):
             for r in result:
                 r["l"][uv_layer].uv = ave
             v_orig["moved"] = True
-            bmesh.update_edit_mesh(obj.data)
+            common.update_edit_mesh(obj.data)
 
         common.redraw_all_areas()
         props.intr_verts_orig = [
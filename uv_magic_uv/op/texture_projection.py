@@ -335,6 +335,6 @@ class MUV_TexProjProject(bpy.types.Operator):
                 i = i + 1
 
         common.redraw_all_areas()
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
@@ -241,7 +241,7 @@ class MUV_TexWrapSet(bpy.types.Operator):
             common.debug_print("===== Target Other Verticies =====")
             common.debug_print(tgt_other_verts)
 
-            bmesh.update_edit_mesh(obj.data)
+            common.update_edit_mesh(obj.data)
 
             ref_face_index = tgt_face_index
 
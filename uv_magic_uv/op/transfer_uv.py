@@ -114,7 +114,7 @@ class MUV_TransUVCopy(bpy.types.Operator):
                 seams = [e.seam for e in edges]
                 props.topology_copied.append([uvs, pin_uvs, seams])
 
-        bmesh.update_edit_mesh(active_obj.data)
+        common.update_edit_mesh(active_obj.data)
 
         return {'FINISHED'}
 
@@ -215,7 +215,7 @@ class MUV_TransUVPaste(bpy.types.Operator):
                         if self.copy_seams:
                             edge.seam = copied_data[2][k]
 
-        bmesh.update_edit_mesh(active_obj.data)
+        common.update_edit_mesh(active_obj.data)
         if self.copy_seams:
             active_obj.data.show_edge_seams = True
 
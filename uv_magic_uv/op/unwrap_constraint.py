@@ -127,10 +127,7 @@ class MUV_UnwrapConstraint(bpy.types.Operator):
 
         # get original UV coordinate
         faces = [f for f in bm.faces if f.select]
-        uv_list = []
-        for f in faces:
-            uvs = [l[uv_layer].uv.copy() for l in f.loops]
-            uv_list.append(uvs)
+        orig_uvs = common.MeshArrays(bm, uv_layer, faces).uvs
 
         # unwrap
         bpy.ops.uv.unwrap(
@@ -141,14 +138,14 @@ class MUV_UnwrapConstraint(bpy.types.Operator):
             margin=self.margin)
 
         # when U/V-Constraint is checked, revert original coordinate
-        for f, uvs in zip(faces, uv_list):
-            for l, uv in zip(f.loops, uvs):
-                if self.u_const:
-                    l[uv_layer].uv.x = uv.x
-                if self.v_const:
-                    l[uv_layer].uv.y = uv.y
+        arrays = common.MeshArrays(bm, uv_layer, faces)
+        if self.u_const:
+            arrays.uvs[:, 0] = orig_uvs[:, 0]
+        if self.v_const:
+            arrays.uvs[:, 1] = orig_uvs[:, 1]
+        arrays.write_back()
 
         # update mesh
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
@@ -23,12 +23,32 @@ __status__ = "production"
 __version__ = "5.1"
 __date__ = "24 Feb 2018"
 
+import threading
+
 import bpy
 import bmesh
 import bgl
+from bpy.app.handlers import persistent
+from bpy.props import BoolProperty, FloatProperty
 from mathutils import Vector
+import numpy as np
 
 from .. import common
+from .. import core
+
+
+# distance on UV space to calculate scale of view_to_region
+VIEW_TO_REGION_SAMPLE = 100.0
+
+# number of candidate pairs clipped at once in background computation,
+# which is also the granularity of progress and cancel
+OVERLAP_JOB_CHUNK_SIZE = 4096
+OVERLAP_JOB_BROAD_PHASE_PROGRESS = 0.1
+# interval of polling background computation (seconds)
+OVERLAP_JOB_POLL_INTERVAL = 0.1
+
+# number of inspection results kept for the select operators
+INSPECTION_CACHE_SIZE = 4
 
 
 __all__ = [
@@ -38,6 +58,9 @@ __all__ = [
     'MUV_UVInspUpdate',
     'MUV_UVInspSelectFlipped',
     'MUV_UVInspSelectOverlapped',
+    'uvinsp_live_update_handler',
+    'inspection_cache_load_handler',
+    'inspect_mesh_uv',
 ]
 
 
@@ -62,470 +85,648 @@ def is_valid_context(context):
     return True
 
 
-def is_polygon_same(points1, points2):
-    if len(points1) != len(points2):
-        return False
+class MUV_UVInsp(bpy.types.Operator):
+    """
+    Operation class: Render UV Inspection
+    No operation (only rendering)
+    """
 
-    pts1 = points1.as_list()
-    pts2 = points2.as_list()
+    bl_idname = "uv.muv_uvinsp_renderer"
+    bl_description = "Render overlapped/flipped UVs"
+    bl_label = "Overlapped/Flipped UV renderer"
 
-    for p1 in pts1:
-        for p2 in pts2:
-            diff = p2 - p1
-            if diff.length < 0.0000001:
-                pts2.remove(p2)
-                break
-        else:
-            return False
+    __handle = None
 
-    return True
+    @classmethod
+    def is_running(cls, _):
+        return cls.__handle
 
+    @classmethod
+    def handle_add(cls, obj, context):
+        sie = bpy.types.SpaceImageEditor
+        cls.__handle = sie.draw_handler_add(
+            MUV_UVInsp.draw, (obj, context), 'WINDOW', 'POST_PIXEL')
 
-def is_segment_intersect(start1, end1, start2, end2):
-    seg1 = end1 - start1
-    seg2 = end2 - start2
+    @classmethod
+    def handle_remove(cls):
+        if cls.__handle is not None:
+            bpy.types.SpaceImageEditor.draw_handler_remove(
+                cls.__handle, 'WINDOW')
+            cls.__handle = None
 
-    a1 = -seg1.y
-    b1 = seg1.x
-    d1 = -(a1 * start1.x + b1 * start1.y)
+    @staticmethod
+    def draw(_, context):
+        sc = context.scene
+        props = sc.muv_props.uvinsp
+        prefs = context.user_preferences.addons["uv_magic_uv"].preferences
 
-    a2 = -seg2.y
-    b2 = seg2.x
-    d2 = -(a2 * start2.x + b2 * start2.y)
+        if not MUV_UVInsp.is_running(context):
+            return
 
-    seg1_line2_start = a2 * start1.x + b2 * start1.y + d2
-    seg1_line2_end = a2 * end1.x + b2 * end1.y + d2
+        # display lists of the old overlay are deleted here, because
+        # OpenGL context is active only while drawing
+        overlay = props.overlay
+        if (overlay is None) or \
+                overlay.is_stale(props, sc.muv_uvinsp_show_mode):
+            if overlay is not None:
+                overlay.free()
+            overlay = UVInspOverlay(props, sc.muv_uvinsp_show_mode)
+            props.overlay = overlay
+
+        # transform UV coordinate to region coordinate by one matrix
+        # view_to_region is linear when clipping is disabled
+        v2r = context.region.view2d.view_to_region
+        ox, oy = v2r(0.0, 0.0, clip=False)
+        x1, _ = v2r(VIEW_TO_REGION_SAMPLE, 0.0, clip=False)
+        _, y1 = v2r(0.0, VIEW_TO_REGION_SAMPLE, clip=False)
+        bgl.glPushMatrix()
+        bgl.glTranslatef(ox, oy, 0.0)
+        bgl.glScalef((x1 - ox) / VIEW_TO_REGION_SAMPLE,
+                     (y1 - oy) / VIEW_TO_REGION_SAMPLE, 1.0)
 
-    seg2_line1_start = a1 * start2.x + b1 * start2.y + d1
-    seg2_line1_end = a1 * end2.x + b1 * end2.y + d1
+        # OpenGL configuration
+        bgl.glEnable(bgl.GL_BLEND)
 
-    if (seg1_line2_start * seg1_line2_end >= 0) or \
-            (seg2_line1_start * seg2_line1_end >= 0):
-        return False, None
+        # render overlapped UV
+        if sc.muv_uvinsp_show_overlapped:
+            color = prefs.uvinsp_overlapped_color
+            bgl.glColor4f(color[0], color[1], color[2], color[3])
+            overlay.overlapped.draw()
 
-    u = seg1_line2_start / (seg1_line2_start - seg1_line2_end)
-    out = start1 + u * seg1
+        # render flipped UV
+        if sc.muv_uvinsp_show_flipped:
+            color = prefs.uvinsp_flipped_color
+            bgl.glColor4f(color[0], color[1], color[2], color[3])
+            overlay.flipped.draw()
 
-    return True, out
+        bgl.glPopMatrix()
 
 
-class RingBuffer:
-    def __init__(self, arr):
-        self.__buffer = arr.copy()
-        self.__pointer = 0
+class TriangleBuffer():
+    """
+    Triangles packed to draw by one call
+    Vertices are compiled into a display list at the first draw, and the
+    later redraws only call the list until the buffer is rebuilt.
+    """
 
-    def __repr__(self):
-        return repr(self.__buffer)
+    def __init__(self, polygons):
+        points = [uv[:2] for poly in polygons for uv in poly]
+        offsets = np.zeros(len(polygons) + 1, dtype=np.int64)
+        np.cumsum([len(poly) for poly in polygons], out=offsets[1:])
+        self.vertices = core.geometry.triangulate_polygons(
+            np.array(points, dtype=np.float32).reshape(-1, 2), offsets)
+        self.__list = None
 
     def __len__(self):
-        return len(self.__buffer)
+        return len(self.vertices)
 
-    def insert(self, val, offset=0):
-        self.__buffer.insert(self.__pointer + offset, val)
+    def draw(self):
+        if len(self.vertices) == 0:
+            return
 
-    def head(self):
-        return self.__buffer[0]
+        if self.__list is None:
+            self.__list = bgl.glGenLists(1)
+            bgl.glNewList(self.__list, bgl.GL_COMPILE)
+            bgl.glBegin(bgl.GL_TRIANGLES)
+            for x, y in self.vertices.tolist():
+                bgl.glVertex2f(x, y)
+            bgl.glEnd()
+            bgl.glEndList()
+        bgl.glCallList(self.__list)
 
-    def tail(self):
-        return self.__buffer[-1]
+    def free(self):
+        """
+        Delete display list (must be called while OpenGL context is active)
+        """
 
-    def get(self, offset=0):
-        size = len(self.__buffer)
-        val = self.__buffer[(self.__pointer + offset) % size]
-        return val
+        if self.__list is not None:
+            bgl.glDeleteLists(self.__list, 1)
+            self.__list = None
 
-    def next(self):
-        size = len(self.__buffer)
-        self.__pointer = (self.__pointer + 1) % size
 
-    def reset(self):
-        self.__pointer = 0
+class UVInspOverlay():
+    """
+    Triangles of overlapped/flipped UVs built once per inspection update
+    """
 
-    def find(self, obj):
-        try:
-            idx = self.__buffer.index(obj)
-        except ValueError:
-            return None
-        return self.__buffer[idx]
-
-    def find_and_next(self, obj):
-        size = len(self.__buffer)
-        idx = self.__buffer.index(obj)
-        self.__pointer = (idx + 1) % size
-
-    def find_and_set(self, obj):
-        idx = self.__buffer.index(obj)
-        self.__pointer = idx
-
-    def as_list(self):
-        return self.__buffer.copy()
-
-    def reverse(self):
-        self.__buffer.reverse()
-        self.reset()
-
-
-# clip: reference polygon
-# subject: tested polygon
-def do_weiler_atherton_cliping(clip, subject, uv_layer, mode):
-
-    clip_uvs = RingBuffer([l[uv_layer].uv.copy() for l in clip.loops])
-    if is_polygon_flipped(clip_uvs):
-        clip_uvs.reverse()
-    subject_uvs = RingBuffer([l[uv_layer].uv.copy() for l in subject.loops])
-    if is_polygon_flipped(subject_uvs):
-        subject_uvs.reverse()
-
-    common.debug_print("===== Clip UV List =====")
-    common.debug_print(clip_uvs)
-    common.debug_print("===== Subject UV List =====")
-    common.debug_print(subject_uvs)
-
-    # check if clip and subject is overlapped completely
-    if is_polygon_same(clip_uvs, subject_uvs):
-        polygons = [subject_uvs.as_list()]
-        common.debug_print("===== Polygons Overlapped Completely =====")
-        common.debug_print(polygons)
-        return True, polygons
-
-    # check if subject is in clip
-    if is_points_in_polygon(subject_uvs, clip_uvs):
-        polygons = [subject_uvs.as_list()]
-        return True, polygons
-
-    # check if clip is in subject
-    if is_points_in_polygon(clip_uvs, subject_uvs):
-        polygons = [subject_uvs.as_list()]
-        return True, polygons
-
-    # check if clip and subject is overlapped partially
-    intersections = []
-    while True:
-        subject_uvs.reset()
-        while True:
-            uv_start1 = clip_uvs.get()
-            uv_end1 = clip_uvs.get(1)
-            uv_start2 = subject_uvs.get()
-            uv_end2 = subject_uvs.get(1)
-            intersected, point = is_segment_intersect(uv_start1, uv_end1,
-                                                      uv_start2, uv_end2)
-            if intersected:
-                clip_uvs.insert(point, 1)
-                subject_uvs.insert(point, 1)
-                intersections.append([point,
-                                      [clip_uvs.get(), clip_uvs.get(1)]])
-            subject_uvs.next()
-            if subject_uvs.get() == subject_uvs.head():
-                break
-        clip_uvs.next()
-        if clip_uvs.get() == clip_uvs.head():
-            break
+    def __init__(self, props, mode):
+        self.mode = mode
+        # results which this overlay is built from
+        self.overlapped_info = props.overlapped_info
+        self.flipped_info = props.flipped_info
+        if mode == 'PART':
+            overlapped = [poly for info in props.overlapped_info
+                          for poly in info["polygons"]]
+            flipped = [poly for info in props.flipped_info
+                       for poly in info["polygons"]]
+        else:
+            overlapped = [info["subject_uvs"]
+                          for info in props.overlapped_info]
+            flipped = [info["uvs"] for info in props.flipped_info]
+        self.overlapped = TriangleBuffer(overlapped)
+        self.flipped = TriangleBuffer(flipped)
+
+    def is_stale(self, props, mode):
+        return (self.mode != mode) or \
+            (self.overlapped_info is not props.overlapped_info) or \
+            (self.flipped_info is not props.flipped_info)
 
-    common.debug_print("===== Intersection List =====")
-    common.debug_print(intersections)
+    def free(self):
+        self.overlapped.free()
+        self.flipped.free()
 
-    # no intersection, so subject and clip is not overlapped
-    if not intersections:
-        return False, None
 
-    def get_intersection_pair(intersects, key):
-        for sect in intersects:
-            if sect[0] == key:
-                return sect[1]
+def find_overlapped_face_pairs(bm, isl, uv_layer, self_overlap,
+                               loop_edges=None, cancelled=None):
+    """
+    Find candidates of overlapped face pairs in island table
+    Return (clip faces, subject faces) to be clipped, and (faces, faces)
+    folded over the shared edge.
+    Edge indices of loops are read from bmesh unless loop_edges is given.
+    cancelled is called between the steps, and None is returned when it
+    returns True.
+    """
 
+    # at first, find candidates of overlapped faces by bounding boxes
+    # registered to uniform grid
+    # faces in the same island are also candidates in self overlap mode
+    with common.profiler.phase("broad phase"):
+        clip_indices, subject_indices = \
+            core.spatial.find_overlapped_bbox_pairs(
+                isl.face_min_uv, isl.face_max_uv, isl.face_island,
+                same_group=self_overlap)
+    if (cancelled is not None) and cancelled():
         return None
 
-    # make enter/exit pair
-    subject_uvs.reset()
-    subject_entering = []
-    subject_exiting = []
-    clip_entering = []
-    clip_exiting = []
-    intersect_uv_list = []
-    while True:
-        pair = get_intersection_pair(intersections, subject_uvs.get())
-        if pair:
-            sub = subject_uvs.get(1) - subject_uvs.get(-1)
-            inter = pair[1] - pair[0]
-            cross = sub.x * inter.y - inter.x * sub.y
-            if cross < 0:
-                subject_entering.append(subject_uvs.get())
-                clip_exiting.append(subject_uvs.get())
-            else:
-                subject_exiting.append(subject_uvs.get())
-                clip_entering.append(subject_uvs.get())
-            intersect_uv_list.append(subject_uvs.get())
+    # faces sharing an edge on UV space are overlapped only when they are
+    # folded over the edge
+    folded_a = np.zeros(0, dtype=np.int64)
+    folded_b = np.zeros(0, dtype=np.int64)
+    if self_overlap:
+        if loop_edges is None:
+            loop_edges = common.MeshArrays(bm, uv_layer,
+                                           isl.faces).loop_edges
+        na, nb, folded = core.geometry.find_folded_uv_edges(
+            isl.uvs, isl.loop_offsets, loop_edges, isl.face_ave_uv)
+        clip_indices, subject_indices = exclude_face_pairs(
+            clip_indices, subject_indices, na, nb, len(isl.faces))
+        folded_a = na[folded]
+        folded_b = nb[folded]
+
+    return clip_indices, subject_indices, folded_a, folded_b
+
+
+def exclude_face_pairs(clip_indices, subject_indices, na, nb, num_face):
+    """
+    Exclude pairs (na, nb) of faces from candidates in any order
+    """
 
-        subject_uvs.next()
-        if subject_uvs.get() == subject_uvs.head():
-            break
+    neighbours = np.minimum(na, nb) * num_face + np.maximum(na, nb)
+    candidates = np.minimum(clip_indices, subject_indices) * num_face + \
+        np.maximum(clip_indices, subject_indices)
+    mask = ~np.isin(candidates, neighbours)
 
-    common.debug_print("===== Enter List =====")
-    common.debug_print(clip_entering)
-    common.debug_print(subject_entering)
-    common.debug_print("===== Exit List =====")
-    common.debug_print(clip_exiting)
-    common.debug_print(subject_exiting)
-
-    # for now, can't handle the situation when fulfill all below conditions
-    #        * two faces have common edge
-    #        * each face is intersected
-    #        * Show Mode is "Part"
-    #       so for now, ignore this situation
-    if len(subject_entering) != len(subject_exiting):
-        if mode == 'FACE':
-            polygons = [subject_uvs.as_list()]
-            return True, polygons
-        return False, None
+    return clip_indices[mask], subject_indices[mask]
 
-    def traverse(current_list, entering, exiting, p, current, other_list):
-        result = current_list.find(current)
-        if not result:
-            return None
-        if result != current:
-            print("Internal Error")
-            return None
 
-        # enter
-        if entering.count(current) >= 1:
-            entering.remove(current)
-
-        current_list.find_and_next(current)
-        current = current_list.get()
-
-        while exiting.count(current) == 0:
-            p.append(current.copy())
-            current_list.find_and_next(current)
-            current = current_list.get()
-
-        # exit
-        p.append(current.copy())
-        exiting.remove(current)
-
-        other_list.find_and_set(current)
-        return other_list.get()
-
-    # Traverse
-    polygons = []
-    current_uv_list = subject_uvs
-    other_uv_list = clip_uvs
-    current_entering = subject_entering
-    current_exiting = subject_exiting
-
-    poly = []
-    current_uv = current_entering[0]
-
-    while True:
-        current_uv = traverse(current_uv_list, current_entering,
-                              current_exiting, poly, current_uv, other_uv_list)
-
-        if current_uv_list == subject_uvs:
-            current_uv_list = clip_uvs
-            other_uv_list = subject_uvs
-            current_entering = clip_entering
-            current_exiting = clip_exiting
-            common.debug_print("-- Next: Clip --")
-        else:
-            current_uv_list = subject_uvs
-            other_uv_list = clip_uvs
-            current_entering = subject_entering
-            current_exiting = subject_exiting
-            common.debug_print("-- Next: Subject --")
-
-        common.debug_print(clip_entering)
-        common.debug_print(clip_exiting)
-        common.debug_print(subject_entering)
-        common.debug_print(subject_exiting)
-
-        if not clip_entering and not clip_exiting \
-                and not subject_entering and not subject_exiting:
-            break
+def clip_overlapped_face_pairs(isl, pairs, mode, min_area=0.0):
+    """
+    Clip candidates and keep pairs whose overlapped area is larger than
+    min_area
+    Return list of (clip face index, subject face index, overlapped info)
+    """
 
-    polygons.append(poly)
+    clip_indices, subject_indices, folded_a, folded_b = pairs
+    clip_indices = np.concatenate((clip_indices, folded_a))
+    subject_indices = np.concatenate((subject_indices, folded_b))
 
-    common.debug_print("===== Polygons Overlapped Partially =====")
-    common.debug_print(polygons)
+    with common.profiler.phase("narrow phase"):
+        clipped = core.clip.clip_polygon_pairs(
+            isl.uvs, isl.loop_offsets, clip_indices, subject_indices)
+    common.profiler.count(candidates=len(clip_indices))
 
-    return True, polygons
+    return make_overlapped_info(isl, clip_indices, subject_indices,
+                                [(0, clipped)], mode, min_area)
 
 
-class MUV_UVInsp(bpy.types.Operator):
+def make_overlapped_info(isl, clip_indices, subject_indices, clipped, mode,
+                         min_area=0.0):
     """
-    Operation class: Render UV Inspection
-    No operation (only rendering)
+    Make info of pairs whose overlapped area is larger than min_area
+    clipped is list of (index of the first pair, result of
+    core.clip.clip_polygon_pairs) for each chunk of pairs
+    Return list of (clip face index, subject face index, overlapped info)
     """
 
-    bl_idname = "uv.muv_uvinsp_renderer"
-    bl_description = "Render overlapped/flipped UVs"
-    bl_label = "Overlapped/Flipped UV renderer"
+    offsets = isl.loop_offsets
+    uvs = isl.uvs
+    if clipped:
+        areas = np.concatenate([c[0] for _, c in clipped])
+    else:
+        areas = np.zeros(0)
 
-    __handle = None
+    threshold = max(min_area, core.clip.MIN_OVERLAPPED_AREA)
+    pieces = {}
+    for start, (_, points, counts, pair_indices) in clipped:
+        for k, pts, n in zip((pair_indices + start).tolist(), points,
+                             counts.tolist()):
+            if (n >= 3) and (areas[k] > threshold):
+                pieces.setdefault(k, []).append(
+                    [Vector(uv) for uv in pts[:n].tolist()])
 
-    @classmethod
-    def is_running(cls, _):
-        return cls.__handle
+    overlapped_uvs = []
+    for k in np.flatnonzero(areas > threshold).tolist():
+        cidx = int(clip_indices[k])
+        sidx = int(subject_indices[k])
+        subject_uvs = [Vector(uv) for uv in
+                       uvs[offsets[sidx]:offsets[sidx + 1]].tolist()]
+        if mode == 'FACE':
+            polygons = [subject_uvs]
+        else:
+            polygons = pieces.get(k, [])
+        overlapped_uvs.append((cidx, sidx, {
+            "clip_face": isl.faces[cidx],
+            "subject_face": isl.faces[sidx],
+            "subject_uvs": subject_uvs,
+            "area": float(areas[k]),
+            "polygons": polygons}))
 
-    @classmethod
-    def handle_add(cls, obj, context):
-        sie = bpy.types.SpaceImageEditor
-        cls.__handle = sie.draw_handler_add(
-            MUV_UVInsp.draw, (obj, context), 'WINDOW', 'POST_PIXEL')
+    return overlapped_uvs
 
-    @classmethod
-    def handle_remove(cls):
-        if cls.__handle is not None:
-            bpy.types.SpaceImageEditor.draw_handler_remove(
-                cls.__handle, 'WINDOW')
-            cls.__handle = None
 
-    @staticmethod
-    def draw(_, context):
-        sc = context.scene
-        props = sc.muv_props.uvinsp
-        prefs = context.user_preferences.addons["uv_magic_uv"].preferences
+def get_overlapped_uv_info(bm, faces, uv_layer, mode, self_overlap=False,
+                           min_area=0.0):
+    isl = common.get_island_table_from_faces(bm, faces, uv_layer)
+    pairs = find_overlapped_face_pairs(bm, isl, uv_layer, self_overlap)
+    overlapped = clip_overlapped_face_pairs(isl, pairs, mode, min_area)
 
-        if not MUV_UVInsp.is_running(context):
-            return
+    return [info for _, _, info in overlapped]
 
-        # OpenGL configuration
-        bgl.glEnable(bgl.GL_BLEND)
 
-        # render overlapped UV
-        if sc.muv_uvinsp_show_overlapped:
-            color = prefs.uvinsp_overlapped_color
-            for info in props.overlapped_info:
-                if sc.muv_uvinsp_show_mode == 'PART':
-                    for poly in info["polygons"]:
-                        bgl.glBegin(bgl.GL_TRIANGLE_FAN)
-                        bgl.glColor4f(color[0], color[1], color[2], color[3])
-                        for uv in poly:
-                            x, y = context.region.view2d.view_to_region(
-                                uv.x, uv.y)
-                            bgl.glVertex2f(x, y)
-                        bgl.glEnd()
-                elif sc.muv_uvinsp_show_mode == 'FACE':
-                    bgl.glBegin(bgl.GL_TRIANGLE_FAN)
-                    bgl.glColor4f(color[0], color[1], color[2], color[3])
-                    for uv in info["subject_uvs"]:
-                        x, y = context.region.view2d.view_to_region(uv.x, uv.y)
-                        bgl.glVertex2f(x, y)
-                    bgl.glEnd()
+def get_texel_settings(scene):
+    """
+    Get (texture width, texture height, padding) when overlaps are detected
+    on texels, or None when detected by polygon clipping
+    """
 
-        # render flipped UV
-        if sc.muv_uvinsp_show_flipped:
-            color = prefs.uvinsp_flipped_color
-            for info in props.flipped_info:
-                if sc.muv_uvinsp_show_mode == 'PART':
-                    for poly in info["polygons"]:
-                        bgl.glBegin(bgl.GL_TRIANGLE_FAN)
-                        bgl.glColor4f(color[0], color[1], color[2], color[3])
-                        for uv in poly:
-                            x, y = context.region.view2d.view_to_region(
-                                uv.x, uv.y)
-                            bgl.glVertex2f(x, y)
-                        bgl.glEnd()
-                elif sc.muv_uvinsp_show_mode == 'FACE':
-                    bgl.glBegin(bgl.GL_TRIANGLE_FAN)
-                    bgl.glColor4f(color[0], color[1], color[2], color[3])
-                    for uv in info["uvs"]:
-                        x, y = context.region.view2d.view_to_region(uv.x, uv.y)
-                        bgl.glVertex2f(x, y)
-                    bgl.glEnd()
-
-
-def is_polygon_flipped(points):
-    area = 0.0
-    for i in range(len(points)):
-        uv1 = points.get(i)
-        uv2 = points.get(i + 1)
-        a = uv1.x * uv2.y - uv1.y * uv2.x
-        area = area + a
-    if area < 0:
-        # clock-wise
-        return True
-    return False
+    if scene.muv_uvinsp_overlap_method != 'TEXEL':
+        return None
 
+    return (scene.muv_uvinsp_texture_width,
+            scene.muv_uvinsp_texture_height, scene.muv_uvinsp_padding)
 
-def is_point_in_polygon(point, subject_points):
-    count = 0
-    for i in range(len(subject_points)):
-        uv_start1 = subject_points.get(i)
-        uv_end1 = subject_points.get(i + 1)
-        uv_start2 = point
-        uv_end2 = Vector((1000000.0, point.y))
-        intersected, _ = is_segment_intersect(uv_start1, uv_end1,
-                                              uv_start2, uv_end2)
-        if intersected:
-            count = count + 1
 
-    return count % 2
+def make_texel_overlapped_info(isl, conflicts, mode):
+    """
+    Make info of faces which claim texels conflicted with the other islands
+    In Part mode, conflicted texels owned by the same face are merged into
+    horizontal runs, and each run is shown as a rectangle.
+    Return list of (face index, face index, overlapped info)
+    """
 
+    width = conflicts.width
+    height = conflicts.height
+    pixels = conflicts.pixels
+    pixel_faces = conflicts.pixel_faces.astype(np.int64)
+    texel_area = 1.0 / (width * height)
+
+    pieces = {}
+    if mode != 'FACE':
+        # pixels are sorted, so a run continues while the next pixel is
+        # the right neighbour owned by the same face
+        ys = pixels // width
+        xs = pixels % width
+        start = np.ones(len(pixels), dtype=bool)
+        start[1:] = (pixels[1:] != pixels[:-1] + 1) | \
+            (ys[1:] != ys[:-1]) | (pixel_faces[1:] != pixel_faces[:-1])
+        end = np.ones(len(pixels), dtype=bool)
+        end[:-1] = start[1:]
+        for fidx, y, x0, x1 in zip(pixel_faces[start].tolist(),
+                                   ys[start].tolist(), xs[start].tolist(),
+                                   (xs[end] + 1).tolist()):
+            pieces.setdefault(fidx, []).append([
+                Vector((x0 / width, y / height)),
+                Vector((x1 / width, y / height)),
+                Vector((x1 / width, (y + 1) / height)),
+                Vector((x0 / width, (y + 1) / height))])
+
+    num_texels = np.bincount(pixel_faces, minlength=len(isl.faces))
+    offsets = isl.loop_offsets
+    overlapped_uvs = []
+    for fidx in conflicts.conflicted_faces().tolist():
+        subject_uvs = [Vector(uv) for uv in
+                       isl.uvs[offsets[fidx]:offsets[fidx + 1]].tolist()]
+        if mode == 'FACE':
+            polygons = [subject_uvs]
+        else:
+            polygons = pieces.get(fidx, [])
+        overlapped_uvs.append((fidx, fidx, {
+            "clip_face": isl.faces[fidx],
+            "subject_face": isl.faces[fidx],
+            "subject_uvs": subject_uvs,
+            "area": float(num_texels[fidx]) * texel_area,
+            "polygons": polygons}))
 
-def is_points_in_polygon(points, subject_points):
-    for i in range(len(points)):
-        internal = is_point_in_polygon(points.get(i), subject_points)
-        if not internal:
-            return False
+    return overlapped_uvs
 
-    return True
 
+def find_texel_overlapped_faces(isl, texel, mode):
+    """
+    Find faces of islands sharing texels at texture size and padding
+    """
 
-def get_overlapped_uv_info(bm, faces, uv_layer, mode):
-    # at first, check island overlapped
-    isl = common.get_island_info_from_faces(bm, faces, uv_layer)
-    overlapped_isl_pairs = []
-    for i, i1 in enumerate(isl):
-        for i2 in isl[i + 1:]:
-            if (i1["max"].x < i2["min"].x) or (i2["max"].x < i1["min"].x) or \
-               (i1["max"].y < i2["min"].y) or (i2["max"].y < i1["min"].y):
-                continue
-            overlapped_isl_pairs.append([i1, i2])
+    width, height, padding = texel
+    with common.profiler.phase("rasterize"):
+        conflicts = core.raster.rasterize_islands(
+            isl.uvs, isl.loop_offsets, isl.face_island, width, height,
+            padding)
 
-    # next, check polygon overlapped
-    overlapped_uvs = []
-    for oip in overlapped_isl_pairs:
-        for clip in oip[0]["faces"]:
-            f_clip = clip["face"]
-            for subject in oip[1]["faces"]:
-                f_subject = subject["face"]
-
-                # fast operation, apply bounding box algorithm
-                if (clip["max_uv"].x < subject["min_uv"].x) or \
-                   (subject["max_uv"].x < clip["min_uv"].x) or \
-                   (clip["max_uv"].y < subject["min_uv"].y) or \
-                   (subject["max_uv"].y < clip["min_uv"].y):
-                    continue
-
-                # slow operation, apply Weiler-Atherton cliping algorithm
-                result, polygons = do_weiler_atherton_cliping(f_clip,
-                                                              f_subject,
-                                                              uv_layer, mode)
-                if result:
-                    subject_uvs = [l[uv_layer].uv.copy()
-                                   for l in f_subject.loops]
-                    overlapped_uvs.append({"clip_face": f_clip,
-                                           "subject_face": f_subject,
-                                           "subject_uvs": subject_uvs,
-                                           "polygons": polygons})
+    return make_texel_overlapped_info(isl, conflicts, mode)
 
-    return overlapped_uvs
 
+def get_flipped_uv_info(faces, uvs, offsets, indices=None):
+    """
+    Get info of faces whose UVs are flipped
+    uvs/offsets are UVs of faces in CSR layout. When indices is given, only
+    faces of these indices are tested.
+    Return list of (face index, flipped info)
+    """
+
+    if indices is None:
+        _, flipped = core.geometry.find_flipped_polygons(uvs, offsets)
+    else:
+        indices = np.asarray(indices, dtype=np.int64)
+        loops, sub_offsets = core.geometry.get_polygon_loops(offsets,
+                                                             indices)
+        _, flipped = core.geometry.find_flipped_polygons(uvs[loops],
+                                                         sub_offsets)
+        flipped = indices[flipped]
 
-def get_flipped_uv_info(faces, uv_layer):
     flipped_uvs = []
-    for f in faces:
-        polygon = RingBuffer([l[uv_layer].uv.copy() for l in f.loops])
-        if is_polygon_flipped(polygon):
-            uvs = [l[uv_layer].uv.copy() for l in f.loops]
-            flipped_uvs.append({"face": f, "uvs": uvs,
-                                "polygons": [polygon.as_list()]})
+    for fidx in flipped.tolist():
+        uvs_ = [Vector(uv) for uv in
+                uvs[offsets[fidx]:offsets[fidx + 1]].tolist()]
+        flipped_uvs.append((fidx, {"face": faces[fidx], "uvs": uvs_,
+                                   "polygons": [uvs_]}))
 
     return flipped_uvs
 
 
-def update_uvinsp_info(context):
-    sc = context.scene
-    props = sc.muv_props.uvinsp
+def inspect_mesh_uv(mesh, uv_layer=None, self_overlap=False, min_area=0.0):
+    """
+    Inspect UV map of the mesh in object mode
+    Mesh data is read by foreach_get, so that this can be run in background
+    mode without entering edit mode.
+    Return dictionary of polygon indices, or None when mesh has no UV map
+        overlapped: list of (polygon index, polygon index, overlapped area)
+        flipped:    polygon indices
+    """
+
+    isl = common.get_island_table_from_mesh(mesh, False, uv_layer)
+    if isl is None:
+        return None
+
+    loop_edges = None
+    if self_overlap:
+        edge_indices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("edge_index", edge_indices)
+        loop_edges = edge_indices[isl.loop_indices].astype(np.int64)
+    pairs = find_overlapped_face_pairs(None, isl, None, self_overlap,
+                                       loop_edges=loop_edges)
+    overlapped = clip_overlapped_face_pairs(isl, pairs, 'FACE', min_area)
+    _, flipped = core.geometry.find_flipped_polygons(isl.uvs,
+                                                     isl.loop_offsets)
+
+    return {
+        'overlapped': [(int(info["clip_face"]), int(info["subject_face"]),
+                        info["area"]) for _, _, info in overlapped],
+        'flipped': isl.faces[flipped].tolist(),
+    }
+
+
+class LiveInspection():
+    """
+    Result of the last inspection with per-face UV hashes, which is used to
+    re-test only faces whose UVs have been changed
+    The uniform grid of face bounding boxes, edge indices of loops and
+    faces sharing UV edges are kept after the first re-test, so that the
+    later re-tests touch only dirty faces and their candidates.
+    """
+
+    def __init__(self, bm, faces, uv_layer, mode, self_overlap,
+                 min_area=0.0, texel=None):
+        self.bm = bm
+        self.faces = faces
+        self.uv_layer_name = uv_layer.name
+        self.mode = mode
+        self.self_overlap = self_overlap
+        self.min_area = min_area
+        self.texel = texel
+        self.face_hashes = None
+        self.face_island = None
+        self.overlapped = []    # [(clip face index, subject face index, info)]
+        self.flipped = {}       # {face index: info}
+        self.loop_edges = None
+        self.grid = None
+        # (face a, face b, folded mask) of faces sharing UV edges
+        self.neighbours = None
+        self.__edge_order = None
+
+    def settings(self):
+        """
+        Get settings which affect overlapped faces (but not the shape of
+        shown polygons)
+        """
+
+        return (self.self_overlap, self.min_area, self.texel)
+
+    def is_same_faces(self, bm, faces, uv_layer):
+        return (self.bm is bm) and bm.is_valid and \
+            (self.uv_layer_name == uv_layer.name) and \
+            (len(self.faces) == len(faces)) and \
+            all(f1 is f2 for f1, f2 in zip(self.faces, faces))
+
+    def is_compatible(self, bm, faces, uv_layer, mode, self_overlap,
+                      min_area=0.0, texel=None):
+        return (self.mode == mode) and \
+            (self.settings() == (self_overlap, min_area, texel)) and \
+            self.is_same_faces(bm, faces, uv_layer)
+
+    def update(self, isl, uv_layer, dirty=None):
+        """
+        Re-test dirty faces (all faces if dirty is None)
+        Overlaps on texels are always re-tested for all faces, because
+        padding is affected by any island.
+        """
+
+        if self.texel is not None:
+            self.apply(isl, find_texel_overlapped_faces(isl, self.texel,
+                                                        self.mode))
+            return
+
+        if dirty is None:
+            self.grid = None
+            self.neighbours = None
+            pairs = find_overlapped_face_pairs(
+                self.bm, isl, uv_layer, self.self_overlap,
+                loop_edges=self.get_loop_edges(uv_layer))
+        else:
+            pairs = self.find_dirty_face_pairs(isl, uv_layer, dirty)
+        overlapped = clip_overlapped_face_pairs(isl, pairs, self.mode,
+                                                self.min_area)
+        self.apply(isl, overlapped, dirty)
+
+    def get_loop_edges(self, uv_layer):
+        if not self.self_overlap:
+            return None
+        if self.loop_edges is None:
+            self.loop_edges = common.MeshArrays(self.bm, uv_layer,
+                                                self.faces).loop_edges
+
+        return self.loop_edges
+
+    def find_dirty_face_pairs(self, isl, uv_layer, dirty):
+        """
+        Find candidates of overlapped face pairs including dirty faces
+        Dirty faces are moved in the kept grid and only they are queried.
+        The grid is built from all faces at the first re-test.
+        """
+
+        indices = np.flatnonzero(dirty)
+        with common.profiler.phase("broad phase"):
+            if self.grid is None:
+                self.grid = core.spatial.UniformGrid(isl.face_min_uv,
+                                                     isl.face_max_uv)
+            else:
+                self.grid.move(indices, isl.face_min_uv[indices],
+                               isl.face_max_uv[indices])
+            clip_indices, subject_indices = self.grid.find_pairs(
+                indices, isl.face_island, same_group=self.self_overlap)
+
+        folded_a = np.zeros(0, dtype=np.int64)
+        folded_b = np.zeros(0, dtype=np.int64)
+        if self.self_overlap:
+            na, nb, folded = self.update_neighbours(isl, uv_layer, indices,
+                                                    dirty)
+            mask = dirty[na] | dirty[nb]
+            na = na[mask]
+            nb = nb[mask]
+            folded = folded[mask]
+            clip_indices, subject_indices = exclude_face_pairs(
+                clip_indices, subject_indices, na, nb, len(isl.faces))
+            folded_a = na[folded]
+            folded_b = nb[folded]
+
+        return clip_indices, subject_indices, folded_a, folded_b
+
+    def update_neighbours(self, isl, uv_layer, indices, dirty):
+        """
+        Update faces sharing UV edges with dirty faces
+        Only dirty faces and the faces sharing mesh edges with them are
+        tested again.
+        """
+
+        loop_edges = self.get_loop_edges(uv_layer)
+        offsets = isl.loop_offsets
+        if self.neighbours is None:
+            self.neighbours = core.geometry.find_folded_uv_edges(
+                isl.uvs, offsets, loop_edges, isl.face_ave_uv)
+            self.__edge_order = np.argsort(loop_edges, kind='mergesort')
+            return self.neighbours
+
+        # faces which have loops on the edges of dirty faces
+        order = self.__edge_order
+        sorted_edges = loop_edges[order]
+        loops, _ = core.geometry.get_polygon_loops(offsets, indices)
+        edges = np.unique(loop_edges[loops])
+        lo = np.searchsorted(sorted_edges, edges, 'left')
+        hi = np.searchsorted(sorted_edges, edges, 'right')
+        counts = hi - lo
+        starts = np.cumsum(counts) - counts
+        found = order[np.repeat(lo - starts, counts) +
+                      np.arange(np.sum(counts))]
+        faces = np.union1d(
+            indices, np.searchsorted(offsets, found, 'right') - 1)
+
+        loops, sub_offsets = core.geometry.get_polygon_loops(offsets, faces)
+        a, b, folded = core.geometry.find_folded_uv_edges(
+            isl.uvs[loops], sub_offsets, loop_edges[loops],
+            isl.face_ave_uv[faces])
+        a = faces[a]
+        b = faces[b]
+        mask = dirty[a] | dirty[b]
+
+        na, nb, nfolded = self.neighbours
+        keep = ~(dirty[na] | dirty[nb])
+        self.neighbours = (np.concatenate((na[keep], a[mask])),
+                           np.concatenate((nb[keep], b[mask])),
+                           np.concatenate((nfolded[keep], folded[mask])))
+
+        return self.neighbours
+
+    def apply(self, isl, overlapped, dirty=None):
+        """
+        Store overlapped pairs of re-tested faces, and re-test flipped faces
+        """
+
+        if dirty is None:
+            self.overlapped = overlapped
+            self.flipped = {}
+            retested = None
+        else:
+            self.overlapped = [o for o in self.overlapped
+                               if not (dirty[o[0]] or dirty[o[1]])]
+            self.overlapped.extend(overlapped)
+            retested = np.flatnonzero(dirty).tolist()
+            for fidx in retested:
+                self.flipped.pop(fidx, None)
+
+        for fidx, info in get_flipped_uv_info(self.faces, isl.uvs,
+                                              isl.loop_offsets, retested):
+            self.flipped[fidx] = info
+
+        self.face_hashes = core.geometry.calc_face_hashes(isl.uvs,
+                                                          isl.loop_offsets)
+        self.face_island = isl.face_island
+
+    def get_dirty_faces(self, isl):
+        """
+        Get mask of faces to be re-tested
+        Islands including changed faces may be split or merged, so all
+        faces in these islands (before and after the change) are dirty.
+        """
+
+        hashes = core.geometry.calc_face_hashes(isl.uvs, isl.loop_offsets)
+        changed = hashes != self.face_hashes
+        if not np.any(changed):
+            return None
+
+        return changed | \
+            np.isin(isl.face_island, isl.face_island[changed]) | \
+            np.isin(self.face_island, self.face_island[changed])
+
+    def overlapped_info(self):
+        return [info for _, _, info in self.overlapped]
+
+    def overlapped_faces(self):
+        """
+        Get indices of subject faces of overlapped pairs
+        """
+
+        return np.unique(np.array([o[1] for o in self.overlapped],
+                                  dtype=np.int64))
+
+    def flipped_faces(self):
+        return np.array(sorted(self.flipped.keys()), dtype=np.int64)
+
+    def flipped_info(self):
+        return [self.flipped[k] for k in sorted(self.flipped.keys())]
+
+
+def get_inspected_faces(context):
+    """
+    Get (bmesh, UV layer, faces) to be inspected
+    """
 
     obj = context.active_object
     bm = bmesh.from_edit_mesh(obj.data)
@@ -537,14 +738,265 @@ def update_uvinsp_info(context):
         sel_faces = [f for f in bm.faces]
     else:
         sel_faces = [f for f in bm.faces if f.select]
-    props.overlapped_info = get_overlapped_uv_info(bm, sel_faces, uv_layer,
-                                                   sc.muv_uvinsp_show_mode)
-    props.flipped_info = get_flipped_uv_info(sel_faces, uv_layer)
+
+    return bm, uv_layer, sel_faces
+
+
+class InspectionCache():
+    """
+    Results of UV Inspection shared among the renderer and the select
+    operators
+    Each result keeps hashes of face UVs as the version of mesh and UVs,
+    and stale results are never returned.
+    """
+
+    def __init__(self, max_size=INSPECTION_CACHE_SIZE):
+        self.__entries = []
+        self.__max_size = max_size
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def put(self, live):
+        if live in self.__entries:
+            self.__entries.remove(live)
+        self.__entries.append(live)
+        del self.__entries[:-self.__max_size]
+
+    def find(self, bm, faces, uv_layer, isl, settings=None):
+        """
+        Find the result which is up to date for faces
+        When settings is None, the result of any settings is returned.
+        """
+
+        for live in reversed(self.__entries):
+            if (settings is not None) and (live.settings() != settings):
+                continue
+            if not live.is_same_faces(bm, faces, uv_layer):
+                continue
+            if live.get_dirty_faces(isl) is not None:
+                continue
+            return live
+
+        return None
+
+    def invalidate(self):
+        self.__entries = []
+
+
+inspection_cache = InspectionCache()
+
+
+@persistent
+def inspection_cache_load_handler(_):
+    inspection_cache.invalidate()
+    # the job works on the mesh of the file which has been closed
+    props = bpy.context.scene.muv_props.uvinsp
+    if props.job is not None:
+        props.job.cancel()
+        props.job = None
+
+
+def update_uvinsp_info(context, incremental=False):
+    """
+    Update result of UV Inspection
+    When incremental is True, only faces whose UVs have been changed since
+    the last update are re-tested.
+    Return False when nothing is updated.
+    """
+
+    sc = context.scene
+    props = sc.muv_props.uvinsp
+
+    bm, uv_layer, sel_faces = get_inspected_faces(context)
+    mode = sc.muv_uvinsp_show_mode
+    self_overlap = sc.muv_uvinsp_self_overlap
+    min_area = sc.muv_uvinsp_min_overlapped_area
+    texel = get_texel_settings(sc)
+    isl = common.get_island_table_from_faces(bm, sel_faces, uv_layer)
+    live = props.live
+    if incremental and (live is not None) and \
+            live.is_compatible(bm, sel_faces, uv_layer, mode, self_overlap,
+                               min_area, texel):
+        dirty = live.get_dirty_faces(isl)
+        if dirty is None:
+            return False
+        live.update(isl, uv_layer, dirty)
+    else:
+        live = LiveInspection(bm, sel_faces, uv_layer, mode, self_overlap,
+                              min_area, texel)
+        live.update(isl, uv_layer)
+
+    set_uvinsp_result(props, live)
+
+    return True
+
+
+def set_uvinsp_result(props, live):
+    # swap all results at once, so that the renderer never sees results
+    # of different updates
+    inspection_cache.put(live)
+    props.live = live
+    # the overlay is rebuilt by the renderer when it finds new results
+    props.overlapped_info, props.flipped_info = \
+        live.overlapped_info(), live.flipped_info()
+
+
+class OverlapJob():
+    """
+    Computation of overlapped faces in a worker thread
+    Mesh data is snapshotted to arrays on the main thread, and the worker
+    thread touches only these arrays, because bpy and bmesh are not
+    thread-safe.
+    """
+
+    def __init__(self, context):
+        sc = context.scene
+        bm, uv_layer, sel_faces = get_inspected_faces(context)
+        self.bm = bm
+        self.uv_layer = uv_layer
+        self.faces = sel_faces
+        self.mode = sc.muv_uvinsp_show_mode
+        self.self_overlap = sc.muv_uvinsp_self_overlap
+        self.min_area = sc.muv_uvinsp_min_overlapped_area
+        self.texel = get_texel_settings(sc)
+        self.isl = common.get_island_table_from_faces(bm, sel_faces,
+                                                      uv_layer)
+        self.loop_edges = None
+        if self.self_overlap and (self.texel is None):
+            self.loop_edges = common.MeshArrays(bm, uv_layer,
+                                                sel_faces).loop_edges
+
+        self.progress = 0.0
+        # (clip faces, subject faces, clipped), or TexelConflicts
+        self.result = None
+        self.error = None
+        self.__cancelled = threading.Event()
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+
+    def start(self):
+        self.__thread.start()
+
+    def cancel(self):
+        self.__cancelled.set()
+
+    def is_running(self):
+        return self.__thread.is_alive()
+
+    def __run(self):
+        try:
+            if self.texel is not None:
+                width, height, padding = self.texel
+                self.result = core.raster.rasterize_islands(
+                    self.isl.uvs, self.isl.loop_offsets,
+                    self.isl.face_island, width, height, padding,
+                    cancelled=self.__cancelled.is_set)
+                self.progress = 1.0
+                return
+
+            pairs = find_overlapped_face_pairs(
+                None, self.isl, None, self.self_overlap,
+                loop_edges=self.loop_edges,
+                cancelled=self.__cancelled.is_set)
+            if pairs is None:
+                return
+            clip_indices = np.concatenate((pairs[0], pairs[2]))
+            subject_indices = np.concatenate((pairs[1], pairs[3]))
+            self.progress = OVERLAP_JOB_BROAD_PHASE_PROGRESS
+
+            clipped = []
+            num_pair = len(clip_indices)
+            for start in range(0, num_pair, OVERLAP_JOB_CHUNK_SIZE):
+                if self.__cancelled.is_set():
+                    return
+                end = min(start + OVERLAP_JOB_CHUNK_SIZE, num_pair)
+                clipped.append((start, core.clip.clip_polygon_pairs(
+                    self.isl.uvs, self.isl.loop_offsets,
+                    clip_indices[start:end], subject_indices[start:end])))
+                self.progress = OVERLAP_JOB_BROAD_PHASE_PROGRESS + \
+                    (1.0 - OVERLAP_JOB_BROAD_PHASE_PROGRESS) * end / num_pair
+            self.result = (clip_indices, subject_indices, clipped)
+            self.progress = 1.0
+        except Exception as e:      # pylint: disable=broad-except
+            self.error = e
+
+    def apply(self, props):
+        """
+        Swap result into props on the main thread
+        Return False when the result is not available
+        """
+
+        if self.__cancelled.is_set() or (self.result is None) or \
+                not self.bm.is_valid:
+            return False
+        if self.texel is not None:
+            overlapped = make_texel_overlapped_info(self.isl, self.result,
+                                                    self.mode)
+        else:
+            overlapped = make_overlapped_info(self.isl, *self.result,
+                                              mode=self.mode,
+                                              min_area=self.min_area)
+        # the result is not needed after the info is made
+        self.result = None
+        live = LiveInspection(self.bm, self.faces, self.uv_layer,
+                              self.mode, self.self_overlap, self.min_area,
+                              self.texel)
+        live.loop_edges = self.loop_edges
+        live.apply(self.isl, overlapped)
+        set_uvinsp_result(props, live)
+
+        return True
+
+
+@persistent
+def uvinsp_live_update_handler(scene):
+    """
+    Update result of UV Inspection incrementally while editing UVs
+    """
+
+    context = bpy.context
+    if not scene.muv_uvinsp_live_update:
+        return
+    if not MUV_UVInsp.is_running(context):
+        return
+    # result of background computation will be swapped in soon
+    if scene.muv_props.uvinsp.job is not None:
+        return
+    obj = scene.objects.active
+    if (obj is None) or (obj.type != 'MESH') or (obj.mode != 'EDIT'):
+        return
+    if not obj.is_updated_data:
+        return
+
+    if update_uvinsp_info(context, incremental=True) and context.screen:
+        for area in context.screen.areas:
+            if area.type == 'IMAGE_EDITOR':
+                area.tag_redraw()
+
+
+def select_faces(context, bm, uv_layer, faces, indices):
+    """
+    Select faces[indices] by bulk write to mesh arrays
+    """
+
+    arrays = common.MeshArrays(bm, uv_layer, faces)
+    if context.tool_settings.use_uv_select_sync:
+        arrays.face_select[indices] = True
+    else:
+        mask = np.zeros(len(faces), dtype=bool)
+        mask[indices] = True
+        arrays.uv_select[np.repeat(mask, np.diff(arrays.offsets))] = True
+    arrays.write_back()
+
+    common.update_edit_mesh(context.active_object.data)
 
 
 class MUV_UVInspUpdate(bpy.types.Operator):
     """
     Operation class: Update
+    When invoked from UI, overlapped faces are computed in a worker thread
+    and the result is polled by timer, so that Blender is not frozen.
     """
 
     bl_idname = "uv.muv_uvinsp_update"
@@ -552,10 +1004,14 @@ class MUV_UVInspUpdate(bpy.types.Operator):
     bl_description = "Update UV Inspection"
     bl_options = {'REGISTER', 'UNDO'}
 
+    __timer = None
+
     @classmethod
     def poll(cls, context):
         if not MUV_UVInsp.is_running(context):
             return False
+        if context.scene.muv_props.uvinsp.job is not None:
+            return False
         return is_valid_context(context)
 
     def execute(self, context):
@@ -566,6 +1022,79 @@ class MUV_UVInspUpdate(bpy.types.Operator):
 
         return {'FINISHED'}
 
+    def invoke(self, context, _):
+        props = context.scene.muv_props.uvinsp
+        job = OverlapJob(context)
+        job.start()
+        props.job = job
+
+        wm = context.window_manager
+        self.__timer = wm.event_timer_add(OVERLAP_JOB_POLL_INTERVAL,
+                                          context.window)
+        wm.modal_handler_add(self)
+        wm.progress_begin(0.0, 1.0)
+
+        return {'RUNNING_MODAL'}
+
+    def __finish(self, context):
+        props = context.scene.muv_props.uvinsp
+        props.job = None
+        if self.__timer is None:
+            return
+        wm = context.window_manager
+        wm.event_timer_remove(self.__timer)
+        self.__timer = None
+        wm.progress_end()
+        if context.area:
+            context.area.header_text_set()
+            context.area.tag_redraw()
+
+    def modal(self, context, event):
+        props = context.scene.muv_props.uvinsp
+        job = props.job
+        # job is reset when other file is loaded
+        if job is None:
+            self.__finish(context)
+            return {'CANCELLED'}
+
+        try:
+            return self.__poll_job(context, event, job)
+        except Exception:
+            # do not leave the job blocking live update and Update
+            job.cancel()
+            self.__finish(context)
+            raise
+
+    def __poll_job(self, context, event, job):
+        props = context.scene.muv_props.uvinsp
+
+        if event.type == 'ESC':
+            job.cancel()
+            self.__finish(context)
+            self.report({'INFO'}, "UV Inspection is cancelled")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        if job.is_running():
+            context.window_manager.progress_update(job.progress)
+            if context.area:
+                context.area.header_text_set(
+                    "UV Inspection: {0}% (Esc: Cancel)".format(
+                        int(job.progress * 100)))
+            return {'PASS_THROUGH'}
+
+        self.__finish(context)
+        if job.error is not None:
+            self.report({'ERROR'}, "UV Inspection failed: {0}".format(
+                job.error))
+            return {'CANCELLED'}
+        if not job.apply(props):
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
 
 class MUV_UVInspShow(bpy.types.Operator):
     """
@@ -593,6 +1122,16 @@ class MUV_UVInspShow(bpy.types.Operator):
 
         return {'FINISHED'}
 
+    def invoke(self, context, _):
+        if not MUV_UVInsp.is_running(context):
+            MUV_UVInsp.handle_add(self, context)
+            bpy.ops.uv.muv_uvinsp_update('INVOKE_DEFAULT')
+
+        if context.area:
+            context.area.tag_redraw()
+
+        return {'FINISHED'}
+
 
 class MUV_UVInspHide(bpy.types.Operator):
     """
@@ -611,8 +1150,14 @@ class MUV_UVInspHide(bpy.types.Operator):
         return is_valid_context(context)
 
     def execute(self, context):
+        props = context.scene.muv_props.uvinsp
+        if props.job is not None:
+            props.job.cancel()
         if MUV_UVInsp.is_running(context):
             MUV_UVInsp.handle_remove()
+        if props.overlay is not None:
+            props.overlay.free()
+            props.overlay = None
 
         if context.area:
             context.area.tag_redraw()
@@ -630,33 +1175,36 @@ class MUV_UVInspSelectOverlapped(bpy.types.Operator):
     bl_description = "Select faces which have overlapped UVs"
     bl_options = {'REGISTER', 'UNDO'}
 
+    self_overlap = BoolProperty(
+        name="Self Overlap",
+        description="Also select overlapped faces in the same island",
+        default=False
+    )
+    min_area = FloatProperty(
+        name="Min Area",
+        description="Ignore overlaps whose area is smaller than this",
+        default=0.0,
+        min=0.0,
+        precision=6
+    )
+
     @classmethod
     def poll(cls, context):
         return is_valid_context(context)
 
     def execute(self, context):
-        obj = context.active_object
-        bm = bmesh.from_edit_mesh(obj.data)
-        if common.check_version(2, 73, 0) >= 0:
-            bm.faces.ensure_lookup_table()
-        uv_layer = bm.loops.layers.uv.verify()
-
-        if context.tool_settings.use_uv_select_sync:
-            sel_faces = [f for f in bm.faces]
-        else:
-            sel_faces = [f for f in bm.faces if f.select]
-
-        overlapped_info = get_overlapped_uv_info(bm, sel_faces, uv_layer,
-                                                 'FACE')
-
-        for info in overlapped_info:
-            if context.tool_settings.use_uv_select_sync:
-                info["subject_face"].select = True
-            else:
-                for l in info["subject_face"].loops:
-                    l[uv_layer].select = True
-
-        bmesh.update_edit_mesh(obj.data)
+        bm, uv_layer, sel_faces = get_inspected_faces(context)
+        isl = common.get_island_table_from_faces(bm, sel_faces, uv_layer)
+        settings = (self.self_overlap, self.min_area, None)
+        live = inspection_cache.find(bm, sel_faces, uv_layer, isl, settings)
+        if live is None:
+            live = LiveInspection(bm, sel_faces, uv_layer, 'FACE',
+                                  *settings)
+            live.update(isl, uv_layer)
+            inspection_cache.put(live)
+
+        select_faces(context, bm, uv_layer, sel_faces,
+                     live.overlapped_faces())
 
         return {'FINISHED'}
 
@@ -676,26 +1224,15 @@ class MUV_UVInspSelectFlipped(bpy.types.Operator):
         return is_valid_context(context)
 
     def execute(self, context):
-        obj = context.active_object
-        bm = bmesh.from_edit_mesh(obj.data)
-        if common.check_version(2, 73, 0) >= 0:
-            bm.faces.ensure_lookup_table()
-        uv_layer = bm.loops.layers.uv.verify()
-
-        if context.tool_settings.use_uv_select_sync:
-            sel_faces = [f for f in bm.faces]
+        bm, uv_layer, sel_faces = get_inspected_faces(context)
+        isl = common.get_island_table_from_faces(bm, sel_faces, uv_layer)
+        live = inspection_cache.find(bm, sel_faces, uv_layer, isl)
+        if live is not None:
+            flipped = live.flipped_faces()
         else:
-            sel_faces = [f for f in bm.faces if f.select]
-
-        flipped_info = get_flipped_uv_info(sel_faces, uv_layer)
-
-        for info in flipped_info:
-            if context.tool_settings.use_uv_select_sync:
-                info["face"].select = True
-            else:
-                for l in info["face"].loops:
-                    l[uv_layer].select = True
+            _, flipped = core.geometry.find_flipped_polygons(
+                isl.uvs, isl.loop_offsets)
 
-        bmesh.update_edit_mesh(obj.data)
+        select_faces(context, bm, uv_layer, sel_faces, flipped)
 
         return {'FINISHED'}
@@ -316,7 +316,7 @@ class MUV_UVSculpt(bpy.types.Operator):
 
                     l[uv_layer].uv = target_uv
 
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
     def __stroke_exit(self, context, _):
         sc = context.scene
@@ -331,7 +331,7 @@ class MUV_UVSculpt(bpy.types.Operator):
                 l = bm.faces[info["face_idx"]].loops[info["loop_idx"]]
                 l[uv_layer].uv = info["initial_uv"] + diff_uv / 100.0
 
-        bmesh.update_edit_mesh(obj.data)
+        common.update_edit_mesh(obj.data)
 
     def modal(self, context, event):
         if context.area:
@@ -27,6 +27,7 @@ from math import sin, cos, pi
 
 import bpy
 import bmesh
+import numpy as np
 from bpy.props import (
     FloatProperty,
     FloatVectorProperty,
@@ -35,6 +36,7 @@ from bpy.props import (
 from mathutils import Vector
 
 from .. import common
+from .. import core
 
 
 __all__ = [
@@ -115,64 +117,20 @@ class MUV_UVWBoxMap(bpy.types.Operator):
                 return {'CANCELLED'}
         uv_layer = bm.loops.layers.uv.verify()
 
-        scale = 1.0 / self.size
-
-        sx = 1.0 * scale
-        sy = 1.0 * scale
-        sz = 1.0 * scale
-        ofx = self.offset[0]
-        ofy = self.offset[1]
-        ofz = self.offset[2]
-        rx = self.rotation[0] * pi / 180.0
-        ry = self.rotation[1] * pi / 180.0
-        rz = self.rotation[2] * pi / 180.0
-        aspect = self.tex_aspect
-
         sel_faces = [f for f in bm.faces if f.select]
+        arrays = common.MeshArrays(bm, uv_layer, sel_faces)
+        face_normals = np.array([f.normal[:] for f in sel_faces],
+                                dtype=np.float64).reshape(-1, 3)
+        normals = face_normals[
+            core.geometry.get_face_of_loops(arrays.offsets)]
 
         # update UV coordinate
-        for f in sel_faces:
-            n = f.normal
-            for l in f.loops:
-                co = l.vert.co
-                x = co.x * sx
-                y = co.y * sy
-                z = co.z * sz
-
-                # X-plane
-                if abs(n[0]) >= abs(n[1]) and abs(n[0]) >= abs(n[2]):
-                    if n[0] >= 0.0:
-                        u = (y - ofy) * cos(rx) + (z - ofz) * sin(rx)
-                        v = -(y * aspect - ofy) * sin(rx) +\
-                            (z * aspect - ofz) * cos(rx)
-                    else:
-                        u = -(y - ofy) * cos(rx) + (z - ofz) * sin(rx)
-                        v = (y * aspect - ofy) * sin(rx) +\
-                            (z * aspect - ofz) * cos(rx)
-                # Y-plane
-                elif abs(n[1]) >= abs(n[0]) and abs(n[1]) >= abs(n[2]):
-                    if n[1] >= 0.0:
-                        u = -(x - ofx) * cos(ry) + (z - ofz) * sin(ry)
-                        v = (x * aspect - ofx) * sin(ry) +\
-                            (z * aspect - ofz) * cos(ry)
-                    else:
-                        u = (x - ofx) * cos(ry) + (z - ofz) * sin(ry)
-                        v = -(x * aspect - ofx) * sin(ry) +\
-                            (z * aspect - ofz) * cos(ry)
-                # Z-plane
-                else:
-                    if n[2] >= 0.0:
-                        u = (x - ofx) * cos(rz) + (y - ofy) * sin(rz)
-                        v = -(x * aspect - ofx) * sin(rz) +\
-                            (y * aspect - ofy) * cos(rz)
-                    else:
-                        u = -(x - ofx) * cos(rz) - (y + ofy) * sin(rz)
-                        v = -(x * aspect + ofx) * sin(rz) +\
-                            (y * aspect - ofy) * cos(rz)
-
-                l[uv_layer].uv = Vector((u, v))
-
-        bmesh.update_edit_mesh(obj.data)
+        arrays.uvs[:] = core.mapping.calc_box_map(
+            arrays.cos, normals, self.size, self.rotation, self.offset,
+            self.tex_aspect)
+        arrays.write_back()
+
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
 
@@ -238,6 +196,7 @@ class MUV_UVWBestPlanerMap(bpy.types.Operator):
         aspect = self.tex_aspect
 
         sel_faces = [f for f in bm.faces if f.select]
+        arrays = common.MeshArrays(bm, uv_layer, sel_faces)
 
         # calculate average of normal
         n_ave = Vector((0.0, 0.0, 0.0))
@@ -246,17 +205,14 @@ class MUV_UVWBestPlanerMap(bpy.types.Operator):
         q = n_ave.rotation_difference(Vector((0.0, 0.0, 1.0)))
 
         # update UV coordinate
-        for f in sel_faces:
-            for l in f.loops:
-                co = q * l.vert.co
-                x = co.x * sx
-                y = co.y * sy
-
-                u = x * cos(rz) - y * sin(rz) + ofx
-                v = -x * aspect * sin(rz) - y * aspect * cos(rz) + ofy
-
-                l[uv_layer].uv = Vector((u, v))
-
-        bmesh.update_edit_mesh(obj.data)
+        rot = np.array(q.to_matrix(), dtype=np.float64)
+        rotated = np.dot(arrays.cos, rot.T)
+        x = rotated[:, 0] * sx
+        y = rotated[:, 1] * sy
+        arrays.uvs[:, 0] = x * cos(rz) - y * sin(rz) + ofx
+        arrays.uvs[:, 1] = -x * aspect * sin(rz) - y * aspect * cos(rz) + ofy
+        arrays.write_back()
+
+        common.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
@@ -141,6 +141,13 @@ def image_uvs_menu_fn(self, context):
                           icon="IMAGE_COL", text="Pack UV")
     ops.allowable_center_deviation = sc.muv_packuv_allowable_center_deviation
     ops.allowable_size_deviation = sc.muv_packuv_allowable_size_deviation
+    ops.method = sc.muv_packuv_method
+    ops.rotate = sc.muv_packuv_rotate
+    ops.texture_width = sc.muv_packuv_texture_width
+    ops.texture_height = sc.muv_packuv_texture_height
+    ops.padding = sc.muv_packuv_padding
+    ops.multi_tile = sc.muv_packuv_multi_tile
+    ops.multi_object = sc.muv_packuv_multi_object
     layout.label("UV Manipulation")
 
     layout.separator()
@@ -243,6 +250,18 @@ class MUV_Preferences(AddonPreferences):
         min=3.0,
         max=100.0)
 
+    # for Profiler
+    enable_profiler = BoolProperty(
+        name="Profiler",
+        description="Record timings of operators (slows down operators)",
+        default=False
+    )
+    profiler_trace_memory = BoolProperty(
+        name="Trace Memory",
+        description="Record peak allocations too (inflates timings)",
+        default=False
+    )
+
     # for UI
     category = EnumProperty(
         name="Category",
@@ -283,6 +302,11 @@ class MUV_Preferences(AddonPreferences):
         description="UV Bounding Box",
         default=False
     )
+    conf_profiler_expanded = BoolProperty(
+        name="Profiler",
+        description="Profiler",
+        default=False
+    )
 
     def draw(self, context):
         layout = self.layout
@@ -426,3 +450,19 @@ class MUV_Preferences(AddonPreferences):
                 col.prop(self, "uvbb_cp_size")
                 col.prop(self, "uvbb_cp_react_size")
                 layout.separator()
+
+            layout.prop(
+                self, "conf_profiler_expanded", text="Profiler",
+                icon='DISCLOSURE_TRI_DOWN' if self.conf_profiler_expanded else 'DISCLOSURE_TRI_RIGHT')
+            if self.conf_profiler_expanded:
+                sp = layout.split(percentage=0.05)
+                col = sp.column()       # spacer
+                sp = sp.split(percentage=0.3)
+                col = sp.column()
+                col.prop(self, "enable_profiler", text="Enable")
+                col.prop(self, "profiler_trace_memory")
+                sp = sp.split(percentage=1.0)
+                col = sp.column()
+                col.label("Timings are shown in 3D View > Tool shelf >")
+                col.label("Magic UV > Profiler")
+                layout.separator()
@@ -78,12 +78,14 @@ class MUV_Prefs():
 
 
 class MUV_CPUVProps():
+    src_offsets = None
     src_uvs = None
     src_pin_uvs = None
     src_seams = None
 
 
 class MUV_CPUVSelSeqProps():
+    src_offsets = None
     src_uvs = None
     src_pin_uvs = None
     src_seams = None
@@ -112,6 +114,9 @@ class MUV_TexWrapProps():
 class MUV_UVInspProps():
     overlapped_info = []
     flipped_info = []
+    live = None
+    overlay = None
+    job = None
 
 
 def init_props(scene):
@@ -205,6 +210,55 @@ def init_props(scene):
         description="Show flipped UVs",
         default=False
     )
+    scene.muv_uvinsp_self_overlap = BoolProperty(
+        name="Self Overlap",
+        description="Also detect overlapped faces in the same island",
+        default=False
+    )
+    scene.muv_uvinsp_min_overlapped_area = FloatProperty(
+        name="Min Area",
+        description="Ignore overlaps whose area on UV space is smaller than "
+                    "this",
+        default=0.0,
+        min=0.0,
+        precision=6
+    )
+    scene.muv_uvinsp_overlap_method = EnumProperty(
+        name="Method",
+        description="How to detect overlapped UVs",
+        items=[
+            ('POLYGON', "Polygon", "Clip UV polygons exactly"),
+            ('TEXEL', "Texel",
+             "Find islands sharing texels at texture size and padding")
+        ],
+        default='POLYGON'
+    )
+    scene.muv_uvinsp_texture_width = IntProperty(
+        name="Width",
+        description="Width of texture to detect overlapped texels",
+        default=1024,
+        min=1,
+        max=16384
+    )
+    scene.muv_uvinsp_texture_height = IntProperty(
+        name="Height",
+        description="Height of texture to detect overlapped texels",
+        default=1024,
+        min=1,
+        max=16384
+    )
+    scene.muv_uvinsp_padding = IntProperty(
+        name="Padding",
+        description="Pixels needed between islands",
+        default=16,
+        min=0,
+        max=256
+    )
+    scene.muv_uvinsp_live_update = BoolProperty(
+        name="Live Update",
+        description="Update inspection incrementally while editing UVs",
+        default=False
+    )
     scene.muv_uvinsp_show_mode = EnumProperty(
         name="Mode",
         description="Show mode",
@@ -321,6 +375,57 @@ def init_props(scene):
         default=(0.001, 0.001),
         size=2
     )
+    scene.muv_packuv_method = EnumProperty(
+        name="Method",
+        description="How to pack UV islands",
+        items=[
+            ('BLENDER', "Blender", "Use default pack UV function"),
+            ('SKYLINE', "Skyline",
+             "Pack bounding boxes of islands on skyline (fast)"),
+            ('MAXRECTS', "MaxRects",
+             "Pack bounding boxes of islands by MaxRects (tight, but slow "
+             "for many islands)")
+        ],
+        default='BLENDER'
+    )
+    scene.muv_packuv_rotate = BoolProperty(
+        name="Rotate",
+        description="Rotate islands to pack tightly",
+        default=False
+    )
+    scene.muv_packuv_texture_width = IntProperty(
+        name="Width",
+        description="Width of texture to calculate margin",
+        default=1024,
+        min=1,
+        max=16384
+    )
+    scene.muv_packuv_texture_height = IntProperty(
+        name="Height",
+        description="Height of texture to calculate margin",
+        default=1024,
+        min=1,
+        max=16384
+    )
+    scene.muv_packuv_padding = IntProperty(
+        name="Padding",
+        description="Pixels needed between islands",
+        default=4,
+        min=0,
+        max=256
+    )
+    scene.muv_packuv_multi_tile = BoolProperty(
+        name="Multi Tile",
+        description="Keep scale of islands, and put islands which do not "
+                    "fit into the next UDIM tiles",
+        default=False
+    )
+    scene.muv_packuv_multi_object = BoolProperty(
+        name="Multi Object",
+        description="Pack islands of all selected mesh objects into one "
+                    "layout",
+        default=False
+    )
 
     # Move UV
     scene.muv_mvuv_enabled = BoolProperty(
@@ -663,6 +768,13 @@ def clear_props(scene):
     del scene.muv_uvinsp_enabled
     del scene.muv_uvinsp_show_overlapped
     del scene.muv_uvinsp_show_flipped
+    del scene.muv_uvinsp_self_overlap
+    del scene.muv_uvinsp_min_overlapped_area
+    del scene.muv_uvinsp_overlap_method
+    del scene.muv_uvinsp_texture_width
+    del scene.muv_uvinsp_texture_height
+    del scene.muv_uvinsp_padding
+    del scene.muv_uvinsp_live_update
     del scene.muv_uvinsp_show_mode
 
     # Align UV
@@ -688,6 +800,13 @@ def clear_props(scene):
     del scene.muv_packuv_enabled
     del scene.muv_packuv_allowable_center_deviation
     del scene.muv_packuv_allowable_size_deviation
+    del scene.muv_packuv_method
+    del scene.muv_packuv_rotate
+    del scene.muv_packuv_texture_width
+    del scene.muv_packuv_texture_height
+    del scene.muv_packuv_padding
+    del scene.muv_packuv_multi_tile
+    del scene.muv_packuv_multi_object
 
     # Move UV
     del scene.muv_mvuv_enabled
@@ -29,6 +29,7 @@ if "bpy" in locals():
     importlib.reload(view3d_copy_paste_uv_editmode)
     importlib.reload(view3d_uv_manipulation)
     importlib.reload(view3d_uv_mapping)
+    importlib.reload(view3d_profiler)
     importlib.reload(uvedit_copy_paste_uv)
     importlib.reload(uvedit_uv_manipulation)
     importlib.reload(uvedit_editor_enhance)
@@ -40,6 +41,7 @@ else:
     from . import view3d_copy_paste_uv_editmode
     from . import view3d_uv_manipulation
     from . import view3d_uv_mapping
+    from . import view3d_profiler
     from . import uvedit_copy_paste_uv
     from . import uvedit_uv_manipulation
     from . import uvedit_editor_enhance
@@ -134,8 +134,22 @@ class IMAGE_PT_MUV_EE(bpy.types.Panel):
                             text="Hide", icon='PAUSE')
             row.operator(uv_inspection.MUV_UVInspUpdate.bl_idname,
                          text="Update")
+            row.prop(sc, "muv_uvinsp_live_update", text="Live")
             row = box.row()
             row.prop(sc, "muv_uvinsp_show_overlapped")
             row.prop(sc, "muv_uvinsp_show_flipped")
             row = box.row()
+            row.prop(sc, "muv_uvinsp_self_overlap")
+            row = box.row()
+            row.prop(sc, "muv_uvinsp_overlap_method", expand=True)
+            if sc.muv_uvinsp_overlap_method == 'TEXEL':
+                col = box.column(align=True)
+                row = col.row(align=True)
+                row.prop(sc, "muv_uvinsp_texture_width")
+                row.prop(sc, "muv_uvinsp_texture_height")
+                col.prop(sc, "muv_uvinsp_padding")
+            else:
+                row = box.row()
+                row.prop(sc, "muv_uvinsp_min_overlapped_area")
+            row = box.row()
             row.prop(sc, "muv_uvinsp_show_mode")
@@ -105,8 +105,13 @@ class IMAGE_PT_MUV_UVManip(bpy.types.Panel):
         box.prop(sc, "muv_seluv_enabled", text="Select UV")
         if sc.muv_seluv_enabled:
             row = box.row(align=True)
-            row.operator(uv_inspection.MUV_UVInspSelectOverlapped.bl_idname)
+            ops = row.operator(
+                uv_inspection.MUV_UVInspSelectOverlapped.bl_idname)
+            ops.self_overlap = sc.muv_uvinsp_self_overlap
+            ops.min_area = sc.muv_uvinsp_min_overlapped_area
             row.operator(uv_inspection.MUV_UVInspSelectFlipped.bl_idname)
+            box.prop(sc, "muv_uvinsp_self_overlap")
+            box.prop(sc, "muv_uvinsp_min_overlapped_area")
 
         box = layout.box()
         box.prop(sc, "muv_packuv_enabled", text="Pack UV (Extension)")
@@ -116,7 +121,26 @@ class IMAGE_PT_MUV_UVManip(bpy.types.Panel):
                 sc.muv_packuv_allowable_center_deviation
             ops.allowable_size_deviation = \
                 sc.muv_packuv_allowable_size_deviation
+            ops.method = sc.muv_packuv_method
+            ops.rotate = sc.muv_packuv_rotate
+            ops.texture_width = sc.muv_packuv_texture_width
+            ops.texture_height = sc.muv_packuv_texture_height
+            ops.padding = sc.muv_packuv_padding
+            ops.multi_tile = sc.muv_packuv_multi_tile
+            ops.multi_object = sc.muv_packuv_multi_object
             box.label("Allowable Center Deviation:")
             box.prop(sc, "muv_packuv_allowable_center_deviation", text="")
             box.label("Allowable Size Deviation:")
             box.prop(sc, "muv_packuv_allowable_size_deviation", text="")
+            row = box.row(align=True)
+            row.prop(sc, "muv_packuv_method", expand=True)
+            box.prop(sc, "muv_packuv_rotate")
+            if sc.muv_packuv_method != 'BLENDER':
+                col = box.column(align=True)
+                row = col.row(align=True)
+                row.prop(sc, "muv_packuv_texture_width")
+                row.prop(sc, "muv_packuv_texture_height")
+                col.prop(sc, "muv_packuv_padding")
+                row = box.row()
+                row.prop(sc, "muv_packuv_multi_tile")
+                row.prop(sc, "muv_packuv_multi_object")
@@ -0,0 +1,99 @@
+# <pep8-80 compliant>
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "5.1"
+__date__ = "24 Feb 2018"
+
+import bpy
+
+from .. import common
+from ..op import profiler
+
+
+__all__ = [
+    'VIEW3D_PT_MUV_Profiler',
+]
+
+
+class VIEW3D_PT_MUV_Profiler(bpy.types.Panel):
+    """
+    Panel class: Profile of operators on View3D
+    """
+
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'TOOLS'
+    bl_label = "Profiler"
+    bl_category = "Magic UV"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, _):
+        return common.is_profiling_enabled()
+
+    def draw_header(self, _):
+        layout = self.layout
+        layout.label(text="", icon='TIME')
+
+    def draw(self, _):
+        layout = self.layout
+
+        summary = common.profiler.summary()
+        if not summary:
+            layout.label("No operator is recorded")
+        else:
+            col = layout.column(align=True)
+            row = col.row()
+            row.label("Operator")
+            row.label("Calls")
+            row.label("Avg [ms]")
+            row.label("Max [ms]")
+            row.label("Peak [KB]")
+            for name, calls, total, max_time, max_mem in summary:
+                row = col.row()
+                row.label(name.replace("uv.muv_", ""))
+                row.label("{0}".format(calls))
+                row.label("{0:.1f}".format(total / calls * 1e3))
+                row.label("{0:.1f}".format(max_time * 1e3))
+                row.label("{0:.0f}".format(max_mem / 1024.0))
+
+            # phases of the latest call
+            rec = common.profiler.records[-1]
+            box = layout.box()
+            box.label("Last: {0} ({1:.1f} ms)"
+                      .format(rec.name, rec.duration * 1e3))
+            if rec.counts:
+                box.label(", ".join("{0}: {1}".format(k, v)
+                                    for k, v in rec.counts.items()))
+            col = box.column(align=True)
+            for name, _, duration in rec.phases:
+                row = col.row()
+                row.label(name)
+                row.label("{0:.2f} ms".format(duration * 1e3))
+
+        row = layout.row(align=True)
+        ops = row.operator(profiler.MUV_ProfilerExport.bl_idname,
+                           text="CSV", icon='FILE_TEXT')
+        ops.format = 'CSV'
+        ops = row.operator(profiler.MUV_ProfilerExport.bl_idname,
+                           text="Chrome Trace", icon='FILE_SCRIPT')
+        ops.format = 'CHROME_TRACE'
+        row.operator(profiler.MUV_ProfilerClear.bl_idname, text="Clear")